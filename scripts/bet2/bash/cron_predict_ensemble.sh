@@ -2,4 +2,9 @@
 # Cron script for Ensemble predictions (DEFAULT - best accuracy)
 cd /var/www/html/pyethone/scripts/bet2/python_api
 source ../../pye_venv/bin/activate
-python predict.py "$1" "$2" "premier_league" "ensemble"
+if [ "$#" -eq 1 ]; then
+    # Single argument: fixtures JSON file, whole matchweek in one call
+    python predict_batch.py "$1" "premier_league" "ensemble"
+else
+    python predict.py "$1" "$2" "premier_league" "ensemble"
+fi
@@ -0,0 +1,26 @@
+#!/bin/bash
+# Prediction Server - Startup Script
+# Keeps models/features warm for predict.py (run @reboot or manually)
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+PROJECT_ROOT="$(dirname "$SCRIPT_DIR")"
+PYTHON_SCRIPT="$PROJECT_ROOT/python_api/prediction_server.py"
+VENV_PATH="/var/www/html/pyethone/pye_venv"
+LOG_FILE="$PROJECT_ROOT/logs/prediction_server.log"
+
+# Create logs directory
+mkdir -p "$PROJECT_ROOT/logs"
+
+# Already running?
+if pgrep -f "$PYTHON_SCRIPT" > /dev/null; then
+    echo "Prediction server already running"
+    exit 0
+fi
+
+# Activate virtual environment
+source "$VENV_PATH/bin/activate"
+
+cd "$PROJECT_ROOT/python_api"
+nohup python3 -u "$PYTHON_SCRIPT" >> "$LOG_FILE" 2>&1 &
+
+echo "Prediction server started (PID $!), logging to $LOG_FILE"
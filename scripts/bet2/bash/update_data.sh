@@ -31,6 +31,12 @@ echo "Exit Code: $EXIT_CODE" | tee -a "$LOG_FILE"
 echo "========================================" | tee -a "$LOG_FILE"
 
 
+# Refresh feature store (computes features for new matches only)
+echo "" | tee -a "$LOG_FILE"
+echo "Updating feature store..." | tee -a "$LOG_FILE"
+python3 "$PROJECT_ROOT/python_api/update_features.py" premier_league 2>&1 | tee -a "$LOG_FILE"
+
+
 # Auto-match predictions after data update
 echo "" | tee -a $LOGFILE
 echo "========================================" | tee -a $LOGFILE
@@ -360,6 +360,32 @@ def scrape_team_data(team_name, team_code, existing_matchweeks):
         return pd.DataFrame()
 
 
+def update_arrow_store():
+    """Refresh the typed Arrow copy of the season that DataLoader reads"""
+    try:
+        sys.path.insert(0, str(PROJECT_ROOT / 'python_api'))
+        from services.data_loader import DataLoader
+
+        path = DataLoader('premier_league').import_csv(CURRENT_SEASON)
+        print(f"✓ Arrow store updated: {path}")
+    except Exception as e:
+        # DataLoader re-imports the newer CSV on its next load anyway
+        print(f"⚠ Could not update Arrow store: {e}")
+
+
+def update_metadata_index():
+    """Refresh the teams/seasons index read by get_teams.py and get_competitions.py"""
+    try:
+        sys.path.insert(0, str(PROJECT_ROOT / 'python_api'))
+        from services.metadata_index import MetadataIndex
+
+        index = MetadataIndex().refresh()
+        print(f"✓ Metadata index updated: {len(index['seasons'])} competitions")
+    except Exception as e:
+        # Readers rebuild stale entries themselves on the next request
+        print(f"⚠ Could not update metadata index: {e}")
+
+
 def main():
     print("=" * 70)
     print(f"Premier League {CURRENT_SEASON} - Data Update Script")
@@ -398,6 +424,8 @@ def main():
             print(f"\n✓ Created new dataset with {len(df_new_data)} matches")
 
         df_all.to_csv(OUTPUT_FILE, index=False)
+        update_arrow_store()
+        update_metadata_index()
 
         print(f"\n{'='*70}")
         print(f"✓ Data saved to: {OUTPUT_FILE}")
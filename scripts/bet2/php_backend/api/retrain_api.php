@@ -17,27 +17,24 @@ if ($_SERVER['REQUEST_METHOD'] !== 'POST') {
 $pythonApiDir = __DIR__ . '/../../python_api';
 $venvPython = '/var/www/html/pyethone/pye_venv/bin/python3';
 
-// Training scripts
-$trainEnsemble = $pythonApiDir . '/train_ensemble.py';
-$trainCards = $pythonApiDir . '/train_cards.py';
+// Training script: every market in one parallel run, with feature selection
+$trainAll = $pythonApiDir . '/train_all.py';
 
-// Check if scripts exist
-if (!file_exists($trainEnsemble) || !file_exists($trainCards)) {
+// Check if script exists
+if (!file_exists($trainAll)) {
     http_response_code(500);
     echo json_encode([
         'success' => false,
-        'error' => 'Training scripts not found'
+        'error' => 'Training script not found'
     ]);
     exit;
 }
 
-// Execute training scripts in background (ensemble first, then cards)
+// Execute training in background
 $command = sprintf(
-    '%s %s && %s %s > /dev/null 2>&1 &',
+    '%s %s > /dev/null 2>&1 &',
     escapeshellarg($venvPython),
-    escapeshellarg($trainEnsemble),
-    escapeshellarg($venvPython),
-    escapeshellarg($trainCards)
+    escapeshellarg($trainAll)
 );
 
 exec($command, $output, $returnCode);
@@ -46,8 +43,7 @@ echo json_encode([
     'success' => true,
     'message' => 'Model retraining started',
     'scripts' => [
-        'train_ensemble.py',
-        'train_cards.py'
+        'train_all.py'
     ],
     'started_at' => date('Y-m-d H:i:s')
 ]);
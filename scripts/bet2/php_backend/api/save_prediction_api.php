@@ -25,17 +25,34 @@ try {
         throw new Exception('Save script not found');
     }
 
-    $jsonData = escapeshellarg(json_encode($data));
     $venvPython = '/var/www/html/pyethone/pye_venv/bin/python3';
     $logFile = __DIR__ . '/../../python_api/logs/save_errors.log';
 
-    // Run synchronously to get immediate feedback
-    $command = "$venvPython $pythonSaveScript $jsonData 2>&1";
-    $output = shell_exec($command);
+    if (isset($data[0])) {
+        // A list of predictions (e.g. a whole matchweek): one process, one transaction
+        $ndjson = implode("\n", array_map('json_encode', $data)) . "\n";
+        $command = "$venvPython $pythonSaveScript --stdin 2>&1";
+        $process = proc_open($command, [0 => ['pipe', 'r'], 1 => ['pipe', 'w']], $pipes);
+
+        if (!is_resource($process)) {
+            throw new Exception('Failed to execute save script');
+        }
+
+        fwrite($pipes[0], $ndjson);
+        fclose($pipes[0]);
+        $output = stream_get_contents($pipes[1]);
+        fclose($pipes[1]);
+        proc_close($process);
+    } else {
+        // Run synchronously to get immediate feedback
+        $jsonData = escapeshellarg(json_encode($data));
+        $command = "$venvPython $pythonSaveScript $jsonData 2>&1";
+        $output = shell_exec($command);
+    }
     $result = json_decode($output, true);
 
     if ($result && isset($result['success']) && $result['success']) {
-        echo json_encode(['success' => true, 'message' => 'Prediction saved']);
+        echo json_encode(['success' => true, 'message' => $result['message'] ?? 'Prediction saved']);
     } else {
         echo json_encode(['success' => false, 'error' => 'Save failed', 'details' => $output]);
     }
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Backtest - Walk-forward backtest over historical matchweeks
+Replays each matchweek, trains on everything before it, predicts the week in
+batch and reports accuracy / Brier / log-loss / ROI per market and model
+Usage: python backtest.py [season ...] [--retrain-every N] [--cpus N] [--groups a,b]
+"""
+from services.backtester import Backtester
+import sys
+import json
+import logging
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import BACKTEST_RETRAIN_WEEKS, TRAINING_CPU_BUDGET
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Walk-forward backtest')
+    parser.add_argument('seasons', nargs='*', help='Seasons to replay (default: all)')
+    parser.add_argument('--competition', default='premier_league')
+    parser.add_argument('--retrain-every', type=int, default=BACKTEST_RETRAIN_WEEKS,
+                        help='Matchweeks predicted per training run')
+    parser.add_argument('--cpus', type=int, default=TRAINING_CPU_BUDGET,
+                        help='CPU budget shared by the folds')
+    parser.add_argument('--groups', default='match_result,goals,cards',
+                        help='Comma-separated market groups')
+    args = parser.parse_args()
+
+    try:
+        backtester = Backtester(
+            args.competition,
+            groups=args.groups.split(','),
+            retrain_every=args.retrain_every,
+            cpu_budget=args.cpus
+        )
+        report = backtester.run(seasons=args.seasons or None)
+        backtester.log_summary(report)
+
+        # Output JSON
+        print(json.dumps({"success": True, **report}, indent=2))
+
+    except Exception as e:
+        print(json.dumps({
+            "success": False,
+            "error": str(e)
+        }))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,20 @@
 """
 Results Collection Script
 Fetches actual match results and calculates accuracy metrics
+
+Usage:
+    python collect_results.py                    # collect results, update metrics
+    python collect_results.py --metrics-only     # fold newly matched predictions in
+    python collect_results.py --rebuild-metrics  # recompute metrics from all history
 """
 
-from sklearn.metrics import brier_score_loss, f1_score, roc_auc_score, precision_score, recall_score
 from services.data_loader import DataLoader
 from services.database_service import DatabaseService
+from services.metrics_tracker import MetricsTracker
+from database.init_db import migrate
 import pandas as pd
-import numpy as np
 from pathlib import Path
+import argparse
 from datetime import datetime, timedelta
 import logging
 import sys
@@ -29,7 +35,8 @@ class ResultsCollector:
 
     def __init__(self):
         self.db = DatabaseService()
-        self.data_loader = DataLoader('premierleague')
+        self.data_loader = DataLoader('premier_league')
+        self.metrics_tracker = MetricsTracker(self.db)
 
     def collect_results(self, days_back: int = 7):
         """
@@ -47,7 +54,9 @@ class ResultsCollector:
         logger.info(f"📊 Found {len(predictions)} unmatched predictions")
 
         if not predictions:
-            logger.info("✅ No predictions to match. Exiting.")
+            # match_results.py may still have matched some since the last run
+            logger.info("✅ No predictions to match.")
+            self.calculate_metrics()
             return
 
         # Load recent match data
@@ -59,18 +68,17 @@ class ResultsCollector:
                        ).strftime('%Y-%m-%d')
         df = df[df['Date'] >= cutoff_date].copy()
 
-        matched_count = 0
+        results = []
 
         for pred in predictions:
             # Try to find matching result
             match = self._find_matching_result(pred, df)
 
             if match is not None:
-                result_data = self._extract_result_data(pred, match)
-                success = self.db.save_actual_result(result_data)
+                results.append(self._extract_result_data(pred, match))
 
-                if success:
-                    matched_count += 1
+        # One transaction for the whole batch
+        matched_count = self.db.save_actual_results(results)
 
         logger.info(
             f"✅ Matched {matched_count}/{len(predictions)} predictions with results")
@@ -143,293 +151,63 @@ class ResultsCollector:
             'match_date': match['Date']
         }
 
-    def calculate_metrics(self):
-        """Calculate accuracy metrics from predictions + results"""
+    def calculate_metrics(self, rebuild: bool = False):
+        """
+        Fold newly matched predictions into the accuracy metrics (MetricsTracker:
+        every market, line and model type in one pass over the full history)
+
+        Args:
+            rebuild: Recompute from all matched predictions instead
+        """
         logger.info("\n" + "=" * 80)
         logger.info("CALCULATING ACCURACY METRICS")
         logger.info("=" * 80)
 
-        data = self.db.get_predictions_with_results(limit=1000)
-
-        if not data:
-            logger.warning(
-                "⚠️ No matched predictions found. Cannot calculate metrics.")
-            return
-
-        df = pd.DataFrame(data)
-        logger.info(f"📊 Analyzing {len(df)} matched predictions")
-
-        # 1. MATCH RESULT (1X2) - Brier Score + F1
-        self._calculate_match_result_metrics(df)
-
-        # 2. GOALS MARKETS - Brier Score + ROC-AUC
-        for threshold in [0.5, 1.5, 2.5, 3.5]:
-            self._calculate_goals_metrics(df, threshold)
-
-        # 3. BTTS - Brier Score + ROC-AUC
-        self._calculate_btts_metrics(df)
-
-        # 4. CARDS - Brier Score + ROC-AUC
-        for threshold in [3.5, 4.5]:
-            self._calculate_cards_metrics(df, threshold)
-
-        # 5. MARKET PERFORMANCE (for dashboard Tab 1)
-        self._calculate_market_performance(df)
+        result = self.metrics_tracker.update(rebuild=rebuild)
 
-        logger.info("\n✅ Metrics calculation complete!")
-
-    def _calculate_match_result_metrics(self, df: pd.DataFrame):
-        """Calculate metrics for match result predictions"""
-        # Filter valid predictions
-        valid = df[df['prediction_1x2'].notna()].copy()
-
-        if valid.empty:
+        if not result['success']:
+            logger.error("❌ Metrics could not be saved")
             return
 
-        # Accuracy
-        correct = (valid['prediction_1x2'] == valid['actual_result']).sum()
-        accuracy = (correct / len(valid)) * 100
-
-        # Brier Score (PRIMARY)
-        y_true_home = (valid['actual_result'] == 'Home Win').astype(int)
-        y_true_draw = (valid['actual_result'] == 'Draw').astype(int)
-        y_true_away = (valid['actual_result'] == 'Away Win').astype(int)
-
-        brier_home = brier_score_loss(
-            y_true_home, valid['prob_home'].fillna(0))
-        brier_draw = brier_score_loss(
-            y_true_draw, valid['prob_draw'].fillna(0))
-        brier_away = brier_score_loss(
-            y_true_away, valid['prob_away'].fillna(0))
-        brier_avg = (brier_home + brier_draw + brier_away) / 3
-
-        # F1 Score (SECONDARY)
-        from sklearn.preprocessing import LabelEncoder
-        le = LabelEncoder()
-        y_true = le.fit_transform(valid['actual_result'])
-        y_pred = le.transform(valid['prediction_1x2'])
-        f1 = f1_score(y_true, y_pred, average='macro')
-
-        # Save to database
-        metric_data = {
-            'metric_type': 'match_result',
-            'market': '1X2',
-            'model_type': 'ensemble',
-            'total_predictions': len(valid),
-            'correct_predictions': correct,
-            'accuracy_pct': accuracy,
-            'brier_score': brier_avg,
-            'f1_score': f1,
-            'calculation_period': 'all_time'
-        }
-
-        self.db.save_accuracy_metric(metric_data)
-
-        logger.info(
-            f"⚽ Match Result (1X2): Accuracy={accuracy:.1f}%, Brier={brier_avg:.3f}, F1={f1:.3f}")
-
-    def _calculate_goals_metrics(self, df: pd.DataFrame, threshold: float):
-        """Calculate metrics for goals O/U markets"""
-        threshold_str = str(threshold).replace('.', '')
-        col_prediction = f'prediction_goals_{threshold_str}'
-        col_prob = f'prob_over_{threshold_str}'
-
-        if col_prediction not in df.columns:
-            return
-
-        valid = df[df[col_prediction].notna()].copy()
-
-        if valid.empty:
-            return
-
-        # Actual outcome
-        valid['actual_over'] = (valid['total_goals'] > threshold).astype(int)
-        valid['predicted_over'] = (
-            valid[col_prediction] == f'Over {threshold}').astype(int)
-
-        # Accuracy
-        correct = (valid['predicted_over'] == valid['actual_over']).sum()
-        accuracy = (correct / len(valid)) * 100
-
-        # Brier Score (PRIMARY)
-        brier = brier_score_loss(
-            valid['actual_over'], valid[col_prob].fillna(0.5))
-
-        # ROC-AUC (SECONDARY)
-        try:
-            roc_auc = roc_auc_score(
-                valid['actual_over'], valid[col_prob].fillna(0.5))
-        except:
-            roc_auc = None
-
-        # Save to database
-        metric_data = {
-            'metric_type': 'goals_over_under',
-            'market': f'O/U {threshold}',
-            'model_type': 'ensemble',
-            'total_predictions': len(valid),
-            'correct_predictions': correct,
-            'accuracy_pct': accuracy,
-            'brier_score': brier,
-            'roc_auc': roc_auc,
-            'calculation_period': 'all_time'
-        }
-
-        self.db.save_accuracy_metric(metric_data)
-
-        logger.info(
-            f"⚽ Goals O/U {threshold}: Accuracy={accuracy:.1f}%, Brier={brier:.3f}, AUC={roc_auc:.3f if roc_auc else 'N/A'}")
-
-    def _calculate_btts_metrics(self, df: pd.DataFrame):
-        """Calculate metrics for BTTS market"""
-        valid = df[df['prediction_btts'].notna()].copy()
-
-        if valid.empty:
-            return
-
-        # Actual outcome
-        valid['actual_btts_binary'] = (
-            valid['btts_actual'] == 'Yes').astype(int)
-        valid['predicted_btts_binary'] = (
-            valid['prediction_btts'] == 'Yes').astype(int)
-
-        # Accuracy
-        correct = (valid['predicted_btts_binary'] ==
-                   valid['actual_btts_binary']).sum()
-        accuracy = (correct / len(valid)) * 100
-
-        # Brier Score (PRIMARY)
-        brier = brier_score_loss(
-            valid['actual_btts_binary'], valid['prob_btts_yes'].fillna(0.5))
-
-        # ROC-AUC (SECONDARY)
-        try:
-            roc_auc = roc_auc_score(
-                valid['actual_btts_binary'], valid['prob_btts_yes'].fillna(0.5))
-        except:
-            roc_auc = None
-
-        # Precision/Recall for "Yes" class
-        precision = precision_score(
-            valid['actual_btts_binary'], valid['predicted_btts_binary'], zero_division=0)
-        recall = recall_score(
-            valid['actual_btts_binary'], valid['predicted_btts_binary'], zero_division=0)
-
-        # Save to database
-        metric_data = {
-            'metric_type': 'btts',
-            'market': 'BTTS',
-            'model_type': 'ensemble',
-            'total_predictions': len(valid),
-            'correct_predictions': correct,
-            'accuracy_pct': accuracy,
-            'brier_score': brier,
-            'roc_auc': roc_auc,
-            'precision_score': precision,
-            'recall_score': recall,
-            'calculation_period': 'all_time'
-        }
-
-        self.db.save_accuracy_metric(metric_data)
-
-        logger.info(
-            f"⚽ BTTS: Accuracy={accuracy:.1f}%, Brier={brier:.3f}, AUC={roc_auc:.3f if roc_auc else 'N/A'}")
-
-    def _calculate_cards_metrics(self, df: pd.DataFrame, threshold: float):
-        """Calculate metrics for cards O/U markets"""
-        threshold_str = str(threshold).replace('.', '')
-        col_prediction = f'prediction_cards_{threshold_str}'
-        col_prob = f'prob_cards_over_{threshold_str}'
-
-        if col_prediction not in df.columns:
-            return
-
-        valid = df[df[col_prediction].notna()].copy()
-
-        if valid.empty:
+        if not result['metrics']:
+            logger.warning(
+                "⚠️ No matched predictions found. Cannot calculate metrics.")
             return
 
-        # Actual outcome
-        valid['actual_over'] = (valid['total_cards'] > threshold).astype(int)
-        valid['predicted_over'] = (
-            valid[col_prediction] == f'Over {threshold}').astype(int)
-
-        # Accuracy
-        correct = (valid['predicted_over'] == valid['actual_over']).sum()
-        accuracy = (correct / len(valid)) * 100
-
-        # Brier Score (PRIMARY)
-        brier = brier_score_loss(
-            valid['actual_over'], valid[col_prob].fillna(0.5))
-
-        # ROC-AUC (SECONDARY)
-        try:
-            roc_auc = roc_auc_score(
-                valid['actual_over'], valid[col_prob].fillna(0.5))
-        except:
-            roc_auc = None
-
-        # Save to database
-        metric_data = {
-            'metric_type': 'cards_over_under',
-            'market': f'Cards O/U {threshold}',
-            'model_type': 'ensemble',
-            'total_predictions': len(valid),
-            'correct_predictions': correct,
-            'accuracy_pct': accuracy,
-            'brier_score': brier,
-            'roc_auc': roc_auc,
-            'calculation_period': 'all_time'
-        }
-
-        self.db.save_accuracy_metric(metric_data)
-
-        logger.info(
-            f"🟨 Cards O/U {threshold}: Accuracy={accuracy:.1f}%, Brier={brier:.3f}, AUC={roc_auc:.3f if roc_auc else 'N/A'}")
-
-    def _calculate_market_performance(self, df: pd.DataFrame):
-        """Calculate performance ranking for markets (for Tab 1)"""
-        markets = [
-            ('O/U 0.5', 'prediction_goals_05', 'total_goals', 0.5),
-            ('O/U 1.5', 'prediction_goals_15', 'total_goals', 1.5),
-            ('O/U 2.5', 'prediction_goals_25', 'total_goals', 2.5),
-            ('O/U 3.5', 'prediction_goals_35', 'total_goals', 3.5),
-            ('BTTS', 'prediction_btts', 'btts_actual', None),
-            ('Cards O/U 3.5', 'prediction_cards_35', 'total_cards', 3.5),
-            ('Cards O/U 4.5', 'prediction_cards_45', 'total_cards', 4.5),
-        ]
-
-        # Calculate ROI (simplified - assumes 1.0 unit per bet, 2.0 odds)
-        for market_name, pred_col, actual_col, threshold in markets:
-            if pred_col not in df.columns:
-                continue
-
-            valid = df[df[pred_col].notna()].copy()
-
-            if valid.empty:
-                continue
+        logger.info(f"📊 Folded in {result['folded']} newly matched predictions")
 
-            # Simplified ROI calculation (placeholder)
-            # In production, you'd integrate actual odds
-            if threshold is not None and actual_col == 'total_goals':
-                correct = ((valid[actual_col] > threshold) == (
-                    valid[pred_col].str.contains('Over'))).sum()
-            elif threshold is not None and actual_col == 'total_cards':
-                correct = ((valid[actual_col] > threshold) == (
-                    valid[pred_col].str.contains('Over'))).sum()
+        for metric in result['metrics']:
+            if metric['market'] == '1X2':
+                secondary = f"F1={metric['f1_score']:.3f}"
             else:
-                correct = (valid[pred_col] == valid[actual_col]).sum()
+                auc = metric['roc_auc']
+                secondary = f"AUC={auc:.3f}" if auc is not None else "AUC=N/A"
+            logger.info(
+                f"⚽ {metric['market']} ({metric['model_type']}): "
+                f"Accuracy={metric['accuracy_pct']:.1f}%, Brier={metric['brier_score']:.3f}, {secondary}")
 
-            accuracy = (correct / len(valid)) * 100
-            roi = ((correct * 2.0) - len(valid)) / \
-                len(valid) * 100  # Simplified
+        for market in result['performance']:
+            logger.info(
+                f"💰 {market['market']}: {market['total_predictions']} bets, ROI={market['roi_pct']:.1f}%")
 
-            logger.info(f"💰 {market_name}: {len(valid)} bets, ROI={roi:.1f}%")
+        logger.info("\n✅ Metrics calculation complete!")
 
 
 def main():
     """Main execution"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--metrics-only', action='store_true',
+                        help='Only fold newly matched predictions into the metrics')
+    parser.add_argument('--rebuild-metrics', action='store_true',
+                        help='Recompute the metrics from all matched predictions')
+    args = parser.parse_args()
+
     collector = ResultsCollector()
+    migrate(collector.db.db_path)
+
+    if args.metrics_only or args.rebuild_metrics:
+        collector.calculate_metrics(rebuild=args.rebuild_metrics)
+        return
 
     # Collect results from last 7 days
     collector.collect_results(days_back=7)
@@ -9,6 +9,11 @@ BASE_DIR = Path("/var/www/html/pyethone/scripts/bet2")
 DATA_DIR = BASE_DIR / "data"
 MODELS_DIR = BASE_DIR / "models"
 LOGS_DIR = BASE_DIR / "logs"
+FEATURE_STORE_DIR = DATA_DIR / "features"
+TUNING_CACHE_DIR = DATA_DIR / "tuning_cache"
+MATRIX_CACHE_DIR = DATA_DIR / "matrix_cache"
+MATRIX_CACHE_SELECTIONS = 4  # Column subsets (feature selections) kept per row view, most recently used
+METADATA_INDEX_PATH = DATA_DIR / "metadata_index.json"
 
 # Python virtual environment
 VENV_PATH = "/var/www/html/pyethone/pye_venv/bin/python"
@@ -18,9 +23,30 @@ API_HOST = "0.0.0.0"
 API_PORT = 5001
 API_DEBUG = True  # Set to False in production
 
+# Prediction server (keeps models and features warm; predict.py is its client)
+PREDICTION_SERVER_HOST = "127.0.0.1"
+PREDICTION_SERVER_PORT = API_PORT
+PREDICTION_SERVER_TIMEOUT = 30  # Seconds; covers the first (cold) load per competition
+PREDICTION_SERVER_RELOAD_CHECK = 2  # Seconds between scans of data/model files for changes
+
 # Available competitions
 COMPETITIONS = ["premier_league"]
 
+# Match data: 'arrow' reads data/<competition>/<season>_all_teams.arrow
+# (imported from the CSV whenever the CSV is newer); 'csv' reads the CSVs
+DATA_FORMAT = "arrow"
+DATA_CACHE_SIZE = 8  # Parsed seasons memoized per process (LRU); 0 disables
+
+# Prediction database (database/predictions.db, see services/database_service.py):
+# WAL lets readers and the single writer proceed concurrently; synchronous
+# NORMAL is durable across application crashes in WAL mode
+DB_JOURNAL_MODE = "wal"
+DB_SYNCHRONOUS = "normal"
+DB_CACHE_SIZE_KB = 16384         # Page cache per connection
+DB_MMAP_SIZE = 64 * 1024 * 1024  # Bytes of the file read through mmap
+DB_BUSY_TIMEOUT = 10             # Seconds SQLite waits for a lock
+DB_BUSY_RETRIES = 3              # Retries (with backoff) once the timeout expires
+
 # Logging
 LOG_LEVEL = "INFO"
 LOG_FILE = LOGS_DIR / "python_api.log"
@@ -32,6 +58,17 @@ DEFAULT_SEASON = "2025-2026"
 # Feature engineering settings
 ROLLING_WINDOWS = [3, 5, 10]
 CORRELATION_THRESHOLD = 0.95
+STREAK_NUMBA = False  # numba streak kernel (services/streak_kernels.py); ~0.5s import/JIT per process
+
+# Feature selection before training (see services/feature_selector.py):
+# drops features correlated above CORRELATION_THRESHOLD with a kept one and
+# features whose best per-market XGBoost gain share is <= this threshold
+FEATURE_SELECTION = True
+FEATURE_IMPORTANCE_THRESHOLD = 0.001
+
+# float32/categorical feature frames with only the columns models and
+# targets need (Predictor.historical_features, training row frames)
+COMPACT_FEATURE_FRAMES = True
 
 # Ensure directories exist
 LOGS_DIR.mkdir(parents=True, exist_ok=True)
@@ -43,6 +80,23 @@ ENSEMBLE_WEIGHTS = {
     'randomforest': 0.6
 }
 
+# Model loading (ModelManager)
+MODEL_CACHE_SIZE = 11     # Markets kept loaded (LRU); 11 = every market
+MODEL_MMAP_MODE = None    # e.g. 'r' to memory-map exported models / RF pickles
+MODEL_FORMAT = 'compact'  # 'compact': exported .trees dirs when present; 'pickle': always .pkl
+
+# Training (TrainingOrchestrator)
+TRAINING_CPU_BUDGET = None  # CPUs shared by parallel training jobs; None = all
+
+# Walk-forward backtest (Backtester)
+BACKTEST_RETRAIN_WEEKS = 1     # Matchweeks predicted per training run
+BACKTEST_MIN_TRAIN_ROWS = 760  # Skip weeks with less history (one season of team rows)
+BACKTEST_ODDS = 2.0            # Flat decimal odds for ROI until real odds are stored
+
+# Prediction accuracy metrics (MetricsTracker, collect_results.py)
+METRICS_CALIBRATION_BINS = 10   # Equal-width confidence bins of the calibration curve
+METRICS_MIN_RECOMMENDED = 30    # Matched predictions before a market can be recommended
+
 # Model Hyperparameters
 MODEL_PARAMS = {
     'xgboost': {
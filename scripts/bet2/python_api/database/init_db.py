@@ -2,6 +2,12 @@
 """
 Database Initialization Script
 Creates SQLite schema for prediction tracking
+
+The schema is versioned with numbered migrations (MIGRATIONS); the version
+applied to a database is kept in its PRAGMA user_version. Running this
+script creates a new database or brings an existing one up to date; every
+migration runs in its own transaction, so a failure leaves the database at
+the previous version. Safe to run repeatedly.
 """
 
 import sqlite3
@@ -14,11 +20,8 @@ PROJECT_ROOT = SCRIPT_DIR.parent.parent
 DB_PATH = SCRIPT_DIR / "predictions.db"
 
 
-def init_database():
-    """Initialize SQLite database with schema"""
-
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+def create_base_schema(cursor):
+    """Migration 1: tables and the original indexes"""
 
     # 1. PREDICTIONS TABLE - Store all predictions
     cursor.execute("""
@@ -180,11 +183,139 @@ def init_database():
     cursor.execute(
         "CREATE INDEX IF NOT EXISTS idx_metrics_market ON accuracy_metrics(market, model_type)")
 
-    conn.commit()
-    conn.close()
 
-    print(f"✅ Database initialized: {DB_PATH}")
-    print(f"📊 Tables created: predictions, actual_results, accuracy_metrics, market_performance")
+def add_match_columns(cursor):
+    """Migration 2: O/U 2.5 cards prediction and matched-result columns"""
+    columns = [
+        ('prediction_cards_25', 'TEXT'),
+        ('prob_cards_over_25', 'REAL'),
+        ('certainty_cards_25', 'REAL'),
+        ('actual_result', 'TEXT'),
+        ('actual_goals', 'REAL'),
+        ('actual_btts', 'INTEGER'),
+        ('actual_cards', 'REAL'),
+        ('correct_1x2', 'INTEGER DEFAULT 0'),
+        ('correct_goals_05', 'INTEGER DEFAULT 0'),
+        ('correct_goals_15', 'INTEGER DEFAULT 0'),
+        ('correct_goals_25', 'INTEGER DEFAULT 0'),
+        ('correct_goals_35', 'INTEGER DEFAULT 0'),
+        ('correct_btts', 'INTEGER DEFAULT 0'),
+        ('correct_cards_25', 'INTEGER DEFAULT 0'),
+        ('correct_cards_35', 'INTEGER DEFAULT 0'),
+        ('correct_cards_45', 'INTEGER DEFAULT 0'),
+        ('matched_date', 'DATETIME')
+    ]
+
+    # Databases created before versioning may already have some of them
+    existing = {row[1] for row in cursor.execute("PRAGMA table_info(predictions)")}
+    for name, definition in columns:
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE predictions ADD COLUMN {name} {definition}")
+
+
+def add_query_indexes(cursor):
+    """Migration 3: partial / covering indexes for the hot queries"""
+    # DatabaseService.get_unmatched_predictions: is_matched = 0, by prediction_date
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_predictions_unmatched
+        ON predictions(prediction_date) WHERE is_matched = 0
+    """)
+
+    # match_results.py: is_matched = 0 AND match_date IS NOT NULL
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_predictions_unmatched_dated
+        ON predictions(match_date) WHERE is_matched = 0 AND match_date IS NOT NULL
+    """)
+
+    # Dashboard accuracy queries: is_matched = 1, grouped by model
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_predictions_matched_model
+        ON predictions(model_type) WHERE is_matched = 1
+    """)
+
+    # DatabaseService.get_market_performance: answered from the index alone
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_metrics_period_market
+        ON accuracy_metrics(calculation_period, market,
+                            accuracy_pct, brier_score, total_roi_pct, total_predictions)
+    """)
+
+
+def add_metric_state(cursor):
+    """Migration 4: running metric statistics and the predictions folded into them"""
+    # MetricsTracker: additive statistics per (market, model_type), stored as JSON
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS metric_state (
+            market TEXT NOT NULL,
+            model_type TEXT NOT NULL,
+            state TEXT NOT NULL,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (market, model_type)
+        )
+    """)
+
+    existing = {row[1] for row in cursor.execute("PRAGMA table_info(predictions)")}
+    if 'metrics_folded' not in existing:
+        cursor.execute("ALTER TABLE predictions ADD COLUMN metrics_folded INTEGER DEFAULT 0")
+
+    # MetricsTracker.update: matched predictions not yet in metric_state
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_predictions_unfolded
+        ON predictions(id) WHERE is_matched = 1 AND metrics_folded = 0
+    """)
+
+
+# (version, description, migration) - append new migrations, never edit applied ones
+MIGRATIONS = [
+    (1, "base schema", create_base_schema),
+    (2, "cards O/U 2.5 and matched-result columns", add_match_columns),
+    (3, "partial and covering indexes for hot queries", add_query_indexes),
+    (4, "metric state and folded-prediction flag", add_metric_state),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def migrate(db_path: Path = DB_PATH) -> int:
+    """
+    Apply pending migrations to a database (created if missing)
+
+    Returns:
+        Schema version after migrating
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+
+        for number, description, migration in MIGRATIONS:
+            if number <= version:
+                continue
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                migration(conn.cursor())
+                conn.execute(f"PRAGMA user_version = {number}")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+            version = number
+            print(f"  ↳ Migration {number}: {description}")
+
+        # Refresh planner statistics for the new indexes
+        conn.execute("PRAGMA optimize")
+        return version
+    finally:
+        conn.close()
+
+
+def init_database():
+    """Initialize SQLite database with schema"""
+    version = migrate(DB_PATH)
+
+    print(f"✅ Database initialized: {DB_PATH} (schema version {version})")
+    print(f"📊 Tables created: predictions, actual_results, accuracy_metrics, market_performance, metric_state")
 
 
 if __name__ == "__main__":
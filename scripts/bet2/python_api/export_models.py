@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Export Models - Standalone Script
+Writes the compact flat-array copy (<model>.trees) of every trained model
+The training scripts do this automatically; run it for models trained earlier
+Usage: python export_models.py [competition] [--force]
+"""
+from services.compact_trees import export_directory
+import sys
+import json
+import logging
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    competition = args[0] if args else 'premier_league'
+    force = '--force' in sys.argv
+
+    try:
+        models_dir = Path(__file__).parent / 'models' / competition
+        if not models_dir.exists():
+            raise FileNotFoundError(f"No models for {competition}")
+
+        exported = export_directory(models_dir, force=force)
+
+        print(json.dumps({
+            "success": True,
+            "competition": competition,
+            "exported": [str(path.relative_to(models_dir)) for path in exported]
+        }, indent=2))
+
+    except Exception as e:
+        print(json.dumps({
+            "success": False,
+            "error": str(e)
+        }))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
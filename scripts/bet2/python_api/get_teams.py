@@ -3,8 +3,10 @@ Get Teams - Standalone Script
 Returns teams for a competition/season as JSON
 Called from PHP via exec()
 Usage: python get_teams.py <competition> <season>
+
+Reads the metadata index (services/metadata_index.py) instead of the
+season data, so it never imports pandas.
 """
-from services.data_loader import DataLoader
 import sys
 import json
 from pathlib import Path
@@ -12,12 +14,13 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from services.metadata_index import MetadataIndex
+
 
 def get_teams(competition, season):
     """Get teams for a competition and season"""
     try:
-        loader = DataLoader(competition)
-        teams = loader.get_team_list(season)
+        teams = MetadataIndex().teams(competition, season)
 
         # Format response
         teams_list = [
@@ -2,164 +2,172 @@
 """
 Auto-match predictions with actual results from CSV data
 Run this after data scraping to update prediction accuracy
+
+Single pass: every season the pending predictions need is loaded once
+(DataLoader), keyed by (team_name, opponent, date) and joined to all
+predictions in one merge; all updates are written in one transaction.
 """
 
-import sqlite3
 import pandas as pd
 from pathlib import Path
-from datetime import datetime
 import sys
 import json
 
+sys.path.insert(0, str(Path(__file__).parent))
+
+from services.data_loader import DataLoader
+from services.database_service import DatabaseService
+
+MATCH_KEY = ['team_name', 'opponent', 'date']
+MATCH_COLUMNS = MATCH_KEY + ['result', 'goals_for', 'goals_against', 'cards_yellow', 'cards_red']
+
+# Home team's result -> prediction_1x2 label
+RESULT_LABELS = {'W': 'Home Win', 'D': 'Draw', 'L': 'Away Win'}
+
+# Over/Under markets: (correctness column, prediction column, actual column, line)
+OVER_UNDER_MARKETS = [
+    ('correct_goals_05', 'prediction_goals_05', 'actual_goals', 0.5),
+    ('correct_goals_15', 'prediction_goals_15', 'actual_goals', 1.5),
+    ('correct_goals_25', 'prediction_goals_25', 'actual_goals', 2.5),
+    ('correct_goals_35', 'prediction_goals_35', 'actual_goals', 3.5),
+    ('correct_cards_25', 'prediction_cards_25', 'actual_cards', 2.5),
+    ('correct_cards_35', 'prediction_cards_35', 'actual_cards', 3.5),
+    ('correct_cards_45', 'prediction_cards_45', 'actual_cards', 4.5),
+]
+
+
+def season_of(match_date: pd.Timestamp) -> str:
+    """Season a match belongs to (seasons run August to May)"""
+    start = match_date.year if match_date.month >= 7 else match_date.year - 1
+    return f'{start}-{start + 1}'
+
+
+def load_matches(loader: DataLoader, seasons: list, errors: list) -> pd.DataFrame:
+    """Team-match rows of the seasons, one per (team_name, opponent, date), with total cards"""
+    frames = []
+    for season in seasons:
+        try:
+            frames.append(loader.load_season(season, columns=MATCH_COLUMNS))
+        except FileNotFoundError:
+            errors.append(f"CSV file not found for {season}")
+
+    if not frames:
+        return pd.DataFrame(
+            columns=MATCH_KEY + ['result', 'goals_for', 'goals_against', 'cards']
+        ).astype({'date': 'datetime64[ns]'})
+
+    matches = pd.concat(frames, ignore_index=True)
+    cards = pd.Series(0, index=matches.index)
+    for column in ['cards_yellow', 'cards_red']:
+        if column in matches:
+            cards += matches[column].fillna(0).astype(int)
+    matches['cards'] = cards
+
+    # First row wins for duplicated fixtures
+    return matches.drop_duplicates(MATCH_KEY)
+
+
+def resolve_outcomes(predictions: pd.DataFrame, matches: pd.DataFrame) -> pd.DataFrame:
+    """
+    Join predictions to their matches and score every market
+
+    Returns:
+        The predictions with a 'found' flag and, for found ones, the actual_*
+        and correct_* columns
+    """
+    df = predictions.copy()
+    df['date'] = pd.to_datetime(df['match_date'], errors='coerce')
+
+    # Home team's row: result, goals and its cards
+    home = matches.rename(columns={'team_name': 'home_team', 'opponent': 'away_team'})
+    df = df.merge(
+        home[['home_team', 'away_team', 'date', 'result', 'goals_for', 'goals_against', 'cards']],
+        on=['home_team', 'away_team', 'date'], how='left')
+
+    # Away team's row: its cards
+    away = matches.rename(columns={
+        'team_name': 'away_team', 'opponent': 'home_team', 'cards': 'cards_against'})
+    df = df.merge(away[['home_team', 'away_team', 'date', 'cards_against']],
+                  on=['home_team', 'away_team', 'date'], how='left')
+
+    df['found'] = df['result'].notna()
+    found = df[df['found']].copy()
+
+    goals_for = found['goals_for'].astype(int)
+    goals_against = found['goals_against'].astype(int)
+
+    found['actual_result'] = found['result'].map(RESULT_LABELS).fillna('Away Win')
+    found['actual_goals'] = goals_for + goals_against
+    found['actual_btts'] = ((goals_for > 0) & (goals_against > 0)).astype(int)
+    found['actual_cards'] = found['cards'].astype(int) + found['cards_against'].fillna(0).astype(int)
+
+    found['correct_1x2'] = (found['prediction_1x2'] == found['actual_result']).astype(int)
+    found['correct_btts'] = (
+        ((found['prediction_btts'] == 'Yes') & (found['actual_btts'] == 1)) |
+        ((found['prediction_btts'] == 'No') & (found['actual_btts'] == 0))
+    ).astype(int)
+    for correct, prediction, actual, line in OVER_UNDER_MARKETS:
+        found[correct] = (
+            ((found[prediction] == 'Over') & (found[actual] > line)) |
+            ((found[prediction] == 'Under') & (found[actual] <= line))
+        ).astype(int)
+
+    return pd.concat([found, df[~df['found']]]).sort_index()
+
+
 def match_results():
     """Match predictions with actual results from CSV data"""
-    
-    script_dir = Path(__file__).parent
-    db_path = script_dir / 'database' / 'predictions.db'
-    data_dir = script_dir.parent / 'data' / 'premier_league'
-    
+
     print("=" * 70)
     print("🔍 AUTO-MATCHING PREDICTIONS WITH ACTUAL RESULTS")
     print("=" * 70)
-    
-    # Connect to database
-    conn = sqlite3.connect(str(db_path))
-    cursor = conn.cursor()
-    
+
+    db = DatabaseService()
+
     # Get unmatched predictions with match_date set
-    cursor.execute("""
-        SELECT id, home_team, away_team, match_date, competition,
-               prediction_1x2, prediction_goals_05, prediction_goals_15, 
-               prediction_goals_25, prediction_goals_35,
-               prediction_btts, prediction_cards_25, prediction_cards_35, prediction_cards_45
-        FROM predictions 
-        WHERE is_matched = 0 AND match_date IS NOT NULL
-    """)
-    
-    predictions = cursor.fetchall()
+    predictions = db.get_dated_unmatched_predictions()
     print(f"\n📊 Found {len(predictions)} unmatched predictions with match dates set")
-    
+
     if len(predictions) == 0:
         print("✅ No predictions to match. All done!")
-        conn.close()
         return {'success': True, 'matched': 0, 'message': 'No predictions to match'}
-    
-    matched_count = 0
+
     errors = []
-    
-    for pred in predictions:
-        (pred_id, home, away, match_date, comp, 
-         pred_1x2, pred_g05, pred_g15, pred_g25, pred_g35,
-         pred_btts, pred_c25, pred_c35, pred_c45) = pred
-        
-        # Determine season from match_date
-        match_year = int(match_date.split('-')[0])
-        if match_year >= 2025:
-            season = '2025-2026'
-        elif match_year >= 2024:
-            season = '2024-2025'
-        else:
-            season = '2023-2024'
-        
-        csv_file = data_dir / f'{season}_all_teams.csv'
-        
-        if not csv_file.exists():
-            errors.append(f"CSV file not found for {season}")
-            continue
-        
-        # Load CSV data
-        df = pd.read_csv(csv_file)
-        
-        # Match by date and teams (home team perspective)
-        match_rows = df[
-            (df['team_name'] == home) &
-            (df['opponent'] == away) &
-            (df['date'] == match_date)
-        ]
-        
-        if match_rows.empty:
-            print(f"⚠️  No match found for {home} vs {away} on {match_date}")
+    predictions = pd.DataFrame(predictions)
+
+    # Each needed season is read once
+    dates = pd.to_datetime(predictions['match_date'], errors='coerce').dropna()
+    seasons = sorted({season_of(date) for date in dates})
+    matches = load_matches(DataLoader('premier_league'), seasons, errors)
+
+    df = resolve_outcomes(predictions, matches)
+
+    for row in df.itertuples():
+        if not row.found:
+            print(f"⚠️  No match found for {row.home_team} vs {row.away_team} on {row.match_date}")
             continue
-        
-        # Extract actual results
-        match_data = match_rows.iloc[0]
-        
-        # Determine actual result (from home team perspective)
-        result = match_data['result']  # 'W', 'D', 'L'
-        if result == 'W':
-            actual_result = 'Home Win'
-        elif result == 'D':
-            actual_result = 'Draw'
-        else:  # 'L'
-            actual_result = 'Away Win'
-        
-        # Calculate actual stats
-        goals_for = int(match_data['goals_for'])
-        goals_against = int(match_data['goals_against'])
-        actual_goals = goals_for + goals_against
-        actual_btts = 1 if (goals_for > 0 and goals_against > 0) else 0
-        
-        # Cards (yellow + red cards)
-        cards_for = int(match_data.get('cards_yellow', 0)) + int(match_data.get('cards_red', 0))
-        cards_against_row = df[
-            (df['team_name'] == away) &
-            (df['opponent'] == home) &
-            (df['date'] == match_date)
-        ]
-        if not cards_against_row.empty:
-            cards_against = int(cards_against_row.iloc[0].get('cards_yellow', 0)) + int(cards_against_row.iloc[0].get('cards_red', 0))
-        else:
-            cards_against = 0
-        
-        actual_cards = cards_for + cards_against
-        
-        # Calculate correctness for each prediction
-        correct_1x2 = 1 if pred_1x2 == actual_result else 0
-        correct_g05 = 1 if (pred_g05 == 'Over' and actual_goals > 0.5) or (pred_g05 == 'Under' and actual_goals <= 0.5) else 0
-        correct_g15 = 1 if (pred_g15 == 'Over' and actual_goals > 1.5) or (pred_g15 == 'Under' and actual_goals <= 1.5) else 0
-        correct_g25 = 1 if (pred_g25 == 'Over' and actual_goals > 2.5) or (pred_g25 == 'Under' and actual_goals <= 2.5) else 0
-        correct_g35 = 1 if (pred_g35 == 'Over' and actual_goals > 3.5) or (pred_g35 == 'Under' and actual_goals <= 3.5) else 0
-        correct_btts = 1 if (pred_btts == 'Yes' and actual_btts == 1) or (pred_btts == 'No' and actual_btts == 0) else 0
-        correct_c25 = 1 if (pred_c25 == 'Over' and actual_cards > 2.5) or (pred_c25 == 'Under' and actual_cards <= 2.5) else 0
-        correct_c35 = 1 if (pred_c35 == 'Over' and actual_cards > 3.5) or (pred_c35 == 'Under' and actual_cards <= 3.5) else 0
-        correct_c45 = 1 if (pred_c45 == 'Over' and actual_cards > 4.5) or (pred_c45 == 'Under' and actual_cards <= 4.5) else 0
-        
-        # Update database
-        cursor.execute("""
-            UPDATE predictions SET
-                actual_result = ?,
-                actual_goals = ?,
-                actual_btts = ?,
-                actual_cards = ?,
-                correct_1x2 = ?,
-                correct_goals_05 = ?,
-                correct_goals_15 = ?,
-                correct_goals_25 = ?,
-                correct_goals_35 = ?,
-                correct_btts = ?,
-                correct_cards_25 = ?,
-                correct_cards_35 = ?,
-                correct_cards_45 = ?,
-                is_matched = 1,
-                matched_date = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (actual_result, actual_goals, actual_btts, actual_cards,
-              correct_1x2, correct_g05, correct_g15, correct_g25, correct_g35,
-              correct_btts, correct_c25, correct_c35, correct_c45, pred_id))
-        
-        matched_count += 1
-        status = "✅" if correct_1x2 else "❌"
-        print(f"{status} {home} vs {away} ({match_date}) - Predicted: {pred_1x2}, Actual: {actual_result}")
-    
-    conn.commit()
-    conn.close()
-    
+        status = "✅" if row.correct_1x2 else "❌"
+        print(f"{status} {row.home_team} vs {row.away_team} ({row.match_date}) - "
+              f"Predicted: {row.prediction_1x2}, Actual: {row.actual_result}")
+
+    # Update database (one transaction)
+    outcome_columns = ['id', 'actual_result', 'actual_goals', 'actual_btts', 'actual_cards',
+                       'correct_1x2', 'correct_btts'] + [m[0] for m in OVER_UNDER_MARKETS]
+    outcomes = df.loc[df['found'], outcome_columns].astype(
+        {column: int for column in outcome_columns if column != 'actual_result'}
+    ).to_dict('records')
+
+    matched_count = db.save_match_outcomes(outcomes)
+    if matched_count != len(outcomes):
+        return {'success': False, 'matched': 0, 'error': 'Database update failed',
+                'errors': errors if errors else None}
+
     print("\n" + "=" * 70)
     print(f"✅ MATCHED {matched_count} PREDICTIONS")
     print("=" * 70)
-    
+
     return {
-        'success': True, 
+        'success': True,
         'matched': matched_count,
         'errors': errors if errors else None
     }
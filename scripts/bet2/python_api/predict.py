@@ -2,17 +2,74 @@
 """
 Predict Match - Standalone Script with Model Type Selection
 Usage: python predict.py <home_team> <away_team> [competition] [model_type]
+
+Forwards the request to the prediction server (prediction_server.py) when it
+is running; otherwise loads the models and predicts in-process.
 """
-from services.predictor import Predictor
-from services.model_manager import ModelManager
-from services.feature_engineering import FeatureEngineer
-from services.data_loader import DataLoader
 import sys
 import json
+import urllib.request
+import urllib.error
 import warnings
+from pathlib import Path
 warnings.filterwarnings('ignore')
 
-sys.path.insert(0, '.')
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import PREDICTION_SERVER_HOST, PREDICTION_SERVER_PORT, PREDICTION_SERVER_TIMEOUT
+
+
+def call_server(endpoint: str, payload: dict):
+    """POST a JSON payload to the prediction server; None if it is not reachable"""
+    request = urllib.request.Request(
+        f"http://{PREDICTION_SERVER_HOST}:{PREDICTION_SERVER_PORT}{endpoint}",
+        data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'}
+    )
+
+    try:
+        with urllib.request.urlopen(request, timeout=PREDICTION_SERVER_TIMEOUT) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        # Server is up but rejected the request (e.g. invalid model_type)
+        try:
+            return json.loads(e.read())
+        except ValueError:
+            return None
+    except (urllib.error.URLError, OSError, ValueError):
+        return None
+
+
+def predict_via_server(home_team: str, away_team: str, competition: str, model_type: str):
+    """Ask the running prediction server; None if it is not reachable"""
+    return call_server('/predict', {
+        "home_team": home_team,
+        "away_team": away_team,
+        "competition": competition,
+        "model_type": model_type
+    })
+
+
+def predict_in_process(home_team: str, away_team: str, competition: str, model_type: str):
+    """Load everything in this process (slow path, used when the server is down)"""
+    # Heavy imports only when actually needed
+    from services.predictor import Predictor
+    from services.model_manager import ModelManager
+    from services.feature_engineering import FeatureEngineer
+    from services.data_loader import DataLoader
+
+    # Initialize services with model_type
+    loader = DataLoader(competition)
+    engineer = FeatureEngineer(rolling_windows=[3, 5, 10])
+    manager = ModelManager(competition, model_type=model_type)
+    predictor = Predictor(manager, loader, engineer)
+
+    # Generate prediction
+    result = predictor.predict_match(home_team, away_team)
+
+    # Add model type to response
+    result['model_type'] = model_type
+    return result
 
 
 def main():
@@ -26,20 +83,17 @@ def main():
     home_team = sys.argv[1]
     away_team = sys.argv[2]
     competition = sys.argv[3] if len(sys.argv) > 3 else 'premier_league'
-    model_type = sys.argv[4] if len(sys.argv) > 4 else 'ensemble'  # NEW
+    model_type = sys.argv[4] if len(sys.argv) > 4 else 'ensemble'
 
     try:
-        # Initialize services with model_type
-        loader = DataLoader(competition)
-        engineer = FeatureEngineer(rolling_windows=[3, 5, 10])
-        manager = ModelManager(competition, model_type=model_type)  # CHANGED
-        predictor = Predictor(manager, loader, engineer)
-
-        # Generate prediction
-        result = predictor.predict_match(home_team, away_team)
+        result = predict_via_server(home_team, away_team, competition, model_type)
+        if result is None:
+            result = predict_in_process(home_team, away_team, competition, model_type)
 
-        # Add model type to response
-        result['model_type'] = model_type
+        if result.get('success') is False:
+            # Server-side failure (e.g. unknown team): same output and exit code as in-process
+            print(json.dumps(result))
+            sys.exit(1)
 
         # Output JSON
         print(json.dumps(result, indent=2))
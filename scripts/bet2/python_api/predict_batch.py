@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Predict Batch - Predict a full matchweek in one call
+Usage: python predict_batch.py <fixtures.json | -> [competition] [model_type]
+
+Fixtures file (or stdin with "-"), either form:
+    [["Arsenal", "Chelsea"], ["Everton", "Fulham"]]
+    [{"home_team": "Arsenal", "away_team": "Chelsea"}, ...]
+
+Output: {"success": true, "competition": ..., "model_type": ..., "count": N,
+         "predictions": [<same JSON as predict.py>, ...]}
+
+Uses the prediction server when it is running, otherwise predicts in-process.
+"""
+import sys
+import json
+import warnings
+from pathlib import Path
+warnings.filterwarnings('ignore')
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from predict import call_server
+
+
+def load_fixtures(source: str) -> list:
+    """Read fixtures as [{"home_team": ..., "away_team": ...}, ...]"""
+    if source == '-':
+        raw = json.load(sys.stdin)
+    else:
+        with open(source, 'r') as f:
+            raw = json.load(f)
+
+    fixtures = []
+    for item in raw:
+        if isinstance(item, dict):
+            fixtures.append({"home_team": item['home_team'], "away_team": item['away_team']})
+        else:
+            home_team, away_team = item
+            fixtures.append({"home_team": home_team, "away_team": away_team})
+    return fixtures
+
+
+def predict_in_process(fixtures: list, competition: str, model_type: str) -> dict:
+    """Load everything in this process (slow path, used when the server is down)"""
+    # Heavy imports only when actually needed
+    from services.predictor import Predictor
+    from services.model_manager import ModelManager
+    from services.feature_engineering import FeatureEngineer
+    from services.data_loader import DataLoader
+
+    loader = DataLoader(competition)
+    engineer = FeatureEngineer(rolling_windows=[3, 5, 10])
+    manager = ModelManager(competition, model_type=model_type)
+    predictor = Predictor(manager, loader, engineer)
+
+    results = predictor.predict_matches(
+        [(f['home_team'], f['away_team']) for f in fixtures])
+    for result in results:
+        result['model_type'] = model_type
+
+    return {
+        "success": True,
+        "competition": competition,
+        "model_type": model_type,
+        "count": len(results),
+        "predictions": results
+    }
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(json.dumps({
+            "success": False,
+            "error": "Usage: predict_batch.py <fixtures.json | -> [competition] [model_type]"
+        }))
+        sys.exit(1)
+
+    competition = sys.argv[2] if len(sys.argv) > 2 else 'premier_league'
+    model_type = sys.argv[3] if len(sys.argv) > 3 else 'ensemble'
+
+    try:
+        fixtures = load_fixtures(sys.argv[1])
+
+        result = call_server('/predict_batch', {
+            "fixtures": fixtures,
+            "competition": competition,
+            "model_type": model_type
+        })
+        if result is None:
+            result = predict_in_process(fixtures, competition, model_type)
+
+        if result.get('success') is False:
+            # Server-side failure: same output and exit code as in-process
+            print(json.dumps(result))
+            sys.exit(1)
+
+        # Output JSON
+        print(json.dumps(result, indent=2))
+
+    except Exception as e:
+        print(json.dumps({
+            "success": False,
+            "error": str(e)
+        }))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
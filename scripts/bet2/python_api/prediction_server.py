@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Prediction Server - Long-lived Predictor process
+Keeps models and historical features in memory so each prediction only
+pays for the model evaluation (predict.py forwards requests here)
+
+Usage: python prediction_server.py [host] [port]
+
+Endpoints:
+    GET  /health   -> {"success": true, "loaded": ["premier_league/ensemble", ...],
+                       "model_bytes": {"premier_league/ensemble": {market: bytes}},
+                       "feature_bytes": {"premier_league/ensemble": bytes}}
+    POST /predict  <- {"home_team": ..., "away_team": ...,
+                       "competition": "premier_league", "model_type": "ensemble"}
+                   -> same JSON as predict.py
+    POST /predict_batch <- {"fixtures": [{"home_team": ..., "away_team": ...}, ...],
+                            "competition": ..., "model_type": ...}
+                        -> same JSON as predict_batch.py
+"""
+from services.predictor import Predictor
+from services.model_manager import ModelManager
+from services.feature_engineering import FeatureEngineer, assembly_plan_hash
+from services.data_loader import DataLoader
+from config import PREDICTION_SERVER_HOST, PREDICTION_SERVER_PORT, PREDICTION_SERVER_RELOAD_CHECK
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+import sys
+import json
+import logging
+import threading
+import time
+import warnings
+from pathlib import Path
+warnings.filterwarnings('ignore')
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+MODEL_TYPES = ['xgboost', 'randomforest', 'ensemble']
+
+
+class PredictorPool:
+    """
+    Warm Predictor per (competition, model_type)
+
+    A Predictor is rebuilt when a season file, a model file or the assembly
+    plan changes, so data updates and retraining are picked up without
+    restarting the server. A Predictor whose models were checked against
+    another plan than the one on disk is never reused.
+    Files are scanned at most every `check_interval` seconds per predictor,
+    outside the pool lock.
+    """
+
+    def __init__(self, check_interval: float = PREDICTION_SERVER_RELOAD_CHECK):
+        # (competition, model_type) -> (signature, predictor, monotonic time of last check)
+        self.predictors: Dict[Tuple[str, str], Tuple[tuple, Predictor, float]] = {}
+        self.lock = threading.Lock()
+        self.check_interval = check_interval
+
+    def get(self, competition: str, model_type: str) -> Predictor:
+        """Return an up-to-date Predictor, loading it on first use"""
+        key = (competition, model_type)
+
+        with self.lock:
+            cached = self.predictors.get(key)
+        if cached is not None:
+            signature, predictor, checked = cached
+            if time.monotonic() - checked < self.check_interval:
+                return predictor
+            if self._reusable(predictor, signature):
+                with self.lock:
+                    if self.predictors.get(key) is cached:
+                        self.predictors[key] = (signature, predictor, time.monotonic())
+                return predictor
+
+        with self.lock:
+            current = self.predictors.get(key)
+            if current is not None and current is not cached:
+                # Another request reloaded it meanwhile
+                return current[1]
+
+            # Signature is taken before loading, so changes made during the
+            # load trigger another reload on the next check
+            loader = DataLoader(competition)
+            manager = ModelManager(competition, model_type=model_type)
+            signature = self._signature(loader, manager)
+
+            logger.info(f"Loading predictor for {competition}/{model_type}...")
+            engineer = FeatureEngineer(rolling_windows=[3, 5, 10])
+            predictor = Predictor(manager, loader, engineer)
+
+            self.predictors[key] = (signature, predictor, time.monotonic())
+            return predictor
+
+    def loaded(self) -> list:
+        return [f"{competition}/{model_type}"
+                for competition, model_type in self.predictors]
+
+    def model_bytes(self) -> Dict[str, Dict[str, int]]:
+        """Resident model bytes per market, per loaded predictor"""
+        with self.lock:
+            return {
+                f"{competition}/{model_type}": {
+                    market: sum(members.values())
+                    for market, members in predictor.model_manager.memory_report().items()
+                }
+                for (competition, model_type), (_, predictor, _) in self.predictors.items()
+            }
+
+    def feature_bytes(self) -> Dict[str, int]:
+        """Deep memory of the historical feature frame, per loaded predictor"""
+        with self.lock:
+            return {
+                f"{competition}/{model_type}":
+                    int(predictor.historical_features.memory_usage(deep=True).sum())
+                for (competition, model_type), (_, predictor, _) in self.predictors.items()
+            }
+
+    def _reusable(self, predictor: Predictor, signature: tuple) -> bool:
+        """Files unchanged, and the plan on disk is the one its models were checked against"""
+        current = self._signature(predictor.data_loader, predictor.model_manager)
+        return current == signature and current[-1] == predictor.model_manager.plan_hash
+
+    @staticmethod
+    def _signature(loader: DataLoader, manager: ModelManager) -> tuple:
+        """(path, mtime_ns, size) of every season source, model and plan file; plan hash last"""
+        signature = [loader.source_fingerprint(season)
+                     for season in loader.get_available_seasons()]
+
+        files = []
+        if manager.models_dir.exists():
+            files += sorted(manager.models_dir.rglob('*.pkl'))
+            files += sorted(manager.models_dir.rglob('*.trees/meta.json'))
+            files += [path for path in [manager.models_dir / 'assembly_plan.json',
+                                        manager.models_dir / 'feature_selection.json']
+                      if path.exists()]
+
+        for path in files:
+            stat = path.stat()
+            signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+
+        plan_path = manager.models_dir / 'assembly_plan.json'
+        plan_hash = None
+        if plan_path.exists():
+            with open(plan_path, 'r') as f:
+                plan_hash = assembly_plan_hash(json.load(f))
+        return tuple(signature) + (plan_hash,)
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    """JSON request handler (pool is attached to the server)"""
+
+    def do_GET(self):
+        if self.path != '/health':
+            self._send_json(404, {"success": False, "error": "Not found"})
+            return
+
+        self._send_json(200, {
+            "success": True,
+            "loaded": self.server.pool.loaded(),
+            "model_bytes": self.server.pool.model_bytes(),
+            "feature_bytes": self.server.pool.feature_bytes()
+        })
+
+    def do_POST(self):
+        if self.path not in ('/predict', '/predict_batch'):
+            self._send_json(404, {"success": False, "error": "Not found"})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            if self.path == '/predict':
+                fixtures = [(request['home_team'], request['away_team'])]
+            else:
+                fixtures = [(f['home_team'], f['away_team']) for f in request['fixtures']]
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"success": False, "error": f"Invalid request: {e}"})
+            return
+
+        competition = request.get('competition') or 'premier_league'
+        model_type = request.get('model_type') or 'ensemble'
+
+        if model_type not in MODEL_TYPES:
+            self._send_json(400, {
+                "success": False,
+                "error": f"Invalid model_type: {model_type}. Must be one of {MODEL_TYPES}"
+            })
+            return
+
+        try:
+            predictor = self.server.pool.get(competition, model_type)
+            results = predictor.predict_matches(fixtures)
+            for result in results:
+                result['model_type'] = model_type
+        except Exception as e:
+            logger.error(f"Prediction request failed: {e}", exc_info=True)
+            self._send_json(200, {"success": False, "error": str(e)})
+            return
+
+        if self.path == '/predict':
+            self._send_json(200, results[0])
+        else:
+            self._send_json(200, {
+                "success": True,
+                "competition": competition,
+                "model_type": model_type,
+                "count": len(results),
+                "predictions": results
+            })
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def main():
+    host = sys.argv[1] if len(sys.argv) > 1 else PREDICTION_SERVER_HOST
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else PREDICTION_SERVER_PORT
+
+    server = ThreadingHTTPServer((host, port), PredictionHandler)
+    server.daemon_threads = True
+    server.pool = PredictorPool()
+
+    # Warm the default predictor so the first request is fast
+    try:
+        server.pool.get('premier_league', 'ensemble')
+    except Exception as e:
+        logger.warning(f"Could not preload default predictor: {e}")
+
+    logger.info(f"Prediction server listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,13 @@
 """
 Save Prediction to Database
 Called from PHP after generating prediction
+
+Usage:
+    python save_prediction_to_db.py '<prediction json>'
+    python save_prediction_to_db.py --stdin < predictions.ndjson
+
+--stdin reads one prediction JSON object per line and saves them all in a
+single transaction (one process launch and one commit per matchweek).
 """
 
 from services.database_service import DatabaseService
@@ -12,15 +19,41 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 
+def read_ndjson(stream) -> list:
+    """Predictions from NDJSON lines (blank lines skipped)"""
+    predictions = []
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            predictions.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+    return predictions
+
+
 def main():
     if len(sys.argv) < 2:
         print(json.dumps({'success': False, 'error': 'No data provided'}))
         sys.exit(1)
 
     try:
+        db = DatabaseService()
+
+        if sys.argv[1] == '--stdin':
+            predictions = read_ndjson(sys.stdin)
+            saved = db.save_predictions(predictions)
+
+            if saved == len(predictions):
+                print(json.dumps({'success': True, 'message': f'{saved} predictions saved',
+                                  'saved': saved}))
+            else:
+                print(json.dumps(
+                    {'success': False, 'error': 'Database save failed'}))
+            return
+
         data = json.loads(sys.argv[1])
 
-        db = DatabaseService()
         success = db.save_prediction(data)
 
         if success:
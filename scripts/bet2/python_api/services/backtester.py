@@ -0,0 +1,288 @@
+"""
+Backtester Service
+Walk-forward backtest: replay each matchweek, train on everything before it
+
+For every fold (a block of `retrain_every` matchweeks) the XGBoost and
+Random Forest models of each market are trained on all rows dated before the
+block's first fixture and then predict every fixture of the block in batch.
+Features come from the MatrixCache, so they are computed once for all folds;
+the cached float32 matrix is memory-mapped by the worker processes, and
+folds run in parallel.
+
+Match-level markets (1X2, goals, total cards) are scored on the home-team
+row of each fixture; team cards on both rows. ROI assumes a 1-unit bet on
+the predicted outcome at flat decimal odds (config.BACKTEST_ODDS), the same
+simplification collect_results.py uses until real odds are available.
+"""
+import numpy as np
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import (
+    ENSEMBLE_WEIGHTS, TRAINING_CPU_BUDGET,
+    BACKTEST_RETRAIN_WEEKS, BACKTEST_MIN_TRAIN_ROWS, BACKTEST_ODDS
+)
+from services.data_loader import DataLoader
+from services.feature_engineering import FeatureEngineer
+from services.matrix_cache import MatrixCache, matrix_file
+from services.training_orchestrator import (
+    market_targets, model_params, build_model, load_tuned_params
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Backtester:
+    """
+    Walk-forward backtest over historical matchweeks
+
+    Usage:
+        backtester = Backtester('premier_league', retrain_every=1)
+        report = backtester.run(seasons=['2024-2025'])
+        report['markets']['goals/over_2_5']['ensemble']['brier']
+    """
+
+    ALGORITHMS = ['xgboost', 'randomforest']
+
+    def __init__(
+        self,
+        competition: str = 'premier_league',
+        groups: Optional[List[str]] = None,
+        retrain_every: int = BACKTEST_RETRAIN_WEEKS,
+        min_train_rows: int = BACKTEST_MIN_TRAIN_ROWS,
+        odds: float = BACKTEST_ODDS,
+        cpu_budget: Optional[int] = TRAINING_CPU_BUDGET
+    ):
+        """
+        Initialize Backtester
+
+        Args:
+            competition: Competition name (e.g., 'premier_league')
+            groups: Market groups to backtest (default: match_result, goals, cards)
+            retrain_every: Matchweeks predicted per training run (1 = every week)
+            min_train_rows: Skip weeks with fewer training rows before them
+            odds: Flat decimal odds used for ROI
+            cpu_budget: CPUs shared by all folds (None = all available)
+        """
+        self.competition = competition
+        self.groups = groups or ['match_result', 'goals', 'cards']
+        self.retrain_every = max(1, retrain_every)
+        self.min_train_rows = min_train_rows
+        self.odds = odds
+        self.cpu_budget = max(1, cpu_budget or os.cpu_count() or 1)
+
+        self.feature_engineer = FeatureEngineer(rolling_windows=[3, 5, 10])
+        self.matrix = None
+        self.df = None
+
+    def prepare(self):
+        """Load the cached matrix once (every row, in date order)"""
+        cache = MatrixCache(DataLoader(self.competition), self.feature_engineer)
+        self.matrix = cache.load(min_match_number=0)
+        self.df = self.matrix['rows']
+        logger.info(f"Loaded {len(self.df)} rows for backtesting")
+
+    def build_folds(self, seasons: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Blocks of consecutive matchweeks with their training/test rows
+
+        Args:
+            seasons: Seasons to replay (default: every season)
+
+        Returns:
+            [{'weeks': [(season, round), ...], 'cutoff': Timestamp,
+              'train': row indices, 'test': row indices}, ...]
+        """
+        if self.df is None:
+            self.prepare()
+
+        df = self.df
+        weeks = df.groupby(['season', 'round'], sort=False)['date'].min().sort_values()
+        if seasons:
+            weeks = weeks[weeks.index.get_level_values('season').isin(seasons)]
+
+        # Same filter as training: skip each team's first matches
+        trainable = (df['match_number'] >= 5).values
+        dates = df['date'].values
+        week_keys = (df['season'].astype(str) + '|' + df['round'].astype(str)).values
+
+        folds = []
+        keys = list(weeks.index)
+        for start in range(0, len(keys), self.retrain_every):
+            block = keys[start:start + self.retrain_every]
+            cutoff = weeks[block[0]]
+
+            train = np.flatnonzero(trainable & (dates < cutoff.to_datetime64()))
+            if len(train) < self.min_train_rows:
+                continue
+
+            test = np.flatnonzero(np.isin(week_keys, [f'{season}|{name}' for season, name in block]))
+            folds.append({'weeks': block, 'cutoff': cutoff, 'train': train, 'test': test})
+
+        return folds
+
+    def run(self, seasons: Optional[List[str]] = None) -> Dict:
+        """
+        Run all folds and score every market
+
+        Returns:
+            {'competition', 'folds', 'weeks', 'fixtures', 'seconds',
+             'markets': {label: {member: {'n', 'accuracy', 'brier', 'log_loss', 'roi_pct'}}}}
+        """
+        folds = self.build_folds(seasons)
+        if not folds:
+            raise ValueError("No matchweeks to backtest (not enough training history)")
+
+        tuned = load_tuned_params(self.competition)
+        markets = []
+        for (group, name), (family, y) in market_targets(self.df, self.groups).items():
+            markets.append({
+                'group': group,
+                'name': name,
+                'family': family,
+                'tuned': tuned.get(group if name is None else f'{group}/{name}'),
+                'y': y,
+                # Team cards are per team; everything else is one row per fixture
+                'rows': 'all' if name and name.startswith('team_cards') else 'home'
+            })
+
+        processes = min(self.cpu_budget, len(folds))
+        threads = max(1, self.cpu_budget // processes)
+        logger.info(f"Backtesting {len(folds)} folds ({sum(len(f['weeks']) for f in folds)} weeks): "
+                    f"{processes} processes x {threads} threads")
+
+        home = (self.df['venue'] == 'Home').values
+        started = time.perf_counter()
+
+        with matrix_file(self.matrix) as path:
+            jobs = [{'fold': fold, 'markets': markets, 'home': home, 'threads': threads}
+                    for fold in folds]
+            if processes == 1:
+                outcomes = [run_fold(job, path) for job in jobs]
+            else:
+                with ProcessPoolExecutor(max_workers=processes) as pool:
+                    outcomes = list(pool.map(run_fold, jobs, [path] * len(jobs)))
+
+        seconds = time.perf_counter() - started
+        logger.info(f"Backtest finished in {seconds:.1f}s")
+
+        return {
+            'competition': self.competition,
+            'folds': len(folds),
+            'weeks': sum(len(fold['weeks']) for fold in folds),
+            'fixtures': int(sum(home[fold['test']].sum() for fold in folds)),
+            'retrain_every': self.retrain_every,
+            'odds': self.odds,
+            'seconds': round(seconds, 1),
+            'markets': self._score(outcomes)
+        }
+
+    def log_summary(self, report: Dict):
+        """Brier / log-loss / ROI per market and member"""
+        logger.info("=" * 80)
+        logger.info(f"{report['weeks']} matchweeks, {report['fixtures']} fixtures, "
+                    f"{report['folds']} training runs")
+        for label, members in report['markets'].items():
+            logger.info(f"  {label}")
+            for member, m in members.items():
+                logger.info(f"    {member:<13} n={m['n']:<5} acc={m['accuracy']:.4f} "
+                            f"brier={m['brier']:.4f} logloss={m['log_loss']:.4f} "
+                            f"roi={m['roi_pct']:+.1f}%")
+        logger.info("=" * 80)
+
+    def _score(self, outcomes: List[Dict]) -> Dict:
+        """Pool fold predictions per market and compute the metrics"""
+        report = {}
+
+        for label in dict.fromkeys(label for outcome in outcomes for label in outcome):
+            parts = [outcome[label] for outcome in outcomes if label in outcome]
+            y = np.concatenate([part['y'] for part in parts])
+            probabilities = {member: np.concatenate([part[member] for part in parts])
+                             for member in self.ALGORITHMS}
+
+            total = sum(ENSEMBLE_WEIGHTS[member] for member in self.ALGORITHMS)
+            probabilities['ensemble'] = sum(
+                ENSEMBLE_WEIGHTS[member] / total * probabilities[member]
+                for member in self.ALGORITHMS)
+
+            report[label] = {member: score_probabilities(y, proba, self.odds)
+                             for member, proba in probabilities.items()}
+
+        return report
+
+
+def run_fold(job: Dict, matrix_path: Path) -> Dict:
+    """
+    Train on the fold's history and predict its matchweeks (runs in a worker)
+
+    Returns:
+        {label: {'y': outcomes, 'xgboost': proba, 'randomforest': proba}}
+    """
+    X = np.load(matrix_path, mmap_mode='r')
+    fold = job['fold']
+    train = fold['train']
+    results = {}
+
+    for market in job['markets']:
+        label = market['group'] if market['name'] is None else f"{market['group']}/{market['name']}"
+        test = fold['test'] if market['rows'] == 'all' else fold['test'][job['home'][fold['test']]]
+
+        y_train = market['y'][train]
+        n_classes = 3 if market['group'] == 'match_result' else 2
+        if len(test) == 0 or len(np.unique(y_train)) < n_classes:
+            continue
+
+        predictions = {'y': market['y'][test].astype(int)}
+        for algorithm in Backtester.ALGORITHMS:
+            params = model_params(market['group'], market['family'], algorithm, market['tuned'])
+            params['n_jobs'] = job['threads']
+
+            model = build_model(algorithm, params)
+            model.fit(X[train], y_train)
+            predictions[algorithm] = model.predict_proba(X[test])
+
+        results[label] = predictions
+
+    logger.info(f"Fold {fold['weeks'][0][0]} {fold['weeks'][0][1]}"
+                f"{' +' + str(len(fold['weeks']) - 1) if len(fold['weeks']) > 1 else ''}: "
+                f"{len(train)} training rows")
+    return results
+
+
+def score_probabilities(y: np.ndarray, proba: np.ndarray, odds: float) -> Dict:
+    """
+    Accuracy, Brier score, log-loss and flat-odds ROI of class probabilities
+
+    Args:
+        y: True class per row (0..n_classes-1)
+        proba: (n_rows, n_classes) probabilities
+        odds: Decimal odds for a 1-unit bet on the predicted class
+
+    Returns:
+        {'n', 'accuracy', 'brier', 'log_loss', 'roi_pct'}
+    """
+    y = np.asarray(y, dtype=int)
+    n = len(y)
+    one_hot = np.zeros_like(proba)
+    one_hot[np.arange(n), y] = 1.0
+
+    if proba.shape[1] == 2:
+        # Binary Brier on the positive class (sklearn's brier_score_loss)
+        brier = float(np.mean((proba[:, 1] - y) ** 2))
+    else:
+        brier = float(np.mean(np.sum((proba - one_hot) ** 2, axis=1)))
+
+    log_loss = float(-np.mean(np.log(np.clip(proba[np.arange(n), y], 1e-15, 1.0))))
+    wins = int((np.argmax(proba, axis=1) == y).sum())
+
+    return {
+        'n': n,
+        'accuracy': wins / n,
+        'brier': brier,
+        'log_loss': log_loss,
+        'roi_pct': (wins * odds - n) / n * 100
+    }
@@ -0,0 +1,377 @@
+"""
+Compact Trees Service
+Flat-array export of tree ensembles and a NumPy evaluator for serving
+
+A model is exported to a directory next to its pickle
+(e.g. goals/btts_xgboost.pkl -> goals/btts_xgboost.trees/) holding plain
+.npy arrays plus meta.json, so it can be loaded without sklearn/xgboost and
+memory-mapped (mmap_mode='r') to share pages between worker processes.
+
+Supported models:
+- sklearn RandomForestClassifier  (kind 'forest',  x <= threshold goes left)
+- xgboost XGBClassifier           (kind 'gbtree',  x <  threshold goes left)
+  with binary:logistic or multi:softprob/multi:softmax objectives
+"""
+import numpy as np
+import logging
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+ARRAYS = ['feature', 'threshold', 'left', 'right', 'default_left', 'value', 'roots', 'tree_group']
+
+
+class CompactTreeModel:
+    """
+    Tree ensemble stored as concatenated node arrays
+
+    All trees share one set of node arrays; `roots` gives each tree's first
+    node. Leaves point to themselves, so every row walks `max_depth` steps
+    with a few vectorized gathers and no per-node branching.
+
+    Usage:
+        model = CompactTreeModel.load('models/premier_league/goals/btts_xgboost.trees')
+        proba = model.predict_proba(X)
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict):
+        self.arrays = arrays
+        self.meta = meta
+
+        self.kind = meta['kind']
+        self.max_depth = meta['max_depth']
+        self.classes_ = np.array(meta['classes'])
+        self.n_classes_ = len(self.classes_)
+        self.n_features_in_ = meta['n_features']
+        if meta.get('feature_names'):
+            self.feature_names_in_ = np.array(meta['feature_names'], dtype=object)
+        self.assembly_plan_hash = meta.get('assembly_plan_hash')
+        self.base_margin = np.array(meta.get('base_margin', [0.0]), dtype=np.float64)
+        self.objective = meta.get('objective')
+        self.go_left_when_equal = meta['comparison'] == 'le'
+
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def load(cls, path, mmap_mode: Optional[str] = None) -> 'CompactTreeModel':
+        """
+        Load an exported model directory
+
+        Args:
+            path: Directory written by export_model()
+            mmap_mode: Passed to np.load (e.g. 'r' to share pages across processes)
+        """
+        path = Path(path)
+        with open(path / 'meta.json', 'r') as f:
+            meta = json.load(f)
+
+        if meta.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compact model version in {path}")
+
+        arrays = {name: np.load(path / f'{name}.npy', mmap_mode=mmap_mode)
+                  for name in ARRAYS}
+        return cls(arrays, meta)
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(array.nbytes for array in self.arrays.values()))
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node index for every (row, tree)"""
+        X = self._validate(X)
+
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+
+        for _ in range(self.max_depth):
+            values = X[rows, self.feature[nodes]]
+            thresholds = self.threshold[nodes]
+
+            if self.go_left_when_equal:
+                go_left = values <= thresholds
+            else:
+                go_left = values < thresholds
+
+            missing = np.isnan(values)
+            if missing.any():
+                go_left = np.where(missing, self.default_left[nodes], go_left)
+
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return nodes
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities, same layout as the original model's predict_proba"""
+        leaves = self.apply(X)
+
+        if self.kind == 'forest':
+            # Mean of the per-tree (normalized) leaf distributions
+            return self.value[leaves].sum(axis=1) / leaves.shape[1]
+
+        # Gradient boosting: sum leaf margins per output group
+        n_groups = len(self.base_margin)
+        leaf_values = self.value[leaves, 0]
+        margin = np.tile(self.base_margin, (leaves.shape[0], 1))
+        for group in range(n_groups):
+            margin[:, group] += leaf_values[:, self.tree_group == group].sum(axis=1)
+
+        if n_groups == 1:
+            positive = 1.0 / (1.0 + np.exp(-margin[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+
+        margin -= margin.max(axis=1, keepdims=True)
+        exp = np.exp(margin)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def _validate(self, X) -> np.ndarray:
+        """float32 2-D input of the trained width (and column order, when both are named)"""
+        names = getattr(X, 'columns', None)
+        known = getattr(self, 'feature_names_in_', None)
+        if names is not None and known is not None and list(names) != list(known):
+            raise ValueError(
+                "The feature names should match those that were passed during fit "
+                f"({self.meta.get('source', 'model')})")
+
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but {self.meta.get('source', 'the model')} "
+                f"is expecting {self.n_features_in_} features as input.")
+        return X
+
+
+# ----------------------------------------------------------------------
+# Export
+# ----------------------------------------------------------------------
+
+def export_model(model, path) -> Path:
+    """
+    Write a fitted RandomForestClassifier or XGBClassifier as a compact model
+
+    Args:
+        model: Fitted model
+        path: Output directory (replaced atomically)
+
+    Returns:
+        Output directory
+    """
+    if hasattr(model, 'get_booster'):
+        arrays, meta = _flatten_xgboost(model)
+    elif hasattr(model, 'estimators_') and hasattr(model.estimators_[0], 'tree_'):
+        arrays, meta = _flatten_forest(model)
+    else:
+        raise ValueError(f"Cannot export model of type {type(model).__name__}")
+
+    meta['format_version'] = FORMAT_VERSION
+    meta['source'] = type(model).__name__
+    if getattr(model, 'assembly_plan_hash', None):
+        # Set by the trainers (see ModelManager._check_plan)
+        meta['assembly_plan_hash'] = model.assembly_plan_hash
+
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    if tmp_path.exists():
+        shutil.rmtree(tmp_path)
+    tmp_path.mkdir(parents=True)
+
+    for name in ARRAYS:
+        np.save(tmp_path / f'{name}.npy', np.ascontiguousarray(arrays[name]))
+    with open(tmp_path / 'meta.json', 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    if path.exists():
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+
+    logger.info(f"Exported {meta['source']} ({len(arrays['roots'])} trees) to {path}")
+    return path
+
+
+def export_directory(models_dir, force: bool = False) -> List[Path]:
+    """
+    Export every model pickle under models_dir whose compact copy is missing or stale
+
+    Args:
+        models_dir: Directory searched recursively for *.pkl
+        force: Re-export even if the compact copy is up to date
+
+    Returns:
+        Exported directories
+    """
+    import joblib
+
+    exported = []
+    for pkl_path in sorted(Path(models_dir).rglob('*.pkl')):
+        compact_path = pkl_path.with_suffix('.trees')
+        meta_path = compact_path / 'meta.json'
+
+        if not force and meta_path.exists() and \
+                meta_path.stat().st_mtime_ns >= pkl_path.stat().st_mtime_ns:
+            continue
+
+        try:
+            exported.append(export_model(joblib.load(pkl_path), compact_path))
+        except ValueError as e:
+            logger.warning(f"Skipping {pkl_path}: {e}")
+
+    return exported
+
+
+def _concatenate(trees: List[Dict[str, np.ndarray]], n_outputs: int) -> Dict[str, np.ndarray]:
+    """Stack per-tree node arrays, offsetting child indices; leaves point to themselves"""
+    offsets = np.cumsum([0] + [len(tree['feature']) for tree in trees])
+
+    arrays = {name: [] for name in ['feature', 'threshold', 'left', 'right', 'default_left', 'value']}
+    for tree, offset in zip(trees, offsets[:-1]):
+        n_nodes = len(tree['feature'])
+        own = np.arange(n_nodes) + offset
+        leaf = tree['left'] < 0
+
+        arrays['feature'].append(np.where(leaf, 0, tree['feature']))
+        arrays['threshold'].append(np.where(leaf, 0.0, tree['threshold']))
+        arrays['left'].append(np.where(leaf, own, tree['left'] + offset))
+        arrays['right'].append(np.where(leaf, own, tree['right'] + offset))
+        arrays['default_left'].append(tree['default_left'])
+        arrays['value'].append(tree['value'].reshape(n_nodes, n_outputs))
+
+    return {
+        'feature': np.concatenate(arrays['feature']).astype(np.int32),
+        'threshold': np.concatenate(arrays['threshold']).astype(np.float64),
+        'left': np.concatenate(arrays['left']).astype(np.int32),
+        'right': np.concatenate(arrays['right']).astype(np.int32),
+        'default_left': np.concatenate(arrays['default_left']).astype(bool),
+        'value': np.concatenate(arrays['value']).astype(np.float64),
+        'roots': offsets[:-1].astype(np.int32)
+    }
+
+
+def _depth(left: np.ndarray, right: np.ndarray) -> int:
+    """Maximum root-to-leaf depth of one tree"""
+    depth = np.zeros(len(left), dtype=np.int64)
+    max_depth = 0
+    for node in range(len(left)):
+        if left[node] >= 0:
+            depth[left[node]] = depth[right[node]] = depth[node] + 1
+            max_depth = max(max_depth, int(depth[node]) + 1)
+    return max_depth
+
+
+def _flatten_forest(model):
+    n_classes = int(model.n_classes_)
+    trees = []
+    max_depth = 0
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        value = tree.value[:, 0, :n_classes].astype(np.float64)
+        normalizer = value.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+
+        nodes = tree.__getstate__()['nodes']
+        default_left = nodes['missing_go_to_left'].astype(bool) \
+            if 'missing_go_to_left' in nodes.dtype.names \
+            else np.zeros(tree.node_count, dtype=bool)
+
+        trees.append({
+            'feature': tree.feature,
+            'threshold': tree.threshold,
+            'left': tree.children_left,
+            'right': tree.children_right,
+            'default_left': default_left,
+            'value': value / normalizer
+        })
+        max_depth = max(max_depth, int(tree.max_depth))
+
+    arrays = _concatenate(trees, n_classes)
+    arrays['tree_group'] = np.zeros(len(trees), dtype=np.int32)
+
+    meta = {
+        'kind': 'forest',
+        'comparison': 'le',
+        'max_depth': max_depth,
+        'n_features': int(model.n_features_in_),
+        'classes': model.classes_.tolist()
+    }
+    if hasattr(model, 'feature_names_in_'):
+        meta['feature_names'] = [str(name) for name in model.feature_names_in_]
+    return arrays, meta
+
+
+def _flatten_xgboost(model):
+    booster = model.get_booster()
+    config = json.loads(booster.save_config())
+    objective = config['learner']['objective']['name']
+    raw = json.loads(booster.save_raw('json'))
+    gbtree = raw['learner']['gradient_booster']['model']
+
+    base_score = np.atleast_1d(np.array(
+        json.loads(config['learner']['learner_model_param']['base_score']), dtype=np.float64))
+    n_groups = max(int(config['learner']['learner_model_param']['num_class']), 1)
+
+    if objective == 'binary:logistic':
+        base_margin = np.log(base_score / (1.0 - base_score))
+    elif objective in ('multi:softprob', 'multi:softmax'):
+        base_margin = base_score
+    else:
+        raise ValueError(f"Unsupported XGBoost objective: {objective}")
+
+    if len(base_margin) != n_groups:
+        base_margin = np.resize(base_margin, n_groups)
+
+    # Trees used by predict_proba (early stopping keeps the best iteration only)
+    tree_defs = gbtree['trees']
+    tree_info = gbtree['tree_info']
+    best_iteration = getattr(model, 'best_iteration', None) \
+        if hasattr(model, 'best_iteration') else None
+    if best_iteration is not None and gbtree.get('iteration_indptr'):
+        n_trees = gbtree['iteration_indptr'][best_iteration + 1]
+        tree_defs, tree_info = tree_defs[:n_trees], tree_info[:n_trees]
+
+    trees = []
+    max_depth = 0
+    for tree in tree_defs:
+        if any(tree.get('split_type', [])):
+            raise ValueError("Categorical splits are not supported")
+
+        left = np.array(tree['left_children'], dtype=np.int64)
+        right = np.array(tree['right_children'], dtype=np.int64)
+        conditions = np.array(tree['split_conditions'], dtype=np.float32)
+
+        trees.append({
+            'feature': np.array(tree['split_indices'], dtype=np.int64),
+            # Split conditions are float32 in XGBoost; leaves hold the leaf value
+            'threshold': conditions.astype(np.float64),
+            'left': left,
+            'right': right,
+            'default_left': np.array(tree['default_left'], dtype=bool),
+            'value': np.where(left < 0, conditions, 0.0).astype(np.float64)
+        })
+        max_depth = max(max_depth, _depth(left, right))
+
+    arrays = _concatenate(trees, 1)
+    arrays['tree_group'] = np.array(tree_info, dtype=np.int32)
+
+    meta = {
+        'kind': 'gbtree',
+        'comparison': 'lt',
+        'max_depth': max_depth,
+        'n_features': int(booster.num_features()),
+        'classes': model.classes_.tolist(),
+        'objective': objective,
+        'base_margin': base_margin.tolist()
+    }
+    if booster.feature_names:
+        meta['feature_names'] = list(booster.feature_names)
+    return arrays, meta
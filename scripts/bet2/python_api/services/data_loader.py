@@ -1,80 +1,170 @@
 """
 Data Loader Service
-Loads and validates CSV data files for football matches
+Loads and validates match data for football matches
+
+Each season is kept as a typed Arrow IPC file next to its CSV:
+    data/<competition>/<season>_all_teams.arrow   read by DataLoader
+    data/<competition>/<season>_all_teams.csv     import/export format
+
+A CSV that is newer than its Arrow file (scraper run, manual edit) is
+validated and imported on the next load. Seasons may also be Arrow-only;
+caches keyed on the data use source_file / source_fingerprint, which
+resolve either case. Arrow files are memory-mapped,
+only the requested columns are read, and team / date-range filters are
+applied to the Arrow table before any pandas conversion. Without pyarrow,
+or with DATA_FORMAT = 'csv', the CSV is read directly.
+
+Parsed full seasons are memoized per process (bounded LRU shared by every
+DataLoader), keyed by the source file's (path, mtime_ns, size): an edited
+file is simply a new key. A file is validated once per fingerprint.
 """
 import pandas as pd
 import logging
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
-from config import DATA_DIR
+from config import DATA_DIR, DATA_FORMAT, DATA_CACHE_SIZE
 
 logger = logging.getLogger(__name__)
 
 
 class DataLoader:
     """
-    Handles loading and basic validation of match data from CSV files
+    Handles loading and basic validation of match data (Arrow IPC, CSV import)
     """
 
-    def __init__(self, competition: str):
+    # Shared by all instances: fingerprint -> full season frame (LRU order)
+    _season_cache = OrderedDict()
+    _validated = set()
+    _cache_lock = threading.Lock()
+
+    def __init__(self, competition: str, data_format: str = DATA_FORMAT):
         """
         Initialize DataLoader for a specific competition
 
         Args:
             competition: Competition ID (e.g., 'premier_league')
+            data_format: 'arrow' (CSV imported on change) or 'csv'
         """
         self.competition = competition
         self.data_dir = DATA_DIR / competition
+        self.data_format = data_format
 
         if not self.data_dir.exists():
             raise ValueError(f"Data directory not found for competition: {competition}")
 
-    def load_season(self, season: str) -> pd.DataFrame:
+    def load_season(
+        self,
+        season: str,
+        columns: Optional[List[str]] = None,
+        teams: Optional[List[str]] = None,
+        start_date=None,
+        end_date=None
+    ) -> pd.DataFrame:
         """
         Load data for a single season
 
         Args:
             season: Season identifier (e.g., '2023-2024')
+            columns: Columns to read (default: all); 'season' is always added
+            teams: Only rows of these teams (team_name)
+            start_date: Only rows on or after this date
+            end_date: Only rows on or before this date
 
         Returns:
-            DataFrame with match data
+            DataFrame with match data, sorted by date
         """
-        file_path = self.data_dir / f"{season}_all_teams.csv"
+        csv_path = self._csv_path(season)
+
+        if not csv_path.exists() and not self._arrow_path(season).exists():
+            raise FileNotFoundError(f"Data file not found: {csv_path}")
 
-        if not file_path.exists():
-            raise FileNotFoundError(f"Data file not found: {file_path}")
+        key = self._fingerprint(season)
+        full = self._cache_get(key)
+        if full is not None:
+            df = self._filter(full, teams, start_date, end_date)
+            if columns is not None:
+                df = df[[col for col in columns if col in df.columns and col != 'season'] + ['season']]
+            return df.reset_index(drop=True).copy()
 
-        logger.info(f"Loading data from {file_path}")
+        whole = columns is None and teams is None and start_date is None and end_date is None
 
         try:
-            df = pd.read_csv(file_path)
-            logger.info(f"Loaded {len(df)} rows from {season}")
+            df = None
+            if self.data_format == 'arrow':
+                df = self._read_arrow(season, columns, teams, start_date, end_date)
 
-            # Basic validation
-            self._validate_dataframe(df, season)
+            if df is None:
+                logger.info(f"Loading data from {csv_path}")
+                df = self._read_csv(season)
+                df = self._filter(df, teams, start_date, end_date)
+                if columns is not None:
+                    df = df[[col for col in columns if col in df.columns]]
 
-            # Convert date column to datetime
-            df['date'] = pd.to_datetime(df['date'])
+            logger.info(f"Loaded {len(df)} rows from {season}")
 
-            # Sort by date (critical for time-series features)
-            df = df.sort_values('date').reset_index(drop=True)
+            # Sort by date (critical for time-series features); stable, so a
+            # filtered read orders same-day rows like the memoized full season
+            if 'date' in df.columns:
+                df = df.sort_values('date', kind='stable')
+            df = df.reset_index(drop=True)
 
             # Add season identifier
             df['season'] = season
 
+            if whole:
+                # Key again: reading may have imported the CSV
+                self._cache_put(self._fingerprint(season), df)
+                return df.copy()
             return df
 
         except Exception as e:
             logger.error(f"Error loading {season}: {str(e)}")
             raise
 
-    def load_multiple_seasons(self, seasons: List[str]) -> pd.DataFrame:
+    def import_csv(self, season: str) -> Path:
+        """
+        Validate a season CSV and (re)write its typed Arrow file
+
+        Returns:
+            Path of the Arrow file
+        """
+        from pyarrow import feather
+
+        df = self._read_csv(season)
+        path = self._arrow_path(season)
+
+        # Uncompressed so reads can memory-map the file
+        tmp_path = path.with_suffix('.arrow.tmp')
+        feather.write_feather(df, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+
+        logger.info(f"Imported {len(df)} rows of {season} into {path.name}")
+        return path
+
+    def export_csv(self, season: str, path: Optional[Path] = None) -> Path:
+        """
+        Write a season back out as CSV (default: the season CSV itself)
+
+        Returns:
+            Path of the written CSV
+        """
+        df = self.load_season(season).drop(columns=['season'])
+        path = Path(path) if path else self._csv_path(season)
+        df.to_csv(path, index=False, date_format='%Y-%m-%d')
+        logger.info(f"Exported {len(df)} rows of {season} to {path}")
+        return path
+
+    def load_multiple_seasons(self, seasons: List[str], **filters) -> pd.DataFrame:
         """
         Load and combine data from multiple seasons
 
         Args:
             seasons: List of season identifiers
+            **filters: columns / teams / start_date / end_date (see load_season)
 
         Returns:
             Combined DataFrame sorted by date
@@ -83,7 +173,7 @@ class DataLoader:
 
         dfs = []
         for season in seasons:
-            df = self.load_season(season)
+            df = self.load_season(season, **filters)
             dfs.append(df)
 
         # Combine all seasons
@@ -103,11 +193,13 @@ class DataLoader:
         Returns:
             List of season identifiers sorted by year
         """
-        seasons = []
+        seasons = set()
+
+        for pattern in ['*_all_teams.csv', '*_all_teams.arrow']:
+            for file in self.data_dir.glob(pattern):
+                seasons.add(file.stem.replace('_all_teams', ''))
 
-        for file in self.data_dir.glob('*_all_teams.csv'):
-            season = file.stem.replace('_all_teams', '')
-            seasons.append(season)
+        seasons = list(seasons)
 
         # Sort seasons (most recent first)
         seasons.sort(reverse=True)
@@ -124,7 +216,7 @@ class DataLoader:
         Returns:
             Sorted list of team names
         """
-        df = self.load_season(season)
+        df = self.load_season(season, columns=['team_name'])
         teams = sorted(df['team_name'].unique())
         return teams
 
@@ -139,8 +231,7 @@ class DataLoader:
         Returns:
             DataFrame with team's matches
         """
-        df = self.load_season(season)
-        team_df = df[df['team_name'] == team_name].copy()
+        team_df = self.load_season(season, teams=[team_name])
 
         logger.info(f"Found {len(team_df)} matches for {team_name} in {season}")
 
@@ -187,6 +278,133 @@ class DataLoader:
 
         logger.info(f"Validation passed for {season}")
 
+    @classmethod
+    def clear_cache(cls):
+        """Forget memoized seasons and validated fingerprints"""
+        with cls._cache_lock:
+            cls._season_cache.clear()
+            cls._validated.clear()
+
+    def source_file(self, season: str) -> Path:
+        """File a season's data comes from: its CSV if present, else its Arrow file"""
+        path = self._csv_path(season)
+        if not path.exists():
+            path = self._arrow_path(season)
+        return path
+
+    def source_fingerprint(self, season: str) -> Tuple[str, int, int]:
+        """(path, mtime_ns, size) of the season's source file"""
+        path = self.source_file(season)
+        stat = path.stat()
+        return (str(path), stat.st_mtime_ns, stat.st_size)
+
+    def _fingerprint(self, season: str) -> Tuple:
+        """Season cache key: source_fingerprint plus the read format"""
+        return self.source_fingerprint(season) + (self.data_format,)
+
+    def _cache_get(self, key: Tuple) -> Optional[pd.DataFrame]:
+        with self._cache_lock:
+            df = self._season_cache.get(key)
+            if df is not None:
+                self._season_cache.move_to_end(key)
+            return df
+
+    def _cache_put(self, key: Tuple, df: pd.DataFrame):
+        if DATA_CACHE_SIZE <= 0:
+            return
+        with self._cache_lock:
+            # Drop older fingerprints of the same file before adding this one
+            for stale in [k for k in self._season_cache if k[0] == key[0]]:
+                del self._season_cache[stale]
+            self._season_cache[key] = df
+            while len(self._season_cache) > DATA_CACHE_SIZE:
+                self._season_cache.popitem(last=False)
+
+    def _csv_path(self, season: str) -> Path:
+        return self.data_dir / f"{season}_all_teams.csv"
+
+    def _arrow_path(self, season: str) -> Path:
+        return self.data_dir / f"{season}_all_teams.arrow"
+
+    def _read_csv(self, season: str) -> pd.DataFrame:
+        """Parse and validate a season CSV (date column as datetime)"""
+        path = self._csv_path(season)
+        stat = path.stat()
+        fingerprint = (str(path), stat.st_mtime_ns, stat.st_size)
+        df = pd.read_csv(path)
+
+        # Basic validation (once per file version)
+        if fingerprint not in self._validated:
+            self._validate_dataframe(df, season)
+            with self._cache_lock:
+                self._validated.add(fingerprint)
+
+        # Convert date column to datetime
+        df['date'] = pd.to_datetime(df['date'])
+        return df
+
+    def _read_arrow(
+        self,
+        season: str,
+        columns: Optional[List[str]],
+        teams: Optional[List[str]],
+        start_date,
+        end_date
+    ) -> Optional[pd.DataFrame]:
+        """
+        Projected, filtered read of the season's Arrow file
+
+        Imports the CSV first when it is newer. Returns None when Arrow is
+        unavailable (no pyarrow, read-only data dir), so the caller reads the CSV.
+        """
+        csv_path = self._csv_path(season)
+        path = self._arrow_path(season)
+
+        try:
+            import pyarrow.compute as pc
+            from pyarrow import feather
+
+            if csv_path.exists() and (
+                    not path.exists() or csv_path.stat().st_mtime_ns > path.stat().st_mtime_ns):
+                self.import_csv(season)
+
+            conditions = []
+            if teams is not None:
+                conditions.append(pc.field('team_name').isin(list(teams)))
+            if start_date is not None:
+                conditions.append(pc.field('date') >= pd.Timestamp(start_date))
+            if end_date is not None:
+                conditions.append(pc.field('date') <= pd.Timestamp(end_date))
+
+            read = None
+            if columns is not None:
+                columns = [col for col in columns if col != 'season']
+                read = list(dict.fromkeys(columns + (['team_name'] if teams is not None else []) +
+                                          (['date'] if start_date or end_date else [])))
+
+            table = feather.read_table(path, columns=read, memory_map=True)
+            for condition in conditions:
+                table = table.filter(condition)
+            if columns is not None:
+                table = table.select([col for col in columns if col in table.column_names])
+
+            return table.to_pandas()
+
+        except (ImportError, OSError) as e:
+            logger.warning(f"Arrow store unavailable for {season}, reading CSV: {e}")
+            return None
+
+    @staticmethod
+    def _filter(df: pd.DataFrame, teams, start_date, end_date) -> pd.DataFrame:
+        """In-memory equivalent of the Arrow filters (CSV path)"""
+        if teams is not None:
+            df = df[df['team_name'].isin(teams)]
+        if start_date is not None:
+            df = df[df['date'] >= pd.Timestamp(start_date)]
+        if end_date is not None:
+            df = df[df['date'] <= pd.Timestamp(end_date)]
+        return df
+
     def get_data_summary(self, season: str) -> Dict:
         """
         Get summary statistics for a season's data
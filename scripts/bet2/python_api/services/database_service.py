@@ -1,17 +1,126 @@
 """
 Database Service - SQLite Operations
 Handles all database interactions for prediction tracking
+
+Connections are pooled per thread (and per process, so forked workers never
+share one): each thread opens predictions.db once, tunes it with the
+config.DB_* pragmas and reuses it, together with sqlite3's per-connection
+prepared-statement cache, for every later call. The database runs in WAL
+mode, so readers (dashboard, analytics) never block the writer (cron
+predictions, PHP saves, collect_results.py) and vice versa. Writes take the
+write lock up front (BEGIN IMMEDIATE) and are retried with backoff when the
+lock is still held after the busy timeout.
 """
 
 import sqlite3
 import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import json
 
+from config import (
+    DB_JOURNAL_MODE, DB_SYNCHRONOUS, DB_CACHE_SIZE_KB, DB_MMAP_SIZE,
+    DB_BUSY_TIMEOUT, DB_BUSY_RETRIES
+)
+
 logger = logging.getLogger(__name__)
 
+# This thread's open connections: {database path: connection}
+_local = threading.local()
+
+PREDICTION_INSERT = """
+    INSERT OR REPLACE INTO predictions (
+        match_id, home_team, away_team, competition, model_type,
+        prediction_1x2, prob_home, prob_draw, prob_away, certainty_1x2,
+        prob_home_draw, prob_home_away, prob_draw_away,
+        prediction_goals_05, prob_over_05, certainty_goals_05,
+        prediction_goals_15, prob_over_15, certainty_goals_15,
+        prediction_goals_25, prob_over_25, certainty_goals_25,
+        prediction_goals_35, prob_over_35, certainty_goals_35,
+        prediction_btts, prob_btts_yes, certainty_btts,
+        prediction_cards_35, prob_cards_over_35, certainty_cards_35,
+        prediction_cards_45, prob_cards_over_45, certainty_cards_45,
+        match_date,
+        prediction_cards_25, prob_cards_over_25, certainty_cards_25
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+RESULT_INSERT = """
+    INSERT OR REPLACE INTO actual_results (
+        match_id, home_team, away_team,
+        actual_result, goals_home, goals_away, total_goals,
+        btts_actual, cards_home, cards_away, total_cards,
+        match_date
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+MARK_MATCHED = """
+    UPDATE predictions 
+    SET is_matched = 1 
+    WHERE match_id = ?
+"""
+
+MATCH_OUTCOME_UPDATE = """
+    UPDATE predictions SET
+        actual_result = :actual_result,
+        actual_goals = :actual_goals,
+        actual_btts = :actual_btts,
+        actual_cards = :actual_cards,
+        correct_1x2 = :correct_1x2,
+        correct_goals_05 = :correct_goals_05,
+        correct_goals_15 = :correct_goals_15,
+        correct_goals_25 = :correct_goals_25,
+        correct_goals_35 = :correct_goals_35,
+        correct_btts = :correct_btts,
+        correct_cards_25 = :correct_cards_25,
+        correct_cards_35 = :correct_cards_35,
+        correct_cards_45 = :correct_cards_45,
+        is_matched = 1,
+        matched_date = CURRENT_TIMESTAMP
+    WHERE id = :id
+"""
+
+# accuracy_metrics rows are keyed by (metric_type, market, model_type,
+# certainty_level, team_name, calculation_period); the NULLs in that key never
+# conflict in its UNIQUE constraint, so a metric replaces its row explicitly
+METRIC_DELETE = """
+    DELETE FROM accuracy_metrics
+    WHERE metric_type = ? AND market = ? AND model_type IS ?
+      AND certainty_level IS ? AND team_name IS ? AND calculation_period = ?
+"""
+
+METRIC_INSERT = """
+    INSERT INTO accuracy_metrics (
+        metric_type, market, model_type,
+        certainty_level, team_name, calculation_period,
+        total_predictions, correct_predictions, accuracy_pct,
+        brier_score, f1_score, roc_auc,
+        precision_score, recall_score, total_roi_pct
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+MARKET_PERFORMANCE_UPSERT = """
+    INSERT OR REPLACE INTO market_performance (
+        market_name, total_predictions, correct_predictions, accuracy_pct,
+        brier_score, roi_pct, is_recommended, confidence_threshold, last_updated
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+"""
+
+METRIC_STATE_UPSERT = """
+    INSERT OR REPLACE INTO metric_state (market, model_type, state, updated_at)
+    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+"""
+
+MARK_FOLDED = """
+    UPDATE predictions SET metrics_folded = 1 WHERE id = ?
+"""
+
 
 class DatabaseService:
     """Manages database operations for predictions and results"""
@@ -32,205 +141,306 @@ class DatabaseService:
                 f"Database not found at {self.db_path}. Run init_db.py first!")
 
     def _get_connection(self) -> sqlite3.Connection:
-        """Get database connection with row factory"""
-        conn = sqlite3.connect(self.db_path)
+        """This thread's pooled connection (opened and tuned on first use)"""
+        if getattr(_local, 'pid', None) != os.getpid():
+            # New thread, or a forked child: never reuse the parent's handles
+            _local.pid = os.getpid()
+            _local.connections = {}
+
+        conn = _local.connections.get(str(self.db_path))
+        if conn is None:
+            conn = self._connect()
+            _local.connections[str(self.db_path)] = conn
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection in autocommit mode (transactions are explicit) with pragmas"""
+        conn = sqlite3.connect(self.db_path, timeout=DB_BUSY_TIMEOUT, isolation_level=None)
         conn.row_factory = sqlite3.Row
+
+        try:
+            mode = conn.execute(f"PRAGMA journal_mode = {DB_JOURNAL_MODE}").fetchone()[0]
+            if mode.lower() != DB_JOURNAL_MODE.lower():
+                logger.warning(f"Journal mode is {mode}, not {DB_JOURNAL_MODE}")
+        except sqlite3.OperationalError as e:
+            # Read-only database or directory: still usable, just not in WAL mode
+            logger.warning(f"Could not set journal mode {DB_JOURNAL_MODE}: {e}")
+
+        conn.execute(f"PRAGMA synchronous = {DB_SYNCHRONOUS}")
+        conn.execute(f"PRAGMA cache_size = -{DB_CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size = {DB_MMAP_SIZE}")
+        conn.execute("PRAGMA temp_store = MEMORY")
         return conn
 
+    def close(self):
+        """Close this thread's connection to the database (reopened on next use)"""
+        connections = getattr(_local, 'connections', {})
+        conn = connections.pop(str(self.db_path), None)
+        if conn is not None and getattr(_local, 'pid', None) == os.getpid():
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction on the pooled connection: committed, or rolled back on error"""
+        conn = self._get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn.cursor()
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def _write(self, statements: List[Tuple[str, list]]):
+        """Run (sql, rows) statements via executemany in one transaction, retried while locked"""
+        def write():
+            with self._transaction() as cursor:
+                for sql, rows in statements:
+                    cursor.executemany(sql, rows)
+
+        self._with_retry(write)
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict]:
+        """Rows of a read query as dicts"""
+        def query():
+            return [dict(row) for row in self._get_connection().execute(sql, params)]
+
+        return self._with_retry(query)
+
+    @staticmethod
+    def _with_retry(operation):
+        """Call operation(), backing off and retrying on 'database is locked/busy'"""
+        for attempt in range(DB_BUSY_RETRIES + 1):
+            try:
+                return operation()
+            except sqlite3.OperationalError as e:
+                message = str(e).lower()
+                busy = 'locked' in message or 'busy' in message
+                if not busy or attempt == DB_BUSY_RETRIES:
+                    raise
+
+                delay = min(0.1 * 2 ** attempt, 2.0) * random.uniform(0.5, 1.5)
+                # Not a warning: PHP callers read stderr together with the JSON output
+                logger.info(
+                    f"Database busy ({e}), retry {attempt + 1}/{DB_BUSY_RETRIES} in {delay:.2f}s")
+                time.sleep(delay)
+
     def save_prediction(self, prediction_data: Dict) -> bool:
         """Save prediction to database"""
+        return self.save_predictions([prediction_data]) == 1
+
+    def save_predictions(self, predictions: List[Dict]) -> int:
+        """
+        Save a batch of predictions in one transaction (executemany)
+
+        Returns:
+            Number of predictions saved (0 if the batch failed; nothing is written then)
+        """
+        if not predictions:
+            return 0
+
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-
-            match_id = f"{prediction_data['home_team']}_{prediction_data['away_team']}_{prediction_data.get('match_date', datetime.now().strftime('%Y-%m-%d'))}"
-            preds = prediction_data.get('predictions', {})
-
-            cursor.execute("""
-                INSERT OR REPLACE INTO predictions (
-                    match_id, home_team, away_team, competition, model_type,
-                    prediction_1x2, prob_home, prob_draw, prob_away, certainty_1x2,
-                    prob_home_draw, prob_home_away, prob_draw_away,
-                    prediction_goals_05, prob_over_05, certainty_goals_05,
-                    prediction_goals_15, prob_over_15, certainty_goals_15,
-                    prediction_goals_25, prob_over_25, certainty_goals_25,
-                    prediction_goals_35, prob_over_35, certainty_goals_35,
-                    prediction_btts, prob_btts_yes, certainty_btts,
-                    prediction_cards_35, prob_cards_over_35, certainty_cards_35,
-                    prediction_cards_45, prob_cards_over_45, certainty_cards_45,
-                    match_date,
-                    prediction_cards_25, prob_cards_over_25, certainty_cards_25
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                match_id,
-                prediction_data['home_team'],
-                prediction_data['away_team'],
-                prediction_data.get('competition', 'premier_league'),
-                prediction_data.get('model_type', 'ensemble'),
-
-                # Match result
-                preds.get('match_result', {}).get('prediction'),
-                preds.get('match_result', {}).get(
-                    'probabilities', {}).get('home_win'),
-                preds.get('match_result', {}).get(
-                    'probabilities', {}).get('draw'),
-                preds.get('match_result', {}).get(
-                    'probabilities', {}).get('away_win'),
-                preds.get('match_result', {}).get('certainty'),
-
-                # Double chance
-                preds.get('double_chance', {}).get(
-                    'probabilities', {}).get('1X'),
-                preds.get('double_chance', {}).get(
-                    'probabilities', {}).get('12'),
-                preds.get('double_chance', {}).get(
-                    'probabilities', {}).get('X2'),
-
-                # Goals O/U 0.5
-                preds.get('goals', {}).get('over_0.5', {}).get('prediction'),
-                preds.get('goals', {}).get(
-                    'over_0.5', {}).get('probability_over'),
-                preds.get('goals', {}).get('over_0.5', {}).get('certainty'),
-
-                # Goals O/U 1.5
-                preds.get('goals', {}).get('over_1.5', {}).get('prediction'),
-                preds.get('goals', {}).get(
-                    'over_1.5', {}).get('probability_over'),
-                preds.get('goals', {}).get('over_1.5', {}).get('certainty'),
-
-                # Goals O/U 2.5
-                preds.get('goals', {}).get('over_2.5', {}).get('prediction'),
-                preds.get('goals', {}).get(
-                    'over_2.5', {}).get('probability_over'),
-                preds.get('goals', {}).get('over_2.5', {}).get('certainty'),
-
-                # Goals O/U 3.5
-                preds.get('goals', {}).get('over_3.5', {}).get('prediction'),
-                preds.get('goals', {}).get(
-                    'over_3.5', {}).get('probability_over'),
-                preds.get('goals', {}).get('over_3.5', {}).get('certainty'),
-
-                # BTTS
-                preds.get('goals', {}).get('btts', {}).get('prediction'),
-                preds.get('goals', {}).get('btts', {}).get('probability_yes'),
-                preds.get('goals', {}).get('btts', {}).get('certainty'),
-
-                # Cards O/U 3.5
-                preds.get('cards', {}).get('total_match', {}).get(
-                    'over_3.5', {}).get('prediction'),
-                preds.get('cards', {}).get('total_match', {}).get(
-                    'over_3.5', {}).get('probability_over'),
-                preds.get('cards', {}).get('total_match', {}).get(
-                    'over_3.5', {}).get('certainty'),
-
-                # Cards O/U 4.5
-                preds.get('cards', {}).get('total_match', {}).get(
-                    'over_4.5', {}).get('prediction'),
-                preds.get('cards', {}).get('total_match', {}).get(
-                    'over_4.5', {}).get('probability_over'),
-                preds.get('cards', {}).get('total_match', {}).get(
-                    'over_4.5', {}).get('certainty'),
-
-                # Match date
-                prediction_data.get('match_date'),
-
-                # Cards O/U 2.5 (at the end!)
-                preds.get('cards', {}).get('total_match', {}).get(
-                    'over_2.5', {}).get('prediction'),
-                preds.get('cards', {}).get('total_match', {}).get(
-                    'over_2.5', {}).get('probability_over'),
-                preds.get('cards', {}).get('total_match', {}).get(
-                    'over_2.5', {}).get('certainty')
-            ))
-
-            conn.commit()
-            conn.close()
-            logger.info(f"✅ Saved prediction: {match_id}")
-            return True
+            rows = [self._prediction_row(prediction_data) for prediction_data in predictions]
+            self._write([(PREDICTION_INSERT, rows)])
+
+            if len(rows) == 1:
+                logger.info(f"✅ Saved prediction: {rows[0][0]}")
+            else:
+                logger.info(f"✅ Saved {len(rows)} predictions")
+            return len(rows)
 
         except Exception as e:
             logger.error(f"❌ Error saving prediction: {e}")
             import traceback
             logger.error(traceback.format_exc())
-            return False
-
-
-
-
+            return 0
+
+    @staticmethod
+    def _prediction_row(prediction_data: Dict) -> tuple:
+        """PREDICTION_INSERT parameters of one prediction (match_id first)"""
+        match_id = f"{prediction_data['home_team']}_{prediction_data['away_team']}_{prediction_data.get('match_date', datetime.now().strftime('%Y-%m-%d'))}"
+        preds = prediction_data.get('predictions', {})
+
+        return (
+            match_id,
+            prediction_data['home_team'],
+            prediction_data['away_team'],
+            prediction_data.get('competition', 'premier_league'),
+            prediction_data.get('model_type', 'ensemble'),
+
+            # Match result
+            preds.get('match_result', {}).get('prediction'),
+            preds.get('match_result', {}).get(
+                'probabilities', {}).get('home_win'),
+            preds.get('match_result', {}).get(
+                'probabilities', {}).get('draw'),
+            preds.get('match_result', {}).get(
+                'probabilities', {}).get('away_win'),
+            preds.get('match_result', {}).get('certainty'),
+
+            # Double chance
+            preds.get('double_chance', {}).get(
+                'probabilities', {}).get('1X'),
+            preds.get('double_chance', {}).get(
+                'probabilities', {}).get('12'),
+            preds.get('double_chance', {}).get(
+                'probabilities', {}).get('X2'),
+
+            # Goals O/U 0.5
+            preds.get('goals', {}).get('over_0.5', {}).get('prediction'),
+            preds.get('goals', {}).get(
+                'over_0.5', {}).get('probability_over'),
+            preds.get('goals', {}).get('over_0.5', {}).get('certainty'),
+
+            # Goals O/U 1.5
+            preds.get('goals', {}).get('over_1.5', {}).get('prediction'),
+            preds.get('goals', {}).get(
+                'over_1.5', {}).get('probability_over'),
+            preds.get('goals', {}).get('over_1.5', {}).get('certainty'),
+
+            # Goals O/U 2.5
+            preds.get('goals', {}).get('over_2.5', {}).get('prediction'),
+            preds.get('goals', {}).get(
+                'over_2.5', {}).get('probability_over'),
+            preds.get('goals', {}).get('over_2.5', {}).get('certainty'),
+
+            # Goals O/U 3.5
+            preds.get('goals', {}).get('over_3.5', {}).get('prediction'),
+            preds.get('goals', {}).get(
+                'over_3.5', {}).get('probability_over'),
+            preds.get('goals', {}).get('over_3.5', {}).get('certainty'),
+
+            # BTTS
+            preds.get('goals', {}).get('btts', {}).get('prediction'),
+            preds.get('goals', {}).get('btts', {}).get('probability_yes'),
+            preds.get('goals', {}).get('btts', {}).get('certainty'),
+
+            # Cards O/U 3.5
+            preds.get('cards', {}).get('total_match', {}).get(
+                'over_3.5', {}).get('prediction'),
+            preds.get('cards', {}).get('total_match', {}).get(
+                'over_3.5', {}).get('probability_over'),
+            preds.get('cards', {}).get('total_match', {}).get(
+                'over_3.5', {}).get('certainty'),
+
+            # Cards O/U 4.5
+            preds.get('cards', {}).get('total_match', {}).get(
+                'over_4.5', {}).get('prediction'),
+            preds.get('cards', {}).get('total_match', {}).get(
+                'over_4.5', {}).get('probability_over'),
+            preds.get('cards', {}).get('total_match', {}).get(
+                'over_4.5', {}).get('certainty'),
+
+            # Match date
+            prediction_data.get('match_date'),
+
+            # Cards O/U 2.5 (at the end!)
+            preds.get('cards', {}).get('total_match', {}).get(
+                'over_2.5', {}).get('prediction'),
+            preds.get('cards', {}).get('total_match', {}).get(
+                'over_2.5', {}).get('probability_over'),
+            preds.get('cards', {}).get('total_match', {}).get(
+                'over_2.5', {}).get('certainty')
+        )
 
     def get_unmatched_predictions(self, days_back: int = 7) -> List[Dict]:
         """Get predictions without matched results"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
         cutoff_date = (datetime.now() - timedelta(days=days_back)
                        ).strftime('%Y-%m-%d')
 
-        cursor.execute("""
+        return self._query("""
             SELECT * FROM predictions 
             WHERE is_matched = 0 
             AND prediction_date >= ?
             ORDER BY prediction_date DESC
         """, (cutoff_date,))
 
-        results = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-
-        return results
-
     def save_actual_result(self, result_data: Dict) -> bool:
         """Save actual match result"""
+        return self.save_actual_results([result_data]) == 1
+
+    def save_actual_results(self, results: List[Dict]) -> int:
+        """
+        Save a batch of match results and mark their predictions as matched,
+        in one transaction (executemany)
+
+        Returns:
+            Number of results saved (0 if the batch failed; nothing is written then)
+        """
+        if not results:
+            return 0
+
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-
-            match_id = result_data['match_id']
-
-            cursor.execute("""
-                INSERT OR REPLACE INTO actual_results (
-                    match_id, home_team, away_team,
-                    actual_result, goals_home, goals_away, total_goals,
-                    btts_actual, cards_home, cards_away, total_cards,
-                    match_date
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                match_id,
-                result_data['home_team'],
-                result_data['away_team'],
-                result_data['actual_result'],
-                result_data['goals_home'],
-                result_data['goals_away'],
-                result_data['total_goals'],
-                result_data['btts_actual'],
-                result_data.get('cards_home', 0),
-                result_data.get('cards_away', 0),
-                result_data.get('total_cards', 0),
-                result_data['match_date']
-            ))
-
-            # Mark prediction as matched
-            cursor.execute("""
-                UPDATE predictions 
-                SET is_matched = 1 
-                WHERE match_id = ?
-            """, (match_id,))
-
-            conn.commit()
-            conn.close()
+            rows = [self._result_row(result_data) for result_data in results]
 
-            logger.info(f"✅ Saved result: {match_id}")
-            return True
+            self._write([
+                (RESULT_INSERT, rows),
+                # Mark predictions as matched
+                (MARK_MATCHED, [(row[0],) for row in rows])
+            ])
+
+            if len(rows) == 1:
+                logger.info(f"✅ Saved result: {rows[0][0]}")
+            else:
+                logger.info(f"✅ Saved {len(rows)} results")
+            return len(rows)
 
         except Exception as e:
             logger.error(f"❌ Error saving result: {e}")
-            return False
+            return 0
+
+    @staticmethod
+    def _result_row(result_data: Dict) -> tuple:
+        """RESULT_INSERT parameters of one result (match_id first)"""
+        return (
+            result_data['match_id'],
+            result_data['home_team'],
+            result_data['away_team'],
+            result_data['actual_result'],
+            result_data['goals_home'],
+            result_data['goals_away'],
+            result_data['total_goals'],
+            result_data['btts_actual'],
+            result_data.get('cards_home', 0),
+            result_data.get('cards_away', 0),
+            result_data.get('total_cards', 0),
+            result_data['match_date']
+        )
+
+    def get_dated_unmatched_predictions(self) -> List[Dict]:
+        """Unmatched predictions with a match date (candidates for match_results.py)"""
+        return self._query("""
+            SELECT id, home_team, away_team, match_date, competition,
+                   prediction_1x2, prediction_goals_05, prediction_goals_15, 
+                   prediction_goals_25, prediction_goals_35,
+                   prediction_btts, prediction_cards_25, prediction_cards_35, prediction_cards_45
+            FROM predictions 
+            WHERE is_matched = 0 AND match_date IS NOT NULL
+        """)
+
+    def save_match_outcomes(self, outcomes: List[Dict]) -> int:
+        """
+        Store actual outcomes and per-market correctness on predictions
+        (MATCH_OUTCOME_UPDATE keys, by prediction id), in one transaction
+
+        Returns:
+            Number of predictions updated (0 if the batch failed; nothing is written then)
+        """
+        if not outcomes:
+            return 0
+
+        try:
+            self._write([(MATCH_OUTCOME_UPDATE, outcomes)])
+            logger.info(f"✅ Saved {len(outcomes)} match outcomes")
+            return len(outcomes)
+
+        except Exception as e:
+            logger.error(f"❌ Error saving match outcomes: {e}")
+            return 0
 
     def get_predictions_with_results(self, limit: int = 100) -> List[Dict]:
         """Get predictions matched with actual results"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
+        return self._query("""
             SELECT 
                 p.*,
                 r.actual_result, r.goals_home, r.goals_away, r.total_goals,
@@ -241,58 +451,45 @@ class DatabaseService:
             LIMIT ?
         """, (limit,))
 
-        results = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-
-        return results
-
     def save_accuracy_metric(self, metric_data: Dict) -> bool:
-        """Save calculated accuracy metric"""
+        """Save calculated accuracy metric (replaces the previous value of its key)"""
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                INSERT OR REPLACE INTO accuracy_metrics (
-                    metric_type, market, model_type,
-                    total_predictions, correct_predictions, accuracy_pct,
-                    brier_score, f1_score, roc_auc,
-                    precision_score, recall_score, total_roi_pct,
-                    certainty_level, team_name, calculation_period
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                metric_data['metric_type'],
-                metric_data['market'],
-                metric_data.get('model_type'),
-                metric_data['total_predictions'],
-                metric_data['correct_predictions'],
-                metric_data['accuracy_pct'],
-                metric_data.get('brier_score'),
-                metric_data.get('f1_score'),
-                metric_data.get('roc_auc'),
-                metric_data.get('precision_score'),
-                metric_data.get('recall_score'),
-                metric_data.get('total_roi_pct'),
-                metric_data.get('certainty_level'),
-                metric_data.get('team_name'),
-                metric_data.get('calculation_period', 'all_time')
-            ))
-
-            conn.commit()
-            conn.close()
-
+            self._write(self._metric_statements([metric_data]))
             return True
 
         except Exception as e:
             logger.error(f"❌ Error saving metric: {e}")
             return False
 
+    @staticmethod
+    def _metric_statements(metrics: List[Dict]) -> List[Tuple[str, list]]:
+        """METRIC_DELETE / METRIC_INSERT rows replacing each metric's accuracy_metrics row"""
+        keys = [(
+            metric_data['metric_type'],
+            metric_data['market'],
+            metric_data.get('model_type'),
+            metric_data.get('certainty_level'),
+            metric_data.get('team_name'),
+            metric_data.get('calculation_period', 'all_time')
+        ) for metric_data in metrics]
+
+        rows = [key + (
+            metric_data['total_predictions'],
+            metric_data['correct_predictions'],
+            metric_data['accuracy_pct'],
+            metric_data.get('brier_score'),
+            metric_data.get('f1_score'),
+            metric_data.get('roc_auc'),
+            metric_data.get('precision_score'),
+            metric_data.get('recall_score'),
+            metric_data.get('total_roi_pct')
+        ) for key, metric_data in zip(keys, metrics)]
+
+        return [(METRIC_DELETE, keys), (METRIC_INSERT, rows)]
+
     def get_market_performance(self) -> List[Dict]:
         """Get performance for all markets"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
+        return self._query("""
             SELECT 
                 market,
                 AVG(accuracy_pct) as avg_accuracy,
@@ -305,7 +502,97 @@ class DatabaseService:
             ORDER BY avg_roi DESC
         """)
 
-        results = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+    def get_market_rankings(self) -> List[Dict]:
+        """market_performance rows, most profitable first (analytics dashboard)"""
+        return self._query("""
+            SELECT
+                market_name AS market, total_predictions, correct_predictions,
+                accuracy_pct, brier_score, roi_pct, is_recommended, confidence_threshold
+            FROM market_performance
+            ORDER BY roi_pct DESC
+        """)
 
-        return results
+    def get_matched_outcomes(self, unfolded_only: bool = True) -> List[Dict]:
+        """
+        Matched predictions with their outcomes, for MetricsTracker
+
+        Outcomes come from actual_results (collect_results.py) or, for
+        predictions matched by match_results.py, from the predictions row.
+
+        Args:
+            unfolded_only: Only predictions not yet folded into metric_state
+        """
+        return self._query(f"""
+            SELECT
+                p.id, p.model_type,
+                p.prediction_1x2, p.prob_home, p.prob_draw, p.prob_away,
+                p.prediction_goals_05, p.prob_over_05,
+                p.prediction_goals_15, p.prob_over_15,
+                p.prediction_goals_25, p.prob_over_25,
+                p.prediction_goals_35, p.prob_over_35,
+                p.prediction_btts, p.prob_btts_yes,
+                p.prediction_cards_25, p.prob_cards_over_25,
+                p.prediction_cards_35, p.prob_cards_over_35,
+                p.prediction_cards_45, p.prob_cards_over_45,
+                COALESCE(r.actual_result, p.actual_result) AS actual_result,
+                COALESCE(r.total_goals, p.actual_goals) AS total_goals,
+                COALESCE(r.total_cards, p.actual_cards) AS total_cards,
+                COALESCE(r.btts_actual = 'Yes', p.actual_btts) AS btts
+            FROM predictions p
+            LEFT JOIN actual_results r ON r.match_id = p.match_id
+            WHERE p.is_matched = 1{' AND p.metrics_folded = 0' if unfolded_only else ''}
+        """)
+
+    def get_metric_states(self) -> Dict[Tuple[str, str], Dict]:
+        """Running metric statistics: {(market, model_type): state}; empty before migrate()"""
+        if not self._query(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'metric_state'"):
+            # Unmigrated database (init_db.py / collect_results.py create the table):
+            # nothing folded yet, and read paths like the dashboard must not migrate
+            return {}
+
+        return {
+            (row['market'], row['model_type']): json.loads(row['state'])
+            for row in self._query("SELECT market, model_type, state FROM metric_state")
+        }
+
+    def save_metric_states(self, states: Dict[Tuple[str, str], Dict], metrics: List[Dict],
+                           performance: List[Dict], folded_ids: List[int],
+                           rebuild: bool = False) -> bool:
+        """
+        Store updated metric statistics, the accuracy_metrics / market_performance
+        rows derived from them and the predictions folded in, in one transaction
+
+        Args:
+            states: {(market, model_type): state} to store
+            metrics: accuracy_metrics rows (save_accuracy_metric keys)
+            performance: market_performance rows (MARKET_PERFORMANCE_UPSERT order, as dicts)
+            folded_ids: Prediction ids now included in the states
+            rebuild: Drop all stored states first (states were computed from scratch)
+        """
+        statements = []
+        if rebuild:
+            statements += [
+                ("DELETE FROM metric_state", [()]),
+                ("UPDATE predictions SET metrics_folded = 0 WHERE metrics_folded = 1", [()])
+            ]
+
+        statements += [
+            (METRIC_STATE_UPSERT, [(market, model_type, json.dumps(state))
+                                   for (market, model_type), state in states.items()]),
+            (MARKET_PERFORMANCE_UPSERT, [(
+                row['market'], row['total_predictions'], row['correct_predictions'],
+                row['accuracy_pct'], row['brier_score'], row['roi_pct'],
+                row['is_recommended'], row['confidence_threshold']
+            ) for row in performance]),
+            (MARK_FOLDED, [(prediction_id,) for prediction_id in folded_ids])
+        ] + self._metric_statements(metrics)
+
+        try:
+            self._write(statements)
+            logger.info(f"✅ Folded {len(folded_ids)} predictions into {len(states)} metric states")
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Error saving metric states: {e}")
+            return False
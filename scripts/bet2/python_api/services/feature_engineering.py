@@ -13,14 +13,37 @@ import pandas as pd
 import numpy as np
 import logging
 import warnings
+import json
+import hashlib
+from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 
+from services.rolling_engine import RollingEngine
+from services.streak_kernels import calculate_streaks
+
 # Suppress pandas performance warnings
 warnings.filterwarnings('ignore', category=pd.errors.PerformanceWarning)
 
 logger = logging.getLogger(__name__)
 
+# Modules whose source determines generated feature values
+FEATURE_CODE_MODULES = ['feature_engineering.py', 'rolling_engine.py', 'streak_kernels.py']
+
+
+def feature_code_hash() -> str:
+    """Hash of the feature code sources (FeatureStore / MatrixCache invalidation)"""
+    digest = hashlib.sha256()
+    for name in FEATURE_CODE_MODULES:
+        digest.update(name.encode())
+        digest.update((Path(__file__).parent / name).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def assembly_plan_hash(plan: Dict) -> str:
+    """Hash of an assembly plan, stamped on the models trained with it"""
+    return hashlib.sha256(json.dumps(plan, sort_keys=True).encode()).hexdigest()[:16]
+
 
 class FeatureEngineer:
     """
@@ -31,6 +54,50 @@ class FeatureEngineer:
         df_with_features = engineer.generate_features(df)
     """
 
+    # Bumped whenever generated feature values or names change
+    VERSION = '3.0'
+
+    # Longest hard-coded windows (momentum/xG/cards and venue features);
+    # incremental runs need at least this much history per team
+    FIXED_CONTEXT_MATCHES = 10
+    VENUE_CONTEXT_MATCHES = 5
+
+    # Team features mirrored from the opponent's perspective (opp_*)
+    OPPONENT_FEATURES = [
+        'goals_for_L3_mean', 'goals_for_L5_mean',
+        'goals_against_L3_mean', 'goals_against_L5_mean',
+        'xg_for_L3_mean', 'xg_for_L5_mean',
+        'xg_against_L3_mean', 'xg_against_L5_mean',
+        'points_L3_mean', 'points_L5_mean',
+        'form_L3_ppg', 'form_L5_ppg',
+        'win_rate_L5', 'win_rate_L10',
+        'xg_overperf_L3', 'xg_overperf_L5',
+        'xg_for_momentum', 'xg_against_momentum',
+        'pct_btts_L5', 'pct_over_2_5_L5',
+        'clean_sheet_rate_L5', 'failed_to_score_rate_L5'
+    ]
+
+    # Team - opponent differentials (diff_*)
+    DIFFERENTIAL_FEATURES = [
+        'goals_for_L5_mean', 'goals_against_L5_mean',
+        'xg_for_L5_mean', 'xg_against_L5_mean',
+        'points_L5_mean', 'form_L5_ppg',
+        'win_rate_L5', 'xg_overperf_L5',
+        'pct_btts_L5', 'clean_sheet_rate_L5'
+    ]
+
+    # Goal cross-features: name -> (operation, team column, opponent column)
+    #   mean:          (team[a] + opp[b]) / 2
+    #   sum:           team[a] + opp[b]
+    #   cross_product: (team[a] * opp[b] + opp[a] * team[b]) / 2
+    CROSS_FEATURES = {
+        'combined_goal_threat': ('mean', 'goals_for_L5_mean', 'goals_for_L5_mean'),
+        'combined_def_weakness': ('mean', 'goals_against_L5_mean', 'goals_against_L5_mean'),
+        'btts_likelihood': ('cross_product', 'goals_for_L5_mean', 'goals_against_L5_mean'),
+        'total_goals_expected': ('sum', 'goals_for_L5_mean', 'goals_for_L5_mean'),
+        'xg_total_expected': ('sum', 'xg_for_L5_mean', 'xg_for_L5_mean')
+    }
+
     def __init__(self, rolling_windows: List[int] = [3, 5, 10]):
         """
         Initialize Feature Engineer
@@ -40,6 +107,7 @@ class FeatureEngineer:
         """
         self.rolling_windows = rolling_windows
         self.feature_columns = []
+        self.rolling = None
 
     def generate_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -65,6 +133,9 @@ class FeatureEngineer:
         # Reset feature columns
         self.feature_columns = []
 
+        # Row order is fixed from here on: index all teams once for rolling stats
+        self.rolling = RollingEngine(df['team_name'])
+
         # PHASE 1: Team-only features (existing)
         logger.info("Phase 1: Generating team features...")
         df = self._add_basic_features(df)
@@ -107,6 +178,91 @@ class FeatureEngineer:
 
         return df
 
+    def generate_features_incremental(
+        self,
+        stored: pd.DataFrame,
+        new_df: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        Generate features only for new matches, continuing from stored features
+
+        Each team's recent history is taken from `stored` (just enough rows to
+        fill every rolling window), features are generated over that context
+        plus the new rows, and the unbounded features (match number, season
+        averages, streaks, games since win) are carried forward from the
+        stored row where the context starts.
+
+        Args:
+            stored: Previously generated features (raw columns included)
+            new_df: New match rows, all later than the stored rows of their team
+
+        Returns:
+            DataFrame with feature rows for new_df only
+        """
+        logger.info(
+            f"Incremental feature generation: {len(new_df)} new rows "
+            f"on top of {len(stored)} stored rows")
+
+        raw_columns = list(new_df.columns)
+        teams = new_df['team_name'].unique()
+        history = stored[stored['team_name'].isin(teams)].sort_values(
+            ['team_name', 'date'])
+
+        # Contiguous per-team suffix deep enough for every rolling window
+        from_end = history.groupby('team_name').cumcount(ascending=False)
+        venue_from_end = history.groupby(
+            ['team_name', 'venue']).cumcount(ascending=False)
+        max_window = max(list(self.rolling_windows) + [self.FIXED_CONTEXT_MATCHES])
+        needed = from_end.where(
+            venue_from_end < self.VENUE_CONTEXT_MATCHES, 0).groupby(
+            history['team_name']).transform('max')
+        depth = np.maximum(needed + 1, max_window)
+        context = history[from_end < depth]
+
+        combined = pd.concat(
+            [context[raw_columns], new_df[raw_columns]], ignore_index=True)
+        features = self.generate_features(combined)
+
+        new_keys = pd.MultiIndex.from_frame(new_df[['team_name', 'date']])
+        is_new = pd.MultiIndex.from_frame(
+            features[['team_name', 'date']]).isin(new_keys)
+
+        # Unbounded features: continue from the first context row of each team
+        first = context.groupby('team_name').head(1).set_index('team_name')
+        team_first = first.reindex(features['team_name'])
+        has_history = team_first['match_number'].notna().values
+        position = features.groupby('team_name').cumcount().values
+
+        prior = np.where(has_history, team_first['match_number'].values - 1, 0)
+        features['match_number'] = features['match_number'] + prior.astype(
+            features['match_number'].dtype)
+
+        for col in [c for c in self.feature_columns if c.endswith('_season_avg')]:
+            if col in team_first.columns:
+                prior_mean = np.nan_to_num(team_first[col].values.astype(float))
+                features[col] = np.where(
+                    has_history,
+                    (prior_mean * prior + features[col].values * position) /
+                    np.maximum(prior + position, 1),
+                    features[col].values)
+
+        streak_cols = ['win_streak', 'loss_streak', 'unbeaten_streak',
+                       'scoring_streak', 'clean_sheet_streak']
+        for col in [c for c in streak_cols if c in features.columns]:
+            unbroken = has_history & (features[col].values == position)
+            features[col] = features[col].values + np.where(
+                unbroken, np.nan_to_num(team_first[col].values), 0).astype(np.int64)
+
+        if 'games_since_win' in features.columns:
+            no_win = has_history & (
+                features['games_since_win'].values == position + 1)
+            features['games_since_win'] = np.where(
+                no_win,
+                np.nan_to_num(team_first['games_since_win'].values) + position,
+                features['games_since_win'].values).astype(np.int64)
+
+        return features[is_new].reset_index(drop=True)
+
     def _add_basic_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add basic derived features (~25 features)"""
         logger.info("Adding basic features...")
@@ -187,32 +343,16 @@ class FeatureEngineer:
         all_stats = core_stats + advanced_stats
         available_stats = [col for col in all_stats if col in df.columns]
 
-        for window in self.rolling_windows:
-            for stat in available_stats:
-                # Mean
-                feature_name = f'{stat}_L{window}_mean'
-                df[feature_name] = df.groupby('team_name')[stat].transform(
-                    lambda x: x.shift(1).rolling(
-                        window=window, min_periods=1).mean()
-                )
-                self.feature_columns.append(feature_name)
-
-                # Std (only for larger windows)
-                if window >= 5:
-                    feature_name = f'{stat}_L{window}_std'
-                    df[feature_name] = df.groupby('team_name')[stat].transform(
-                        lambda x: x.shift(1).rolling(
-                            window=window, min_periods=2).std()
-                    )
-                    self.feature_columns.append(feature_name)
+        # Means for every window, std only for larger windows (one block)
+        rolling_block = self.rolling.rolling_block(
+            df, available_stats, self.rolling_windows, std_min_window=5)
 
         # Season averages
-        for stat in available_stats[:10]:
-            feature_name = f'{stat}_season_avg'
-            df[feature_name] = df.groupby('team_name')[stat].transform(
-                lambda x: x.shift(1).expanding(min_periods=1).mean()
-            )
-            self.feature_columns.append(feature_name)
+        season_block = self.rolling.expanding_block(df, available_stats[:10])
+
+        df = pd.concat([df, rolling_block, season_block], axis=1)
+        self.feature_columns.extend(rolling_block.columns)
+        self.feature_columns.extend(season_block.columns)
 
         return df
 
@@ -246,43 +386,26 @@ class FeatureEngineer:
         """Add streak features (~8 features)"""
         logger.info("Adding streak features...")
 
-        df['win_streak'] = df.groupby('team_name')['result'].transform(
-            lambda x: self._calculate_streak_series(x.shift(1), 'W')
-        )
-        self.feature_columns.append('win_streak')
-
-        df['loss_streak'] = df.groupby('team_name')['result'].transform(
-            lambda x: self._calculate_streak_series(x.shift(1), 'L')
-        )
-        self.feature_columns.append('loss_streak')
-
-        df['_unbeaten_temp'] = df['result'].isin(['W', 'D']).astype(int)
-        df['unbeaten_streak'] = df.groupby('team_name')['_unbeaten_temp'].transform(
-            lambda x: self._calculate_consecutive_series(x.shift(1))
-        )
-        df.drop('_unbeaten_temp', axis=1, inplace=True)
-        self.feature_columns.append('unbeaten_streak')
+        result = df['result']
+        streak_hits = {
+            'win_streak': (result == 'W').values,
+            'loss_streak': (result == 'L').values,
+            'unbeaten_streak': result.isin(['W', 'D']).values
+        }
 
         if 'goals_for' in df.columns:
-            df['_scoring_temp'] = (df['goals_for'] > 0).astype(int)
-            df['scoring_streak'] = df.groupby('team_name')['_scoring_temp'].transform(
-                lambda x: self._calculate_consecutive_series(x.shift(1))
-            )
-            df.drop('_scoring_temp', axis=1, inplace=True)
-            self.feature_columns.append('scoring_streak')
+            streak_hits['scoring_streak'] = (df['goals_for'] > 0).values
 
         if 'goals_against' in df.columns:
-            df['_cs_temp'] = (df['goals_against'] == 0).astype(int)
-            df['clean_sheet_streak'] = df.groupby('team_name')['_cs_temp'].transform(
-                lambda x: self._calculate_consecutive_series(x.shift(1))
-            )
-            df.drop('_cs_temp', axis=1, inplace=True)
-            self.feature_columns.append('clean_sheet_streak')
+            streak_hits['clean_sheet_streak'] = (df['goals_against'] == 0).values
+
+        since_hits = {'games_since_win': (result == 'W').values}
+
+        # All streak columns for all teams in one kernel call
+        streaks = calculate_streaks(df['team_name'], streak_hits, since_hits)
 
-        df['games_since_win'] = df.groupby('team_name')['result'].transform(
-            lambda x: self._calculate_games_since_series(x.shift(1), 'W')
-        )
-        self.feature_columns.append('games_since_win')
+        df = pd.concat([df, streaks], axis=1)
+        self.feature_columns.extend(streaks.columns)
 
         return df
 
@@ -292,31 +415,21 @@ class FeatureEngineer:
 
         for window in [3, 5]:
             feature_name = f'form_L{window}_ppg'
-            df[feature_name] = df.groupby('team_name')['points'].transform(
-                lambda x: x.shift(1).rolling(
-                    window=window, min_periods=1).mean()
-            )
+            df[feature_name] = self.rolling.rolling_mean(df['points'], window)
             self.feature_columns.append(feature_name)
 
         for window in [5, 10]:
             feature_name = f'win_rate_L{window}'
-            df[feature_name] = df.groupby('team_name')['win'].transform(
-                lambda x: x.shift(1).rolling(
-                    window=window, min_periods=1).mean()
-            )
+            df[feature_name] = self.rolling.rolling_mean(df['win'], window)
             self.feature_columns.append(feature_name)
 
         if 'goals_for' in df.columns:
             for window in [5]:
                 feature_name = f'gf_momentum_L{window}'
-                df[f'_gf_recent_{window}'] = df.groupby('team_name')['goals_for'].transform(
-                    lambda x: x.shift(1).rolling(
-                        window=window, min_periods=1).mean()
-                )
-                df[f'_gf_longer_{window}'] = df.groupby('team_name')['goals_for'].transform(
-                    lambda x: x.shift(1).rolling(
-                        window=window*2, min_periods=1).mean()
-                )
+                df[f'_gf_recent_{window}'] = self.rolling.rolling_mean(
+                    df['goals_for'], window)
+                df[f'_gf_longer_{window}'] = self.rolling.rolling_mean(
+                    df['goals_for'], window*2)
                 df[feature_name] = df[f'_gf_recent_{window}'] - \
                     df[f'_gf_longer_{window}']
                 df.drop(
@@ -326,14 +439,10 @@ class FeatureEngineer:
         if 'goals_against' in df.columns:
             for window in [5]:
                 feature_name = f'ga_momentum_L{window}'
-                df[f'_ga_recent_{window}'] = df.groupby('team_name')['goals_against'].transform(
-                    lambda x: x.shift(1).rolling(
-                        window=window, min_periods=1).mean()
-                )
-                df[f'_ga_longer_{window}'] = df.groupby('team_name')['goals_against'].transform(
-                    lambda x: x.shift(1).rolling(
-                        window=window*2, min_periods=1).mean()
-                )
+                df[f'_ga_recent_{window}'] = self.rolling.rolling_mean(
+                    df['goals_against'], window)
+                df[f'_ga_longer_{window}'] = self.rolling.rolling_mean(
+                    df['goals_against'], window*2)
                 df[feature_name] = df[f'_ga_recent_{window}'] - \
                     df[f'_ga_longer_{window}']
                 df.drop(
@@ -351,37 +460,26 @@ class FeatureEngineer:
                 col_name = f'over_{str(threshold).replace(".", "_")}'
                 if col_name in df.columns:
                     feature_name = f'pct_over_{str(threshold).replace(".", "_")}_L{window}'
-                    df[feature_name] = df.groupby('team_name')[col_name].transform(
-                        lambda x: x.shift(1).rolling(
-                            window=window, min_periods=1).mean()
-                    )
+                    df[feature_name] = self.rolling.rolling_mean(df[col_name], window)
                     self.feature_columns.append(feature_name)
 
         if 'both_scored' in df.columns:
             for window in [5, 10]:
                 feature_name = f'pct_btts_L{window}'
-                df[feature_name] = df.groupby('team_name')['both_scored'].transform(
-                    lambda x: x.shift(1).rolling(
-                        window=window, min_periods=1).mean()
-                )
+                df[feature_name] = self.rolling.rolling_mean(df['both_scored'], window)
                 self.feature_columns.append(feature_name)
 
         if 'clean_sheet' in df.columns:
             for window in [5, 10]:
                 feature_name = f'clean_sheet_rate_L{window}'
-                df[feature_name] = df.groupby('team_name')['clean_sheet'].transform(
-                    lambda x: x.shift(1).rolling(
-                        window=window, min_periods=1).mean()
-                )
+                df[feature_name] = self.rolling.rolling_mean(df['clean_sheet'], window)
                 self.feature_columns.append(feature_name)
 
         if 'failed_to_score' in df.columns:
             for window in [5, 10]:
                 feature_name = f'failed_to_score_rate_L{window}'
-                df[feature_name] = df.groupby('team_name')['failed_to_score'].transform(
-                    lambda x: x.shift(1).rolling(
-                        window=window, min_periods=1).mean()
-                )
+                df[feature_name] = self.rolling.rolling_mean(
+                    df['failed_to_score'], window)
                 self.feature_columns.append(feature_name)
 
         return df
@@ -401,10 +499,7 @@ class FeatureEngineer:
         for window in [5, 10]:
             for stat in available_defensive:
                 feature_name = f'{stat}_defensive_L{window}_mean'
-                df[feature_name] = df.groupby('team_name')[stat].transform(
-                    lambda x: x.shift(1).rolling(
-                        window=window, min_periods=1).mean()
-                )
+                df[feature_name] = self.rolling.rolling_mean(df[stat], window)
                 self.feature_columns.append(feature_name)
 
         return df
@@ -415,21 +510,20 @@ class FeatureEngineer:
 
         venue_stats = ['points', 'goals_for', 'goals_against', 'win']
 
+        # Each team's home and away matches form separate rolling groups
+        venue_rolling = RollingEngine([df['team_name'], df['venue']])
+
         for venue in ['Home', 'Away']:
-            venue_df = df[df['venue'] == venue].copy()
+            is_venue = (df['venue'] == venue).values
 
             for window in [3, 5]:
                 for stat in venue_stats:
                     if stat in df.columns:
                         feature_name = f'{stat}_{venue}_L{window}_mean'
-                        venue_df[feature_name] = venue_df.groupby('team_name')[stat].transform(
-                            lambda x: x.shift(1).rolling(
-                                window=window, min_periods=1).mean()
-                        )
-                        if feature_name not in df.columns:
-                            df[feature_name] = np.nan
-                        df.loc[venue_df.index,
-                               feature_name] = venue_df[feature_name]
+                        df[feature_name] = np.where(
+                            is_venue,
+                            venue_rolling.rolling_mean(df[stat], window),
+                            np.nan)
 
                         if feature_name not in self.feature_columns:
                             self.feature_columns.append(feature_name)
@@ -447,14 +541,9 @@ class FeatureEngineer:
             # xG Overperformance (finishing above expected)
             for window in [3, 5, 10]:
                 feature_name = f'xg_overperf_L{window}'
-                df[f'_gf_L{window}'] = df.groupby('team_name')['goals_for'].transform(
-                    lambda x: x.shift(1).rolling(
-                        window=window, min_periods=1).mean()
-                )
-                df[f'_xgf_L{window}'] = df.groupby('team_name')['xg_for'].transform(
-                    lambda x: x.shift(1).rolling(
-                        window=window, min_periods=1).mean()
-                )
+                df[f'_gf_L{window}'] = self.rolling.rolling_mean(
+                    df['goals_for'], window)
+                df[f'_xgf_L{window}'] = self.rolling.rolling_mean(df['xg_for'], window)
                 df[feature_name] = df[f'_gf_L{window}'] - df[f'_xgf_L{window}']
                 df.drop([f'_gf_L{window}', f'_xgf_L{window}'],
                         axis=1, inplace=True)
@@ -463,12 +552,8 @@ class FeatureEngineer:
         if 'xg_for' in df.columns:
             # xG Attacking Trend (are chances increasing?)
             feature_name = 'xg_for_momentum'
-            df['_xg_for_L3'] = df.groupby('team_name')['xg_for'].transform(
-                lambda x: x.shift(1).rolling(window=3, min_periods=1).mean()
-            )
-            df['_xg_for_L10'] = df.groupby('team_name')['xg_for'].transform(
-                lambda x: x.shift(1).rolling(window=10, min_periods=1).mean()
-            )
+            df['_xg_for_L3'] = self.rolling.rolling_mean(df['xg_for'], 3)
+            df['_xg_for_L10'] = self.rolling.rolling_mean(df['xg_for'], 10)
             df[feature_name] = (df['_xg_for_L3'] -
                                 df['_xg_for_L10']) / (df['_xg_for_L10'] + 0.01)
             df.drop(['_xg_for_L3', '_xg_for_L10'], axis=1, inplace=True)
@@ -478,14 +563,10 @@ class FeatureEngineer:
             # Defensive xG Gap (keeper/defense performing vs expected)
             for window in [3, 5]:
                 feature_name = f'xg_def_gap_L{window}'
-                df[f'_ga_L{window}'] = df.groupby('team_name')['goals_against'].transform(
-                    lambda x: x.shift(1).rolling(
-                        window=window, min_periods=1).mean()
-                )
-                df[f'_xga_L{window}'] = df.groupby('team_name')['xg_against'].transform(
-                    lambda x: x.shift(1).rolling(
-                        window=window, min_periods=1).mean()
-                )
+                df[f'_ga_L{window}'] = self.rolling.rolling_mean(
+                    df['goals_against'], window)
+                df[f'_xga_L{window}'] = self.rolling.rolling_mean(
+                    df['xg_against'], window)
                 df[feature_name] = df[f'_ga_L{window}'] - df[f'_xga_L{window}']
                 df.drop([f'_ga_L{window}', f'_xga_L{window}'],
                         axis=1, inplace=True)
@@ -494,12 +575,8 @@ class FeatureEngineer:
         if 'xg_against' in df.columns:
             # xG Defensive Trend (are chances conceded increasing?)
             feature_name = 'xg_against_momentum'
-            df['_xg_against_L3'] = df.groupby('team_name')['xg_against'].transform(
-                lambda x: x.shift(1).rolling(window=3, min_periods=1).mean()
-            )
-            df['_xg_against_L10'] = df.groupby('team_name')['xg_against'].transform(
-                lambda x: x.shift(1).rolling(window=10, min_periods=1).mean()
-            )
+            df['_xg_against_L3'] = self.rolling.rolling_mean(df['xg_against'], 3)
+            df['_xg_against_L10'] = self.rolling.rolling_mean(df['xg_against'], 10)
             df[feature_name] = (
                 df['_xg_against_L3'] - df['_xg_against_L10']) / (df['_xg_against_L10'] + 0.01)
             df.drop(['_xg_against_L3', '_xg_against_L10'],
@@ -516,39 +593,37 @@ class FeatureEngineer:
         """
         logger.info("Adding opponent features...")
 
-        # Key features to mirror for opponent
-        key_features = [
-            'goals_for_L3_mean', 'goals_for_L5_mean',
-            'goals_against_L3_mean', 'goals_against_L5_mean',
-            'xg_for_L3_mean', 'xg_for_L5_mean',
-            'xg_against_L3_mean', 'xg_against_L5_mean',
-            'points_L3_mean', 'points_L5_mean',
-            'form_L3_ppg', 'form_L5_ppg',
-            'win_rate_L5', 'win_rate_L10',
-            'xg_overperf_L3', 'xg_overperf_L5',
-            'xg_for_momentum', 'xg_against_momentum',
-            'pct_btts_L5', 'pct_over_2_5_L5',
-            'clean_sheet_rate_L5', 'failed_to_score_rate_L5'
-        ]
-
         # Filter to only features that exist
-        available_features = [f for f in key_features if f in df.columns]
+        available_features = [f for f in self.OPPONENT_FEATURES if f in df.columns]
+        opp_feature_names = [f'opp_{f}' for f in available_features]
 
-        # For each match, get opponent's stats
-        for feature in available_features:
-            opp_feature_name = f'opp_{feature}'
+        # Mirror rows: the row where `opponent` is this team on the same date
+        # is the opponent's own view of the fixture
+        mirror = df[['opponent', 'date'] + available_features].rename(
+            columns={'opponent': 'team_name',
+                     **dict(zip(available_features, opp_feature_names))})
 
-            # Create mapping: for each (team, date), get opponent's feature value
-            opponent_map = df.set_index(['opponent', 'date'])[feature]
+        duplicated = mirror.duplicated(['team_name', 'date'], keep=False)
+        if duplicated.any():
+            examples = mirror.loc[duplicated, ['team_name', 'date']].head(5)
+            raise ValueError(
+                f"Fixtures with more than one mirror row: "
+                f"{examples.to_dict('records')}")
 
-            # Map opponent's feature to current row
-            df[opp_feature_name] = df.apply(
-                lambda row: opponent_map.get(
-                    (row['team_name'], row['date']), 0),
-                axis=1
-            )
+        # One keyed join attaches every opp_* column at once
+        opp_df = df[['team_name', 'date']].merge(
+            mirror, on=['team_name', 'date'], how='left', indicator=True)
+
+        opp_block = opp_df[opp_feature_names].set_axis(df.index)
+
+        missing = (opp_df['_merge'] == 'left_only').values
+        if missing.any():
+            logger.warning(
+                f"{missing.sum()} rows have no mirror row for their opponent")
+            opp_block.loc[missing] = 0
 
-            self.feature_columns.append(opp_feature_name)
+        df = pd.concat([df, opp_block], axis=1)
+        self.feature_columns.extend(opp_feature_names)
 
         logger.info(f"Added {len(available_features)} opponent features")
         return df
@@ -560,16 +635,7 @@ class FeatureEngineer:
         """
         logger.info("Adding differential features...")
 
-        # Features to create differentials for
-        diff_features = [
-            'goals_for_L5_mean', 'goals_against_L5_mean',
-            'xg_for_L5_mean', 'xg_against_L5_mean',
-            'points_L5_mean', 'form_L5_ppg',
-            'win_rate_L5', 'xg_overperf_L5',
-            'pct_btts_L5', 'clean_sheet_rate_L5'
-        ]
-
-        for feature in diff_features:
+        for feature in self.DIFFERENTIAL_FEATURES:
             if feature in df.columns and f'opp_{feature}' in df.columns:
                 diff_name = f'diff_{feature}'
                 df[diff_name] = df[feature] - df[f'opp_{feature}']
@@ -585,38 +651,14 @@ class FeatureEngineer:
         """
         logger.info("Adding goal cross-features...")
 
-        # Combined goal threat (both teams' attacking)
-        if 'goals_for_L5_mean' in df.columns and 'opp_goals_for_L5_mean' in df.columns:
-            df['combined_goal_threat'] = (
-                df['goals_for_L5_mean'] + df['opp_goals_for_L5_mean']) / 2
-            self.feature_columns.append('combined_goal_threat')
-
-        # Combined defensive weakness (both teams' defending)
-        if 'goals_against_L5_mean' in df.columns and 'opp_goals_against_L5_mean' in df.columns:
-            df['combined_def_weakness'] = (
-                df['goals_against_L5_mean'] + df['opp_goals_against_L5_mean']) / 2
-            self.feature_columns.append('combined_def_weakness')
-
-        # BTTS likelihood index
-        if all(col in df.columns for col in ['goals_for_L5_mean', 'opp_goals_for_L5_mean',
-                                             'goals_against_L5_mean', 'opp_goals_against_L5_mean']):
-            df['btts_likelihood'] = (
-                (df['goals_for_L5_mean'] * df['opp_goals_against_L5_mean']) +
-                (df['opp_goals_for_L5_mean'] * df['goals_against_L5_mean'])
-            ) / 2
-            self.feature_columns.append('btts_likelihood')
-
-        # Total goals expected (team scoring + opponent scoring)
-        if 'goals_for_L5_mean' in df.columns and 'opp_goals_for_L5_mean' in df.columns:
-            df['total_goals_expected'] = df['goals_for_L5_mean'] + \
-                df['opp_goals_for_L5_mean']
-            self.feature_columns.append('total_goals_expected')
-
-        # xG-based total expected
-        if 'xg_for_L5_mean' in df.columns and 'opp_xg_for_L5_mean' in df.columns:
-            df['xg_total_expected'] = df['xg_for_L5_mean'] + \
-                df['opp_xg_for_L5_mean']
-            self.feature_columns.append('xg_total_expected')
+        for name, (operation, column, other) in self.CROSS_FEATURES.items():
+            team_a, team_b = df.get(column), df.get(other)
+            opp_a, opp_b = df.get(f'opp_{column}'), df.get(f'opp_{other}')
+            if any(values is None for values in (team_a, team_b, opp_a, opp_b)):
+                continue
+
+            df[name] = self.apply_operation(operation, team_a, team_b, opp_a, opp_b)
+            self.feature_columns.append(name)
 
         logger.info("Added goal cross-features")
         return df
@@ -636,25 +678,20 @@ class FeatureEngineer:
             if 'total_cards' in df.columns:
                 # Cards received by team
                 feature_name = f'cards_L{window}_mean'
-                df[feature_name] = df.groupby('team_name')['total_cards'].transform(
-                    lambda x: x.shift(1).rolling(
-                        window=window, min_periods=1).mean()
-                )
+                df[feature_name] = self.rolling.rolling_mean(df['total_cards'], window)
                 self.feature_columns.append(feature_name)
 
                 # Cards drawn (opponent receives)
                 feature_name = f'cards_drawn_L{window}_mean'
-                df[feature_name] = df.groupby('team_name')['total_cards_against'].transform(
-                    lambda x: x.shift(1).rolling(
-                        window=window, min_periods=1).mean()
-                )
+                df[feature_name] = self.rolling.rolling_mean(
+                    df['total_cards_against'], window)
                 self.feature_columns.append(feature_name)
 
         # Cards trend (increasing/decreasing discipline)
         if 'total_cards' in df.columns:
-            df['cards_trend'] = df.groupby('team_name')['total_cards'].transform(
-                lambda x: x.shift(1).rolling(window=3, min_periods=1).mean() -
-                x.shift(1).rolling(window=10, min_periods=1).mean()
+            df['cards_trend'] = (
+                self.rolling.rolling_mean(df['total_cards'], 3) -
+                self.rolling.rolling_mean(df['total_cards'], 10)
             )
             self.feature_columns.append('cards_trend')
 
@@ -662,6 +699,8 @@ class FeatureEngineer:
         return df
 
 
+    # Per-series reference implementations; generate_features uses the
+    # vectorized equivalents in services/streak_kernels.py
     @staticmethod
     def _calculate_streak_series(series, value):
         """Calculate current streak of a specific value"""
@@ -731,3 +770,151 @@ class FeatureEngineer:
         }
         
         return [f for f in self.feature_columns if f not in excluded_features]
+
+    # Non-feature columns kept by compact_frame: row identity and target sources
+    COMPACT_KEEP_COLUMNS = [
+        'team_name', 'opponent', 'date', 'season', 'round', 'venue', 'result',
+        'match_number', 'goals_for', 'goals_against', 'both_scored',
+        'over_0_5', 'over_1_5', 'over_2_5', 'over_3_5',
+        'cards_yellow', 'cards_red', 'cards_yellow_red',
+        'cards_yellow_against', 'cards_red_against', 'cards_yellow_red_against'
+    ]
+    COMPACT_CATEGORICAL_COLUMNS = ['team_name', 'opponent', 'venue', 'result']
+
+    def compact_frame(
+        self,
+        df: pd.DataFrame,
+        extra_columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Memory-lean copy of a feature frame for serving and training
+
+        Keeps model features, assembly plan source columns, COMPACT_KEEP_COLUMNS
+        and extra_columns; floats become float32, integers the smallest
+        integer type, and team/opponent/venue/result categoricals. Not for
+        frames the FeatureStore persists: incremental updates need the raw
+        columns.
+
+        Args:
+            df: Output of generate_features / FeatureStore.load_features
+            extra_columns: Further columns to keep (e.g. a saved plan's sources)
+
+        Returns:
+            Compacted DataFrame (same rows and index)
+        """
+        keep = set(self.get_model_feature_names()) | set(self.COMPACT_KEEP_COLUMNS)
+        keep |= {entry[side] for entry in self.get_assembly_plan()['features']
+                 for side in ('home', 'away') if entry.get(side) is not None}
+        keep |= set(extra_columns or [])
+
+        df = df[[col for col in df.columns if col in keep]].copy()
+
+        for col in df.columns:
+            if col in self.COMPACT_CATEGORICAL_COLUMNS:
+                df[col] = df[col].astype('category')
+            elif pd.api.types.is_float_dtype(df[col]):
+                df[col] = df[col].astype(np.float32)
+            elif pd.api.types.is_integer_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], downcast='integer')
+
+        return df
+
+    @staticmethod
+    def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> Dict:
+        """
+        Deep memory usage of a frame before/after compact_frame
+
+        Returns:
+            {'rows', 'columns_before', 'columns_after', 'bytes_before',
+             'bytes_after', 'saved_pct'}
+        """
+        bytes_before = int(before.memory_usage(deep=True).sum())
+        bytes_after = int(after.memory_usage(deep=True).sum())
+        return {
+            'rows': len(after),
+            'columns_before': before.shape[1],
+            'columns_after': after.shape[1],
+            'bytes_before': bytes_before,
+            'bytes_after': bytes_after,
+            'saved_pct': round((1 - bytes_after / bytes_before) * 100, 1) if bytes_before else 0.0
+        }
+
+    # Assembly plan operations: how a model feature is built for a new matchup
+    # from the home team's (team) and away team's (opp) latest feature rows
+    ASSEMBLY_OPERATIONS = ['home', 'away', 'diff', 'mean', 'sum', 'cross_product', 'constant']
+
+    @staticmethod
+    def apply_operation(operation: str, team_a, team_b, opp_a, opp_b):
+        """
+        Combine team/opponent values (scalars, arrays or Series)
+
+        `a` is the plan's home column, `b` its away column. Shared by
+        training (opp_* columns) and serving (away team's latest row).
+        """
+        if operation == 'home':
+            return team_a
+        elif operation == 'away':
+            return opp_b
+        elif operation == 'diff':
+            return team_a - opp_b
+        elif operation == 'mean':
+            return (team_a + opp_b) / 2
+        elif operation == 'sum':
+            return team_a + opp_b
+        elif operation == 'cross_product':
+            return ((team_a * opp_b) + (opp_a * team_b)) / 2
+        raise ValueError(f"Unsupported assembly operation: {operation}")
+
+    def get_assembly_plan(self, feature_names: Optional[List[str]] = None) -> Dict:
+        """
+        Declarative recipe for building model feature vectors at prediction time
+
+        Each entry maps a model feature to an operation on the home team's
+        column (`home`) and the away team's column (`away`):
+        - team features:     home
+        - opp_* features:    away  (away team's own base feature)
+        - diff_* features:   diff  (home - away)
+        - cross features:    mean / sum / cross_product (CROSS_FEATURES)
+        - is_home:           constant 1.0 (predictions are from the home side)
+
+        Args:
+            feature_names: Model features in training order
+                           (default: get_model_feature_names())
+
+        Returns:
+            JSON-serializable dict with version and per-feature entries
+        """
+        if feature_names is None:
+            feature_names = self.get_model_feature_names()
+
+        opponent = {f'opp_{f}': f for f in self.OPPONENT_FEATURES}
+        differential = {f'diff_{f}': f for f in self.DIFFERENTIAL_FEATURES}
+
+        entries = []
+        for name in feature_names:
+            if name in opponent:
+                entry = {'operation': 'away', 'home': None, 'away': opponent[name]}
+            elif name in differential:
+                entry = {'operation': 'diff', 'home': differential[name],
+                         'away': differential[name]}
+            elif name in self.CROSS_FEATURES:
+                operation, column, other = self.CROSS_FEATURES[name]
+                entry = {'operation': operation, 'home': column, 'away': other}
+            elif name == 'is_home':
+                entry = {'operation': 'constant', 'home': None, 'away': None, 'value': 1.0}
+            else:
+                entry = {'operation': 'home', 'home': name, 'away': None}
+
+            entries.append({'feature': name, **entry})
+
+        return {'version': self.VERSION, 'features': entries}
+
+    def save_assembly_plan(self, path, feature_names: Optional[List[str]] = None):
+        """Write the assembly plan as JSON (saved alongside trained models)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(path, 'w') as f:
+            json.dump(self.get_assembly_plan(feature_names), f, indent=2)
+
+        logger.info(f"Assembly plan saved to {path}")
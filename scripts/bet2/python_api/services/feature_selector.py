@@ -0,0 +1,200 @@
+"""
+Feature Selector Service
+Prunes redundant and unused model features before training
+
+Two passes over the training rows only (never the validation period):
+1. Correlation: features are standardized once in float32 and the
+   correlation with the already kept features is computed block by block
+   (one matrix product per block); a feature is dropped when |r| exceeds
+   config.CORRELATION_THRESHOLD with a kept feature, so the earlier
+   feature of each correlated pair survives. Constant features are dropped.
+2. Importance: a quick shallow XGBoost per market; features whose best
+   normalized gain across markets is at or below
+   config.FEATURE_IMPORTANCE_THRESHOLD are dropped.
+
+The selection is saved next to the models (feature_selection.json); the
+assembly plan saved with them lists the same features, which is what the
+Predictor uses at serving time.
+"""
+import numpy as np
+import logging
+import json
+import os
+import time
+import xgboost as xgb
+from pathlib import Path
+from typing import Dict, List
+
+from config import CORRELATION_THRESHOLD, FEATURE_IMPORTANCE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+# Quick importance pass: small, fast boosters (not the production settings)
+IMPORTANCE_PARAMS = {
+    'n_estimators': 50,
+    'max_depth': 3,
+    'learning_rate': 0.1,
+    'random_state': 42
+}
+
+
+class FeatureSelector:
+    """
+    Correlation + importance feature selection
+
+    Usage:
+        selector = FeatureSelector()
+        selection = selector.select(X_train, {'goals/over_2_5': y, ...}, feature_names)
+        X_train[:, selection['index']]
+        selector.save(selection, models_dir / 'feature_selection.json')
+    """
+
+    def __init__(
+        self,
+        correlation_threshold: float = CORRELATION_THRESHOLD,
+        importance_threshold: float = FEATURE_IMPORTANCE_THRESHOLD,
+        block_size: int = 64,
+        n_jobs: int = -1
+    ):
+        """
+        Initialize FeatureSelector
+
+        Args:
+            correlation_threshold: Drop a feature when |r| with a kept one exceeds this
+            importance_threshold: Drop a feature whose best per-market gain share
+                                  is at or below this (None skips the XGBoost pass)
+            block_size: Features per correlation block
+            n_jobs: Threads for the quick XGBoost pass
+        """
+        self.correlation_threshold = correlation_threshold
+        self.importance_threshold = importance_threshold
+        self.block_size = block_size
+        self.n_jobs = n_jobs
+
+    def select(self, X: np.ndarray, targets: Dict[str, np.ndarray],
+               columns: List[str]) -> Dict:
+        """
+        Select features on training rows
+
+        Args:
+            X: (n_rows, n_features) training matrix
+            targets: {market label: y} used by the importance pass
+            columns: Feature names of X's columns
+
+        Returns:
+            {'features': kept names (original order), 'index': their column
+             positions in X, 'dropped': {'constant': [...],
+             'correlated': {name: kept name it duplicates},
+             'low_importance': [...]}, 'thresholds': {...}}
+        """
+        started = time.perf_counter()
+        kept, constant, correlated = self._decorrelate(X, columns)
+
+        low_importance = []
+        if self.importance_threshold is not None and targets:
+            importance = self._importance(X[:, kept], targets)
+            low = importance <= self.importance_threshold
+            low_importance = [columns[i] for i in np.asarray(kept)[low]]
+            kept = [i for i, drop in zip(kept, low) if not drop]
+
+        logger.info(
+            f"Selected {len(kept)} of {len(columns)} features in "
+            f"{time.perf_counter() - started:.1f}s ({len(constant)} constant, "
+            f"{len(correlated)} correlated, {len(low_importance)} low importance)")
+
+        return {
+            'features': [columns[i] for i in kept],
+            'index': kept,
+            'dropped': {
+                'constant': constant,
+                'correlated': correlated,
+                'low_importance': low_importance
+            },
+            'thresholds': {
+                'correlation': self.correlation_threshold,
+                'importance': self.importance_threshold
+            }
+        }
+
+    @staticmethod
+    def save(selection: Dict, path: Path):
+        """Write the selection as JSON (saved alongside trained models)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(selection, f, indent=2)
+        os.replace(tmp_path, path)
+        logger.info(f"Feature selection saved to {path}")
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _decorrelate(self, X: np.ndarray, columns: List[str]):
+        """
+        Greedy correlation filter in column order, one block at a time
+
+        Returns:
+            (kept column positions, constant names, {dropped: kept partner})
+        """
+        Z = np.asarray(X, dtype=np.float32)
+        Z = Z - Z.mean(axis=0)
+        std = Z.std(axis=0)
+        constant_mask = ~(std > 0)
+        Z[:, ~constant_mask] /= std[~constant_mask]
+        n_rows = max(len(Z), 1)
+
+        kept, correlated = [], {}
+        for start in range(0, Z.shape[1], self.block_size):
+            block = [j for j in range(start, min(start + self.block_size, Z.shape[1]))
+                     if not constant_mask[j]]
+            if not block:
+                continue
+
+            # |r| against every feature kept so far, and within the block
+            against_kept = np.abs(Z[:, kept].T @ Z[:, block]) / n_rows if kept else None
+            within = np.abs(Z[:, block].T @ Z[:, block]) / n_rows
+
+            block_kept = []
+            for position, j in enumerate(block):
+                partner = None
+                if against_kept is not None:
+                    best = int(np.argmax(against_kept[:, position]))
+                    if against_kept[best, position] > self.correlation_threshold:
+                        partner = kept[best]
+                if partner is None and block_kept:
+                    scores = within[block_kept, position]
+                    best = int(np.argmax(scores))
+                    if scores[best] > self.correlation_threshold:
+                        partner = block[block_kept[best]]
+
+                if partner is None:
+                    block_kept.append(position)
+                else:
+                    correlated[columns[j]] = columns[partner]
+
+            kept.extend(block[position] for position in block_kept)
+
+        constant = [columns[j] for j in np.flatnonzero(constant_mask)]
+        return kept, constant, correlated
+
+    def _importance(self, X: np.ndarray, targets: Dict[str, np.ndarray]) -> np.ndarray:
+        """Best normalized gain of each column across the markets"""
+        importance = np.zeros(X.shape[1])
+
+        for label, y in targets.items():
+            classes = np.unique(y)
+            if len(classes) < 2:
+                continue
+
+            params = dict(IMPORTANCE_PARAMS, n_jobs=self.n_jobs)
+            if len(classes) > 2:
+                params.update(objective='multi:softprob', num_class=len(classes))
+
+            model = xgb.XGBClassifier(**params)
+            model.fit(X, np.searchsorted(classes, y))
+            importance = np.maximum(importance, model.feature_importances_)
+
+        return importance
@@ -0,0 +1,207 @@
+"""
+Feature Store Service
+Persists generated features per competition/season and updates them incrementally
+
+Layout:
+    data/features/<competition>/<season>.parquet   feature rows, keyed by team_name + date
+    data/features/<competition>/metadata.json      feature version and code hash, columns,
+                                                   high-water mark, source fingerprints
+"""
+import pandas as pd
+import logging
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from config import FEATURE_STORE_DIR
+from services.feature_engineering import feature_code_hash
+
+logger = logging.getLogger(__name__)
+
+
+class FeatureStore:
+    """
+    Keeps a persisted copy of FeatureEngineer output in sync with the CSV data
+
+    Usage:
+        store = FeatureStore(data_loader, feature_engineer)
+        df_with_features = store.load_features()
+    """
+
+    def __init__(self, data_loader, feature_engineer, store_dir: Path = None):
+        """
+        Initialize FeatureStore
+
+        Args:
+            data_loader: DataLoader for the competition
+            feature_engineer: FeatureEngineer used to (re)build features
+            store_dir: Base directory (default: config.FEATURE_STORE_DIR)
+        """
+        self.data_loader = data_loader
+        self.feature_engineer = feature_engineer
+        self.store_dir = Path(store_dir or FEATURE_STORE_DIR) / data_loader.competition
+        self.metadata_path = self.store_dir / 'metadata.json'
+
+    def load_features(self) -> pd.DataFrame:
+        """
+        Return features for all available seasons, updating the store if needed
+
+        - Source CSVs unchanged: read the stored Parquet files only
+        - Only newer matches appended: compute features for those rows only
+        - Anything else (new feature version or code, edited/late rows): full rebuild
+
+        Returns:
+            DataFrame with all features (sorted by team_name, date)
+        """
+        seasons = self.data_loader.get_available_seasons()
+        fingerprints = self._source_fingerprints(seasons)
+        metadata = self._read_metadata()
+
+        if self._is_compatible(metadata):
+            if metadata['sources'] == fingerprints:
+                stored = self._read_features(metadata)
+                if stored is not None:
+                    logger.info(f"Feature store up to date: {len(stored)} rows")
+                    self.feature_engineer.feature_columns = list(
+                        metadata['feature_columns'])
+                    return stored
+
+        raw = self.data_loader.load_multiple_seasons(seasons)
+
+        if self._is_compatible(metadata):
+            stored = self._read_features(metadata)
+            if stored is not None:
+                updated = self._update_incremental(stored, raw, metadata)
+                if updated is not None:
+                    features, touched = updated
+                    self._write(features, fingerprints, touched)
+                    return features
+
+        logger.info("Rebuilding feature store from scratch...")
+        features = self.feature_engineer.generate_features(raw)
+        self._write(features, fingerprints, touched=None)
+        return features
+
+    def get_high_water_mark(self) -> Optional[pd.Timestamp]:
+        """Latest match date held in the store (None if the store is empty)"""
+        metadata = self._read_metadata()
+        if not metadata or not metadata.get('high_water_mark'):
+            return None
+        return pd.Timestamp(metadata['high_water_mark'])
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _update_incremental(
+        self,
+        stored: pd.DataFrame,
+        raw: pd.DataFrame,
+        metadata: Dict
+    ) -> Optional[Tuple[pd.DataFrame, set]]:
+        """
+        Append features for matches newer than the high-water mark
+
+        Returns:
+            (features, touched seasons), or None if a full rebuild is needed
+        """
+        self.feature_engineer.feature_columns = list(metadata['feature_columns'])
+        high_water_mark = pd.Timestamp(metadata['high_water_mark'])
+        stored_keys = pd.MultiIndex.from_frame(stored[['team_name', 'date']])
+        raw_keys = pd.MultiIndex.from_frame(raw[['team_name', 'date']])
+
+        old_rows = (raw['date'] <= high_water_mark).values
+        if old_rows.sum() != len(stored) or not raw_keys[old_rows].isin(stored_keys).all():
+            logger.info("Stored rows no longer match the source data")
+            return None
+
+        new_df = raw[~old_rows]
+        if new_df.empty:
+            return stored, set()
+
+        new_features = self.feature_engineer.generate_features_incremental(
+            stored, new_df)
+
+        if list(new_features.columns) != list(stored.columns):
+            logger.info("Feature columns changed")
+            return None
+
+        features = pd.concat([stored, new_features], ignore_index=True)
+        features = features.sort_values(['team_name', 'date']).reset_index(drop=True)
+
+        logger.info(f"Feature store updated with {len(new_features)} new rows")
+        return features, set(new_features['season'].unique())
+
+    def _write(self, features: pd.DataFrame, fingerprints: Dict, touched: Optional[set]):
+        """Write touched seasons (all if None) and the metadata file"""
+        try:
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+
+            for season, season_df in features.groupby('season', sort=False):
+                if touched is None or season in touched:
+                    path = self.store_dir / f'{season}.parquet'
+                    tmp_path = path.with_suffix('.parquet.tmp')
+                    season_df.reset_index(drop=True).to_parquet(tmp_path, index=False)
+                    os.replace(tmp_path, path)
+
+            metadata = {
+                'version': self.feature_engineer.VERSION,
+                'code_hash': feature_code_hash(),
+                'rolling_windows': list(self.feature_engineer.rolling_windows),
+                'feature_columns': self.feature_engineer.get_feature_names(),
+                'seasons': sorted(features['season'].unique().tolist()),
+                'high_water_mark': features['date'].max().isoformat(),
+                'rows': len(features),
+                'sources': fingerprints
+            }
+
+            tmp_path = self.metadata_path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(metadata, f, indent=2)
+            os.replace(tmp_path, self.metadata_path)
+
+            logger.info(f"Feature store saved to {self.store_dir}")
+
+        except (ImportError, OSError) as e:
+            # Missing Parquet engine or read-only data dir: serve without persisting
+            logger.warning(f"Could not persist feature store: {e}")
+
+    def _read_features(self, metadata: Dict) -> Optional[pd.DataFrame]:
+        """Read all stored seasons; None if any file is missing or unreadable"""
+        try:
+            dfs = [pd.read_parquet(self.store_dir / f'{season}.parquet')
+                   for season in metadata['seasons']]
+        except (ImportError, OSError, ValueError) as e:
+            logger.warning(f"Could not read feature store: {e}")
+            return None
+
+        features = pd.concat(dfs, ignore_index=True)
+        if len(features) != metadata.get('rows'):
+            return None
+
+        return features.sort_values(['team_name', 'date']).reset_index(drop=True)
+
+    def _read_metadata(self) -> Optional[Dict]:
+        if not self.metadata_path.exists():
+            return None
+        try:
+            with open(self.metadata_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _is_compatible(self, metadata: Optional[Dict]) -> bool:
+        """Stored features were built by the same feature code and windows"""
+        return bool(metadata) and \
+            metadata.get('version') == self.feature_engineer.VERSION and \
+            metadata.get('code_hash') == feature_code_hash() and \
+            metadata.get('rolling_windows') == list(self.feature_engineer.rolling_windows)
+
+    def _source_fingerprints(self, seasons) -> Dict[str, list]:
+        """(mtime_ns, size) of each season's source file (CSV, or Arrow for Arrow-only seasons)"""
+        fingerprints = {}
+        for season in seasons:
+            _, mtime_ns, size = self.data_loader.source_fingerprint(season)
+            fingerprints[season] = [mtime_ns, size]
+        return fingerprints
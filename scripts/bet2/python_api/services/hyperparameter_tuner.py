@@ -0,0 +1,359 @@
+"""
+Hyperparameter Tuner Service
+Time-series successive-halving search per market, with an on-disk trial cache
+
+Every (market, algorithm) study samples candidate parameter sets (the current
+parameters are always one of them) and scores them by mean log-loss over
+expanding-window folds of the training period. Each rung keeps the best
+1/eta candidates and gives them eta times more boosting rounds / trees;
+XGBoost trials use early stopping, and the winning round count becomes its
+n_estimators. All trials of a rung (across markets) run on one process pool.
+
+Trial results are cached as JSON keyed by (feature-set hash, data hash,
+market, algorithm, params, budget, folds), so a rerun only evaluates trials
+that changed. Winners are written to a versioned params file
+(models/<competition>/params/v0001.json, v0002.json, ...) that the trainers
+overlay on their defaults (see load_tuned_params). A run over some groups
+starts from the previous version's markets, so each version holds the
+latest params of every market tuned so far.
+"""
+import numpy as np
+import logging
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import TRAINING_CPU_BUDGET, TUNING_CACHE_DIR
+from services.feature_engineering import FeatureEngineer
+from services.matrix_cache import matrix_file
+from services.training_orchestrator import (
+    TrainingOrchestrator, market_targets, model_params, build_model,
+    params_dir, load_tuned_params
+)
+
+logger = logging.getLogger(__name__)
+
+# Sampled per candidate: ('choice', values) | ('uniform', low, high) | ('log', low, high)
+SEARCH_SPACES = {
+    'xgboost': {
+        'max_depth': ('choice', [3, 4, 5, 6]),
+        'learning_rate': ('log', 0.02, 0.2),
+        'min_child_weight': ('choice', [1, 3, 5, 10]),
+        'subsample': ('uniform', 0.6, 1.0),
+        'colsample_bytree': ('uniform', 0.5, 1.0),
+        'gamma': ('uniform', 0.0, 0.3),
+        'reg_lambda': ('log', 0.5, 5.0)
+    },
+    'randomforest': {
+        'max_depth': ('choice', [6, 8, 10, 12, 15, None]),
+        'min_samples_split': ('choice', [2, 5, 10, 20]),
+        'min_samples_leaf': ('choice', [1, 2, 5, 10]),
+        'max_features': ('choice', ['sqrt', 0.2, 0.4])
+    }
+}
+
+# Boosting rounds per rung (XGBoost, early-stopped); RF uses fractions of its n_estimators
+XGB_ROUNDS = [100, 300, 900]
+EARLY_STOPPING_ROUNDS = 30
+
+
+class HyperparameterTuner:
+    """
+    Successive-halving search for every market x algorithm
+
+    Usage:
+        tuner = HyperparameterTuner('premier_league', n_candidates=16)
+        path = tuner.run(['match_result', 'goals'])   # writes params/vNNNN.json
+    """
+
+    ALGORITHMS = ['xgboost', 'randomforest']
+
+    def __init__(
+        self,
+        competition: str = 'premier_league',
+        n_candidates: int = 16,
+        eta: int = 3,
+        n_folds: int = 3,
+        cpu_budget: Optional[int] = TRAINING_CPU_BUDGET,
+        cache_dir: Optional[Path] = None,
+        seed: int = 42
+    ):
+        """
+        Initialize HyperparameterTuner
+
+        Args:
+            competition: Competition name (e.g., 'premier_league')
+            n_candidates: Parameter sets sampled per study (current params included)
+            eta: Halving factor (keep 1/eta of the candidates per rung)
+            n_folds: Expanding-window folds inside the training period
+            cpu_budget: CPUs shared by all trials (None = all available)
+            cache_dir: Trial cache (default: config.TUNING_CACHE_DIR/<competition>)
+            seed: Candidate sampling seed
+        """
+        self.competition = competition
+        self.n_candidates = max(1, n_candidates)
+        self.eta = max(2, eta)
+        self.n_folds = n_folds
+        self.cpu_budget = max(1, cpu_budget or os.cpu_count() or 1)
+        self.cache_dir = Path(cache_dir) if cache_dir else TUNING_CACHE_DIR / competition
+        self.seed = seed
+
+    def run(self, groups: Optional[List[str]] = None) -> Path:
+        """
+        Tune every market of the given groups and write a new params version
+
+        Returns:
+            Path of the written params file
+        """
+        groups = groups or TrainingOrchestrator.GROUPS
+
+        # Same data and split as training; tuning never sees the validation period
+        orchestrator = TrainingOrchestrator(self.competition)
+        orchestrator.prepare(groups)
+        X = orchestrator.X_train
+        folds = self._time_series_folds(len(X))
+
+        feature_hash = _hash({'version': FeatureEngineer.VERSION,
+                              'features': orchestrator.feature_columns})
+        data_hash = _hash_arrays([X])
+        current = load_tuned_params(self.competition)
+
+        studies = []
+        for (group, name), (family, y) in market_targets(orchestrator.train_df, groups).items():
+            label = group if name is None else f'{group}/{name}'
+            for algorithm in self.ALGORITHMS:
+                base = model_params(group, family, algorithm, current.get(label))
+                studies.append({
+                    'label': label,
+                    'algorithm': algorithm,
+                    'base': base,
+                    'y': y,
+                    'data_hash': _hash_arrays([X, y]),
+                    'candidates': self._sample(algorithm, base, label),
+                    'results': {}
+                })
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+
+        # Folds only reach rows of the training period, which lead the matrix
+        with matrix_file(orchestrator.matrix) as path:
+            for rung in range(len(XGB_ROUNDS)):
+                self._run_rung(studies, rung, folds, feature_hash, path)
+
+        logger.info(f"Tuning finished in {time.perf_counter() - started:.1f}s")
+        return self._write(studies, feature_hash, data_hash)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _time_series_folds(self, n_rows: int) -> List[Dict]:
+        """Expanding window: train on rows before each validation block"""
+        block = n_rows // (self.n_folds + 1)
+        return [{'train_end': block * (i + 1), 'val_end': block * (i + 2)}
+                for i in range(self.n_folds)]
+
+    def _sample(self, algorithm: str, base: Dict, label: str) -> List[Dict]:
+        """Current params plus n_candidates - 1 random draws (seeded per study)"""
+        rng = np.random.default_rng([self.seed, int(_hash(label + algorithm)[:8], 16)])
+        candidates = [dict(base)]
+
+        # Bounded, in case the space has fewer distinct points than requested
+        for _ in range(self.n_candidates * 20):
+            if len(candidates) >= self.n_candidates:
+                break
+            candidate = dict(base)
+            for key, spec in SEARCH_SPACES[algorithm].items():
+                if spec[0] == 'choice':
+                    value = spec[1][rng.integers(len(spec[1]))]
+                    candidate[key] = value.item() if hasattr(value, 'item') else value
+                elif spec[0] == 'uniform':
+                    candidate[key] = round(float(rng.uniform(spec[1], spec[2])), 4)
+                else:
+                    candidate[key] = round(float(np.exp(rng.uniform(
+                        np.log(spec[1]), np.log(spec[2])))), 4)
+            if candidate not in candidates:
+                candidates.append(candidate)
+
+        return candidates
+
+    def _budget(self, study: Dict, rung: int) -> int:
+        """Boosting rounds (XGBoost) or trees (RF) for a rung"""
+        if study['algorithm'] == 'xgboost':
+            return XGB_ROUNDS[rung]
+        n_estimators = study['base'].get('n_estimators', 100)
+        return max(10, n_estimators // self.eta ** (len(XGB_ROUNDS) - 1 - rung))
+
+    def _run_rung(self, studies: List[Dict], rung: int, folds: List[Dict],
+                  feature_hash: str, matrix_path: Path):
+        """Evaluate the surviving candidates of every study, then halve"""
+        trials = []
+        for study in studies:
+            budget = self._budget(study, rung)
+            for index, params in enumerate(study['candidates']):
+                key = _hash({
+                    'features': feature_hash, 'data': study['data_hash'],
+                    'market': study['label'], 'algorithm': study['algorithm'],
+                    # n_estimators is replaced by the rung budget
+                    'params': {k: v for k, v in params.items() if k != 'n_estimators'},
+                    'budget': budget, 'folds': folds,
+                    'early_stopping': EARLY_STOPPING_ROUNDS
+                })
+                cached = self._read_cache(key)
+                if cached is not None:
+                    study['results'][index] = cached
+                    continue
+
+                trials.append({
+                    'study': study, 'index': index, 'key': key,
+                    'job': {'algorithm': study['algorithm'], 'params': params,
+                            'budget': budget, 'y': study['y'], 'folds': folds}
+                })
+
+        processes = min(self.cpu_budget, len(trials)) if trials else 1
+        threads = max(1, self.cpu_budget // processes)
+        logger.info(f"Rung {rung + 1}/{len(XGB_ROUNDS)}: {len(trials)} trials to run "
+                    f"({sum(len(s['candidates']) for s in studies) - len(trials)} cached), "
+                    f"{processes} processes x {threads} threads")
+
+        jobs = [dict(trial['job'], threads=threads) for trial in trials]
+        if processes == 1:
+            outcomes = [evaluate_trial(job, matrix_path) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                outcomes = list(pool.map(evaluate_trial, jobs, [matrix_path] * len(jobs)))
+
+        for trial, outcome in zip(trials, outcomes):
+            self._write_cache(trial['key'], outcome)
+            trial['study']['results'][trial['index']] = outcome
+
+        # Keep the best 1/eta for the next rung; the current params (index 0)
+        # always stay, so the winner is never worse than them on the folds
+        last_rung = rung == len(XGB_ROUNDS) - 1
+        for study in studies:
+            ranked = sorted(range(len(study['candidates'])),
+                            key=lambda index: study['results'][index]['score'])
+            if last_rung:
+                best = ranked[0]
+                study['best'] = {'params': study['candidates'][best], **study['results'][best]}
+                study['baseline'] = study['results'][0]
+            else:
+                keep = [index for index in ranked[:max(1, len(ranked) // self.eta)] if index != 0]
+                study['candidates'] = [study['candidates'][index] for index in [0] + keep]
+                study['results'] = {}
+
+    def _read_cache(self, key: str) -> Optional[Dict]:
+        path = self.cache_dir / f'{key}.json'
+        if not path.exists():
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _write_cache(self, key: str, outcome: Dict):
+        tmp_path = self.cache_dir / f'{key}.json.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(outcome, f)
+        os.replace(tmp_path, self.cache_dir / f'{key}.json')
+
+    def _write(self, studies: List[Dict], feature_hash: str, data_hash: str) -> Path:
+        """Write the next params version (previous markets with this run's studies on top)"""
+        directory = params_dir(self.competition)
+        directory.mkdir(parents=True, exist_ok=True)
+        existing = sorted(directory.glob('v*.json'))
+        version = int(existing[-1].stem[1:]) + 1 if existing else 1
+
+        markets = {}
+        if existing:
+            with open(existing[-1], 'r') as f:
+                markets = json.load(f).get('markets', {})
+
+        for study in studies:
+            params = dict(study['best']['params'])
+            params.pop('n_jobs', None)
+            if study['algorithm'] == 'xgboost':
+                # Early-stopped round count of the winning trial
+                params['n_estimators'] = study['best']['n_estimators']
+
+            markets.setdefault(study['label'], {})[study['algorithm']] = {
+                'params': params,
+                'log_loss': study['best']['score'],
+                'baseline_log_loss': study['baseline']['score'],
+                'version': version
+            }
+            logger.info(f"  {study['label']:<30} {study['algorithm']:<13} "
+                        f"log-loss {study['baseline']['score']:.4f} -> {study['best']['score']:.4f}")
+
+        path = directory / f'v{version:04d}.json'
+        with open(path, 'w') as f:
+            json.dump({
+                'version': version,
+                'created_at': datetime.now().isoformat(),
+                'feature_version': FeatureEngineer.VERSION,
+                'feature_hash': feature_hash,
+                'data_hash': data_hash,
+                'metric': 'log_loss',
+                'folds': self.n_folds,
+                'markets': markets
+            }, f, indent=2)
+
+        logger.info(f"Tuned params saved to {path}")
+        return path
+
+
+def evaluate_trial(job: Dict, matrix_path: Path) -> Dict:
+    """
+    Mean validation log-loss of one parameter set over the time-series folds
+
+    Returns:
+        {'score': mean log-loss, 'n_estimators': early-stopped rounds (XGBoost)
+         or trees used}
+    """
+    X = np.load(matrix_path, mmap_mode='r')
+    y = job['y']
+    params = dict(job['params'], n_estimators=job['budget'], n_jobs=job['threads'])
+    if job['algorithm'] == 'xgboost':
+        params['early_stopping_rounds'] = EARLY_STOPPING_ROUNDS
+
+    scores, rounds = [], []
+    for fold in job['folds']:
+        train = slice(0, fold['train_end'])
+        val = slice(fold['train_end'], fold['val_end'])
+
+        model = build_model(job['algorithm'], params)
+        if job['algorithm'] == 'xgboost':
+            model.fit(X[train], y[train], eval_set=[(X[val], y[val])], verbose=False)
+            rounds.append(model.best_iteration + 1)
+        else:
+            model.fit(X[train], y[train])
+            rounds.append(job['budget'])
+
+        scores.append(_log_loss(y[val], model.predict_proba(X[val]), model.classes_))
+
+    return {'score': float(np.mean(scores)), 'n_estimators': int(np.median(rounds))}
+
+
+def _log_loss(y: np.ndarray, proba: np.ndarray, classes: np.ndarray) -> float:
+    """Log-loss tolerant of classes missing from the validation block"""
+    index = np.searchsorted(classes, y)
+    index = np.clip(index, 0, len(classes) - 1)
+    p = np.where(classes[index] == y, proba[np.arange(len(y)), index], 0.0)
+    return float(-np.mean(np.log(np.clip(p, 1e-15, 1.0))))
+
+
+def _hash(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _hash_arrays(arrays: List[np.ndarray]) -> str:
+    digest = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.shape, array.dtype.str)).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
@@ -0,0 +1,267 @@
+"""
+Matrix Cache Service
+Materializes the float32 training matrix once and shares it between trainers
+
+Layout:
+    data/matrix_cache/<competition>/<key>/X.npy         float32 model features
+    data/matrix_cache/<competition>/<key>/rows.parquet  targets and row metadata
+    data/matrix_cache/<competition>/<key>/meta.json     columns, key inputs
+
+The key hashes the season source files (DataLoader.source_file: the CSV, or
+the Arrow file of an Arrow-only season), the feature code (FeatureEngineer
+version, rolling windows, feature_code_hash of the feature modules and the
+source of the target builder) and the row view, so any change to data or
+feature code lands in a new entry. Stale entries of the same view and columns are removed
+on write; entries of other column subsets (another run's feature selection,
+possibly still training from them) are kept, up to the most recently used
+MATRIX_CACHE_SELECTIONS per view.
+X.npy is opened memory-mapped: trainers and worker processes slice it
+without copying.
+"""
+import numpy as np
+import pandas as pd
+import hashlib
+import inspect
+import logging
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import MATRIX_CACHE_DIR, MATRIX_CACHE_SELECTIONS, COMPACT_FEATURE_FRAMES
+from services.feature_engineering import feature_code_hash
+from services.feature_store import FeatureStore
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+
+# Kept in the row frame even when they are also model features
+ROW_COLUMNS = ['team_name', 'date', 'season', 'round', 'venue', 'match_number', 'result']
+# Added by add_targets
+TARGET_COLUMNS = ['match_total_cards', 'team_total_cards', 'result_encoded']
+
+
+class MatrixCache:
+    """
+    Cached (X, targets, columns) for one competition
+
+    Usage:
+        cache = MatrixCache(data_loader, feature_engineer)
+        matrix = cache.load(min_match_number=5)
+        matrix['X'][:split], matrix['rows']['result_encoded']
+    """
+
+    def __init__(self, data_loader, feature_engineer, cache_dir: Path = None,
+                 compact: bool = COMPACT_FEATURE_FRAMES,
+                 max_selections: int = MATRIX_CACHE_SELECTIONS):
+        """
+        Initialize MatrixCache
+
+        Args:
+            data_loader: DataLoader for the competition
+            feature_engineer: FeatureEngineer that builds the features
+            cache_dir: Base directory (default: config.MATRIX_CACHE_DIR)
+            compact: Store the row frame via FeatureEngineer.compact_frame
+            max_selections: Column-subset entries kept per row view
+        """
+        self.data_loader = data_loader
+        self.feature_engineer = feature_engineer
+        self.cache_dir = Path(cache_dir or MATRIX_CACHE_DIR) / data_loader.competition
+        self.compact = compact
+        self.max_selections = max_selections
+
+    def load(self, min_match_number: int = 5, columns: Optional[List[str]] = None) -> Dict:
+        """
+        Date-ordered feature matrix and row frame, built on first use
+
+        Args:
+            min_match_number: Drop each team's first matches (0 keeps every row)
+            columns: Subset of model features (e.g. a FeatureSelector selection),
+                     cached as its own entry; None = every model feature
+
+        Returns:
+            {'X': float32 (n_rows, n_features), memory-mapped when cached,
+             'rows': DataFrame with targets and non-feature columns,
+             'columns': model feature names, 'path': X.npy path or None}
+        """
+        view = {'min_match_number': min_match_number, 'compact': self.compact,
+                'selected': columns is not None}
+        key = self.cache_key(view, columns)
+        entry = self.cache_dir / key
+
+        matrix = self._read(entry)
+        if matrix is not None:
+            logger.info(f"Training matrix cache hit: {matrix['X'].shape}")
+            return matrix
+
+        if columns is None:
+            matrix = self._build(min_match_number)
+        else:
+            full = self.load(min_match_number)
+            index = [full['columns'].index(column) for column in columns]
+            matrix = dict(full, X=np.ascontiguousarray(full['X'][:, index]),
+                          columns=list(columns), path=None)
+
+        try:
+            self._write(entry, matrix, view)
+            self._prune(key, view, matrix['columns'])
+            return self._read(entry)
+        except (ImportError, OSError) as e:
+            # Missing Parquet engine or read-only data dir: serve from memory
+            logger.warning(f"Could not persist training matrix: {e}")
+            return matrix
+
+    def cache_key(self, view: Dict, columns: Optional[List[str]] = None) -> str:
+        """Hash of season source files, feature code, row view and column subset"""
+        # Imported here: training_orchestrator imports this module
+        from services.training_orchestrator import add_targets
+
+        digest = hashlib.sha256()
+        for season in self.data_loader.get_available_seasons():
+            digest.update(season.encode())
+            with open(self.data_loader.source_file(season), 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+
+        digest.update(json.dumps({
+            'format': FORMAT_VERSION,
+            'version': self.feature_engineer.VERSION,
+            'rolling_windows': list(self.feature_engineer.rolling_windows),
+            'view': view,
+            'columns': columns
+        }, sort_keys=True).encode())
+        digest.update(feature_code_hash().encode())
+        digest.update(inspect.getsource(add_targets).encode())
+
+        return digest.hexdigest()[:20]
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _build(self, min_match_number: int) -> Dict:
+        """Features from the FeatureStore, sorted by date, with targets"""
+        from services.training_orchestrator import add_targets
+
+        df = FeatureStore(self.data_loader, self.feature_engineer).load_features()
+        df = df.sort_values('date').reset_index(drop=True)
+        df = df[df['match_number'] >= min_match_number].reset_index(drop=True)
+        df = add_targets(df)
+
+        columns = self.feature_engineer.get_model_feature_names()
+        logger.info(f"Built training matrix: {len(df)} rows x {len(columns)} features")
+
+        rows = df.drop(columns=[c for c in columns if c not in ROW_COLUMNS])
+        if self.compact:
+            compact = self.feature_engineer.compact_frame(rows, extra_columns=TARGET_COLUMNS)
+            report = self.feature_engineer.memory_report(rows, compact)
+            logger.info(f"Row frame: {report['bytes_before'] / 1e6:.1f}MB -> "
+                        f"{report['bytes_after'] / 1e6:.1f}MB")
+            rows = compact
+
+        return {
+            'X': df[columns].to_numpy(dtype=np.float32),
+            'rows': rows,
+            'columns': columns,
+            'path': None
+        }
+
+    def _write(self, entry: Path, matrix: Dict, view: Dict):
+        """Write the entry into a temp dir, then rename it into place"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix='.tmp_', dir=self.cache_dir))
+
+        try:
+            np.save(tmp_dir / 'X.npy', matrix['X'])
+            matrix['rows'].to_parquet(tmp_dir / 'rows.parquet', index=False)
+            with open(tmp_dir / 'meta.json', 'w') as f:
+                json.dump({
+                    'format': FORMAT_VERSION,
+                    'view': view,
+                    'shape': list(matrix['X'].shape),
+                    'columns': matrix['columns'],
+                    'feature_columns': self.feature_engineer.get_feature_names()
+                }, f, indent=2)
+
+            if entry.exists():
+                shutil.rmtree(entry)
+            os.replace(tmp_dir, entry)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        logger.info(f"Training matrix cached in {entry}")
+
+    def _read(self, entry: Path) -> Optional[Dict]:
+        """Memory-map a cached entry; None if missing or unreadable"""
+        try:
+            with open(entry / 'meta.json', 'r') as f:
+                meta = json.load(f)
+            X = np.load(entry / 'X.npy', mmap_mode='r')
+            rows = pd.read_parquet(entry / 'rows.parquet')
+        except (ImportError, OSError, ValueError):
+            return None
+
+        if list(X.shape) != meta['shape'] or len(rows) != meta['shape'][0]:
+            return None
+
+        try:
+            os.utime(entry / 'meta.json')  # recency for _prune
+        except OSError:
+            pass
+
+        # Same side effect as a FeatureStore load (feature names for the engineer)
+        self.feature_engineer.feature_columns = list(meta['feature_columns'])
+        return {'X': X, 'rows': rows, 'columns': meta['columns'], 'path': entry / 'X.npy'}
+
+    def _prune(self, key: str, view: Dict, columns: List[str]):
+        """
+        Remove older entries of the same view and columns; of the other column
+        subsets of this view keep the most recently used (max_selections in all)
+        """
+        selections = []
+        for meta_path in self.cache_dir.glob('*/meta.json'):
+            if meta_path.parent.name == key:
+                continue
+            try:
+                with open(meta_path, 'r') as f:
+                    meta = json.load(f)
+                used = meta_path.stat().st_mtime_ns
+            except (OSError, ValueError):
+                shutil.rmtree(meta_path.parent, ignore_errors=True)
+                continue
+
+            if meta.get('view') != view:
+                continue
+            if view['selected'] and meta.get('columns') != columns:
+                selections.append((used, meta_path))
+            else:
+                shutil.rmtree(meta_path.parent, ignore_errors=True)
+
+        selections.sort(reverse=True)
+        for _, meta_path in selections[max(0, self.max_selections - 1):]:
+            shutil.rmtree(meta_path.parent, ignore_errors=True)
+
+
+@contextmanager
+def matrix_file(matrix: Dict):
+    """
+    Path of an .npy copy of matrix['X'] that worker processes can memory-map
+
+    The cache entry itself when the matrix is cached; otherwise a temporary
+    file in shared memory, removed on exit.
+    """
+    if matrix['path'] is not None:
+        yield matrix['path']
+        return
+
+    tmp_dir = Path(tempfile.mkdtemp(
+        prefix='matrix_', dir='/dev/shm' if os.path.isdir('/dev/shm') else None))
+    try:
+        np.save(tmp_dir / 'X.npy', matrix['X'])
+        yield tmp_dir / 'X.npy'
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
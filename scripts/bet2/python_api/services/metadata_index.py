@@ -0,0 +1,250 @@
+"""
+Metadata Index Service
+Small JSON index of competitions, seasons and teams for the dashboard
+
+Layout (config.METADATA_INDEX_PATH, default data/metadata_index.json):
+    {'competitions': [{'id', 'name', 'country', 'active'}, ...],
+     'competitions_source': {'mtime_ns', 'size'},
+     'seasons': {<competition>: {<season>: {'teams': [...], 'rows', 'matches',
+                                            'start', 'end', 'source': {...}}}}}
+
+The data updater refreshes the index after each scrape. Readers stat the
+source files (competitions.csv and the season CSV / Arrow files) and rebuild
+only the entries whose (mtime_ns, size) changed, so a manual edit is picked
+up on the next request. Built with the csv / json standard library modules
+only: get_teams.py and get_competitions.py never import pandas.
+"""
+import csv
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import DATA_DIR, METADATA_INDEX_PATH
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+SEASON_SUFFIXES = ['_all_teams.csv', '_all_teams.arrow']
+
+
+class MetadataIndex:
+    """
+    Competitions -> seasons -> teams, date ranges and row counts
+
+    Usage:
+        index = MetadataIndex()
+        index.teams('premier_league', '2025-2026')
+        index.competitions()
+        index.refresh()  # after a data update
+    """
+
+    def __init__(self, data_dir: Path = None, index_path: Path = None):
+        """
+        Initialize MetadataIndex
+
+        Args:
+            data_dir: Base data directory (default: config.DATA_DIR)
+            index_path: Index file (default: config.METADATA_INDEX_PATH)
+        """
+        self.data_dir = Path(data_dir or DATA_DIR)
+        self.index_path = Path(index_path or (
+            METADATA_INDEX_PATH if data_dir is None else self.data_dir / 'metadata_index.json'))
+        self._index = None
+
+    def competitions(self) -> List[Dict]:
+        """
+        Competitions from competitions.csv with their seasons (most recent first)
+
+        Raises:
+            FileNotFoundError: competitions.csv is missing
+        """
+        index = self._current()
+        if index['competitions_source'] is None:
+            raise FileNotFoundError("Competitions file not found")
+
+        return [
+            {
+                'id': competition['id'],
+                'name': competition['name'],
+                'country': competition['country'],
+                'seasons': sorted(index['seasons'].get(competition['id'], {}), reverse=True),
+                'active': competition['active']
+            }
+            for competition in index['competitions']
+        ]
+
+    def seasons(self, competition: str) -> List[str]:
+        """Available seasons of a competition, most recent first"""
+        return sorted(self._current(competition)['seasons'].get(competition, {}), reverse=True)
+
+    def season_info(self, competition: str, season: str) -> Dict:
+        """
+        Index entry of one season
+
+        Returns:
+            {'teams': sorted team names, 'rows': team-match rows,
+             'matches': rows // 2, 'start': first date, 'end': last date,
+             'source': {'file', 'mtime_ns', 'size'}}
+
+        Raises:
+            ValueError: Unknown competition
+            FileNotFoundError: No data file for the season
+        """
+        if not (self.data_dir / competition).is_dir():
+            raise ValueError(f"Data directory not found for competition: {competition}")
+
+        entry = self._current(competition)['seasons'].get(competition, {}).get(season)
+        if entry is None:
+            raise FileNotFoundError(
+                f"Data file not found: {self.data_dir / competition / (season + SEASON_SUFFIXES[0])}")
+        return entry
+
+    def teams(self, competition: str, season: str) -> List[str]:
+        """Sorted team names of a season"""
+        return self.season_info(competition, season)['teams']
+
+    def refresh(self) -> Dict:
+        """Rebuild every stale entry and write the index; returns the index"""
+        self._index = None
+        return self._current()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _current(self, competition: Optional[str] = None) -> Dict:
+        """
+        Index with stale entries rebuilt
+
+        Only `competition` is checked when given (every competition otherwise).
+        The file is rewritten when anything changed; a failed write (read-only
+        data dir) still serves the rebuilt index from memory.
+        """
+        if self._index is None:
+            self._index = self._read()
+        index = self._index
+        changed = False
+
+        source = self._stat(self.data_dir / 'competitions.csv')
+        if source != index['competitions_source']:
+            index['competitions'] = self._read_competitions() if source else []
+            index['competitions_source'] = source
+            changed = True
+
+        if competition is not None:
+            names = [competition] if (self.data_dir / competition).is_dir() else []
+        else:
+            names = sorted(path.name for path in self.data_dir.iterdir() if path.is_dir())
+
+        for name in names:
+            seasons = index['seasons'].get(name, {})
+            current = self._scan(name, seasons)
+            if current != seasons:
+                if current:
+                    index['seasons'][name] = current
+                else:
+                    index['seasons'].pop(name, None)
+                changed = True
+
+        if competition is None:
+            for name in [name for name in index['seasons'] if name not in names]:
+                del index['seasons'][name]
+                changed = True
+
+        if changed:
+            self._write(index)
+        return index
+
+    def _scan(self, competition: str, seasons: Dict) -> Dict:
+        """Season entries of one competition, reusing the ones still current"""
+        files = {}
+        for suffix in reversed(SEASON_SUFFIXES):
+            # CSV wins over Arrow: it is the source the Arrow file is imported from
+            for path in (self.data_dir / competition).glob(f'*{suffix}'):
+                files[path.name[:-len(suffix)]] = path
+
+        current = {}
+        for season, path in sorted(files.items()):
+            source = dict(self._stat(path), file=path.name)
+            entry = seasons.get(season)
+            if entry is None or entry['source'] != source:
+                logger.info(f"Indexing {competition} {season} from {path.name}")
+                entry = dict(self._summarize(path), source=source)
+            current[season] = entry
+        return current
+
+    def _summarize(self, path: Path) -> Dict:
+        """Teams, row count and date range of a season file"""
+        if path.suffix == '.csv':
+            with open(path, newline='') as f:
+                pairs = [(row['team_name'], row['date'])
+                         for row in csv.DictReader(f) if row.get('team_name')]
+        else:
+            from pyarrow import feather
+
+            table = feather.read_table(path, columns=['team_name', 'date'], memory_map=True)
+            pairs = [(team, '' if date is None else str(date)) for team, date in zip(
+                table.column('team_name').to_pylist(), table.column('date').to_pylist())
+                if team]
+
+        dates = [date[:10] for _, date in pairs if date]
+        return {
+            'teams': sorted({team for team, _ in pairs}),
+            'rows': len(pairs),
+            'matches': len(pairs) // 2,  # Each match appears twice
+            'start': min(dates) if dates else None,
+            'end': max(dates) if dates else None
+        }
+
+    def _read_competitions(self) -> List[Dict]:
+        with open(self.data_dir / 'competitions.csv', newline='') as f:
+            return [
+                {
+                    'id': row['competition_id'],
+                    'name': row['competition_name'],
+                    'country': row['country'],
+                    'active': row['active'].strip() not in ('', '0')
+                }
+                for row in csv.DictReader(f)
+            ]
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[Dict]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    def _read(self) -> Dict:
+        """Stored index, or an empty one if missing, unreadable or outdated"""
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+            if index.get('format') == FORMAT_VERSION:
+                return index
+        except (OSError, ValueError):
+            pass
+        return {'format': FORMAT_VERSION, 'competitions': [],
+                'competitions_source': None, 'seasons': {}}
+
+    def _write(self, index: Dict):
+        """Atomic write (concurrent readers may rebuild at the same time)"""
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                prefix='.metadata_index_', suffix='.tmp', dir=self.index_path.parent)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(index, f, indent=2)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            # Not a warning: PHP reads these scripts' stderr as part of the JSON
+            logger.info(f"Could not write metadata index: {e}")
+            return
+        logger.info(f"Metadata index written to {self.index_path}")
@@ -0,0 +1,399 @@
+"""
+Metrics Tracker Service
+Accuracy metrics of matched predictions for every market, line and model
+
+All markets (1X2, goals and cards O/U lines, BTTS) and model types are scored
+in one vectorized pass: the matched predictions are stacked into one long
+frame (a row per prediction and market) and every statistic is a single
+np.bincount over the (market, model_type) group codes.
+
+The statistics are additive: counts, correct predictions, summed Brier
+losses, the confusion matrix, histograms of the predicted probability by
+outcome (ROC-AUC, at 1/AUC_RESOLUTION) and calibration bins. They are stored
+per (market, model_type) in the metric_state table, so an update folds in
+only the predictions matched since the previous one (predictions.metrics_folded)
+and rewrites accuracy_metrics / market_performance from the merged totals.
+ROI assumes a 1-unit bet on every prediction at flat odds (config.BACKTEST_ODDS).
+"""
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import BACKTEST_ODDS, METRICS_CALIBRATION_BINS, METRICS_MIN_RECOMMENDED
+from services.database_service import DatabaseService
+
+logger = logging.getLogger(__name__)
+
+MATCH_RESULT_LABELS = ['Home Win', 'Draw', 'Away Win']
+MATCH_RESULT_PROBABILITIES = ['prob_home', 'prob_draw', 'prob_away']
+
+# (market, metric_type, prediction column, probability column, outcome column, line)
+BINARY_MARKETS = [
+    ('O/U 0.5', 'goals_over_under', 'prediction_goals_05', 'prob_over_05', 'total_goals', 0.5),
+    ('O/U 1.5', 'goals_over_under', 'prediction_goals_15', 'prob_over_15', 'total_goals', 1.5),
+    ('O/U 2.5', 'goals_over_under', 'prediction_goals_25', 'prob_over_25', 'total_goals', 2.5),
+    ('O/U 3.5', 'goals_over_under', 'prediction_goals_35', 'prob_over_35', 'total_goals', 3.5),
+    ('BTTS', 'btts', 'prediction_btts', 'prob_btts_yes', 'btts', 0.5),
+    ('Cards O/U 2.5', 'cards_over_under', 'prediction_cards_25', 'prob_cards_over_25', 'total_cards', 2.5),
+    ('Cards O/U 3.5', 'cards_over_under', 'prediction_cards_35', 'prob_cards_over_35', 'total_cards', 3.5),
+    ('Cards O/U 4.5', 'cards_over_under', 'prediction_cards_45', 'prob_cards_over_45', 'total_cards', 4.5),
+]
+
+MARKETS = ['1X2'] + [market[0] for market in BINARY_MARKETS]
+METRIC_TYPES = {'1X2': 'match_result', **{market[0]: market[1] for market in BINARY_MARKETS}}
+
+# Labels predicting the positive class of a binary market ('Over 2.5' in older rows)
+POSITIVE_LABELS = ('Over', 'Yes')
+
+# Confusion matrices are 3x3 for every market (binary markets use classes 0 and 1)
+CLASSES = 3
+
+# Probability resolution of the ROC-AUC histograms
+AUC_RESOLUTION = 1000
+
+
+class MetricsTracker:
+    """
+    Incremental accuracy metrics (accuracy_metrics, market_performance)
+
+    Usage:
+        tracker = MetricsTracker()
+        tracker.update()              # fold in newly matched predictions
+        tracker.update(rebuild=True)  # recompute from the full history
+        tracker.summary()             # analytics dashboard figures
+    """
+
+    def __init__(self, db: DatabaseService = None, odds: float = BACKTEST_ODDS,
+                 calibration_bins: int = METRICS_CALIBRATION_BINS):
+        """
+        Initialize MetricsTracker
+
+        Args:
+            db: Database to read predictions from and store metrics in
+            odds: Flat decimal odds for ROI
+            calibration_bins: Equal-width confidence bins of the calibration curve
+        """
+        self.db = db or DatabaseService()
+        self.odds = odds
+        self.calibration_bins = calibration_bins
+
+    def update(self, rebuild: bool = False) -> Dict:
+        """
+        Fold matched predictions not yet counted into the stored statistics and
+        rewrite accuracy_metrics / market_performance (one transaction)
+
+        Args:
+            rebuild: Discard the stored statistics and fold in the full history
+
+        Returns:
+            {'success', 'folded': predictions folded in, 'metrics': accuracy_metrics
+             rows, 'performance': market_performance rows}
+        """
+        states = {} if rebuild else self.db.get_metric_states()
+        if any(len(state['calibration_count']) != self.calibration_bins
+               for state in states.values()):
+            logger.info("Calibration bins changed, rebuilding metric states")
+            rebuild, states = True, {}
+
+        rows = self.db.get_matched_outcomes(unfolded_only=not rebuild)
+        increments = self.fold(pd.DataFrame(rows))
+        states = merge_states(states, increments)
+
+        result = {
+            'success': True,
+            'folded': len(rows),
+            'metrics': self.metrics(states),
+            'performance': self.market_performance(states)
+        }
+        if rows or rebuild:
+            result['success'] = self.db.save_metric_states(
+                {key: states[key] for key in increments}, result['metrics'],
+                result['performance'], [row['id'] for row in rows], rebuild=rebuild)
+        return result
+
+    def fold(self, df: pd.DataFrame) -> Dict[Tuple[str, str], Dict]:
+        """
+        Statistics of matched predictions (get_matched_outcomes rows)
+
+        Returns:
+            {(market, model_type): state} for the groups present in df
+        """
+        frame = self._long_frame(df)
+        if frame.empty:
+            return {}
+
+        codes, keys = pd.MultiIndex.from_frame(frame[['market', 'model_type']]).factorize()
+        groups = len(keys)
+
+        def count(index: np.ndarray, size: int, weights=None) -> np.ndarray:
+            return np.bincount(index, weights, minlength=groups * size).reshape(groups, size)
+
+        y_true = frame['y_true'].to_numpy()
+        y_pred = frame['y_pred'].to_numpy()
+        correct = (y_true == y_pred).astype(float)
+        confidence = frame['confidence'].to_numpy()
+
+        predictions = count(codes, 1)[:, 0]
+        hits = count(codes, 1, correct)[:, 0]
+        squared_error = count(codes, 1, frame['squared_error'].to_numpy())[:, 0]
+        confusion = count(codes * CLASSES ** 2 + y_true * CLASSES + y_pred, CLASSES ** 2)
+
+        bins = np.clip((confidence * self.calibration_bins).astype(int), 0, self.calibration_bins - 1)
+        calibration_index = codes * self.calibration_bins + bins
+        calibration_count = count(calibration_index, self.calibration_bins)
+        calibration_confidence = count(calibration_index, self.calibration_bins, confidence)
+        calibration_hits = count(calibration_index, self.calibration_bins, correct)
+
+        # Probability histograms of negative / positive outcomes (binary markets)
+        binary = frame['score'].notna().to_numpy()
+        width = AUC_RESOLUTION + 1
+        score = np.rint(frame['score'].to_numpy()[binary] * AUC_RESOLUTION).astype(int)
+        histograms = count(
+            codes[binary] * 2 * width + y_true[binary] * width + score, 2 * width)
+
+        states = {}
+        for g, (market, model_type) in enumerate(keys):
+            state = {
+                'predictions': int(predictions[g]),
+                'correct': int(round(hits[g])),
+                'squared_error': float(squared_error[g]),
+                'confusion': confusion[g].astype(int).tolist(),
+                'calibration_count': calibration_count[g].astype(int).tolist(),
+                'calibration_confidence': calibration_confidence[g].tolist(),
+                'calibration_hits': np.rint(calibration_hits[g]).astype(int).tolist()
+            }
+            if market != '1X2':
+                state['negatives'] = histograms[g, :width].astype(int).tolist()
+                state['positives'] = histograms[g, width:].astype(int).tolist()
+            states[(market, model_type)] = state
+
+        return states
+
+    def metrics(self, states: Dict[Tuple[str, str], Dict]) -> List[Dict]:
+        """accuracy_metrics rows (all time) of every (market, model_type)"""
+        metrics = []
+        for (market, model_type), state in sorted(
+                states.items(), key=lambda item: (MARKETS.index(item[0][0]), item[0][1])):
+            metric = self._scores(state)
+            confusion = np.reshape(state['confusion'], (CLASSES, CLASSES))
+            metric.update({
+                'metric_type': METRIC_TYPES[market],
+                'market': market,
+                'model_type': model_type,
+                'total_roi_pct': metric.pop('roi_pct'),
+                'calculation_period': 'all_time'
+            })
+
+            if market == '1X2':
+                metric['f1_score'] = macro_f1(confusion)
+            else:
+                tp, fp, fn = confusion[1, 1], confusion[0, 1], confusion[1, 0]
+                metric['precision_score'] = float(tp / (tp + fp)) if tp + fp else 0.0
+                metric['recall_score'] = float(tp / (tp + fn)) if tp + fn else 0.0
+                metric['roc_auc'] = roc_auc(state['negatives'], state['positives'])
+
+            metrics.append(metric)
+        return metrics
+
+    def market_performance(self, states: Dict[Tuple[str, str], Dict]) -> List[Dict]:
+        """market_performance rows: each market over all model types"""
+        performance = []
+        for market in MARKETS:
+            total = combine([state for (name, _), state in states.items() if name == market])
+            if total is None:
+                continue
+
+            row = self._scores(total)
+            row.update({
+                'market': market,
+                'is_recommended': int(row['roi_pct'] > 0 and
+                                      row['total_predictions'] >= METRICS_MIN_RECOMMENDED),
+                'confidence_threshold': self._confidence_threshold(total)
+            })
+            performance.append(row)
+        return performance
+
+    def calibration(self, states: Dict[Tuple[str, str], Dict],
+                    market: Optional[str] = None) -> List[Dict]:
+        """
+        Calibration curve: mean confidence in the predicted outcome against how
+        often it happened, per confidence bin (all markets unless market is given)
+        """
+        total = combine([state for (name, _), state in states.items()
+                         if market is None or name == market])
+        if total is None:
+            return []
+
+        return [
+            {'confidence_level': round(confidence / count * 100, 1),
+             'actual_accuracy': round(hits / count * 100, 1),
+             'predictions': count}
+            for count, confidence, hits in zip(
+                total['calibration_count'], total['calibration_confidence'],
+                total['calibration_hits'])
+            if count
+        ]
+
+    def summary(self) -> Dict:
+        """Analytics dashboard figures from the stored statistics"""
+        states = self.db.get_metric_states()
+        markets = self.db.get_market_rankings()
+        overall = combine(list(states.values()))
+        match_result = combine([state for (name, _), state in states.items() if name == '1X2'])
+
+        models = [
+            {key: metric.get(key) for key in
+             ['model_type', 'total_predictions', 'accuracy_pct', 'brier_score', 'f1_score']}
+            for metric in self.metrics(states) if metric['market'] == '1X2'
+        ]
+
+        return {
+            'total_predictions': match_result['predictions'] if match_result else 0,
+            'total_correct': match_result['correct'] if match_result else 0,
+            'overall_roi': round(self._scores(overall)['roi_pct'], 1) if overall else 0,
+            'best_market': markets[0]['market'] if markets else None,
+            'best_market_roi': markets[0]['roi_pct'] if markets else None,
+            'avg_brier_score': round(self._scores(overall)['brier_score'], 3) if overall else None,
+            'markets': markets,
+            'calibration': self.calibration(states),
+            'models': sorted(models, key=lambda model: model['brier_score'])
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _long_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        One row per (prediction, market) with a prediction and a known outcome:
+        market, model_type, y_true, y_pred, score (binary markets: probability
+        of the positive outcome), confidence (probability of the predicted
+        outcome) and squared_error (Brier loss)
+        """
+        columns = ['market', 'model_type', 'y_true', 'y_pred', 'score',
+                   'confidence', 'squared_error']
+        if df.empty:
+            return pd.DataFrame(columns=columns)
+
+        model_types = df['model_type'].fillna('ensemble').to_numpy()
+
+        # 1X2: Brier loss averaged over the three outcomes
+        labels = {label: i for i, label in enumerate(MATCH_RESULT_LABELS)}
+        actual = df['actual_result'].map(labels)
+        predicted = df['prediction_1x2'].map(labels)
+        valid = (actual.notna() & predicted.notna()).to_numpy()
+        y_true = actual.to_numpy()[valid].astype(int)
+        y_pred = predicted.to_numpy()[valid].astype(int)
+        probabilities = df[MATCH_RESULT_PROBABILITIES].astype(float).fillna(0).to_numpy()[valid]
+        rows = np.arange(len(y_pred))
+
+        match_result = pd.DataFrame({
+            'market': '1X2',
+            'model_type': model_types[valid],
+            'y_true': y_true,
+            'y_pred': y_pred,
+            'score': np.nan,
+            'confidence': probabilities[rows, y_pred],
+            'squared_error': ((probabilities - np.eye(CLASSES)[y_true]) ** 2).sum(axis=1) / CLASSES
+        })
+
+        # Binary markets: all lines at once, as (prediction, market) matrices
+        predictions = df[[market[2] for market in BINARY_MARKETS]].to_numpy(dtype=object)
+        outcomes = df[[market[4] for market in BINARY_MARKETS]].astype(float).to_numpy()
+        scores = np.clip(
+            df[[market[3] for market in BINARY_MARKETS]].astype(float).fillna(0.5).to_numpy(), 0, 1)
+        lines = np.array([market[5] for market in BINARY_MARKETS])
+
+        valid = pd.notna(predictions) & ~np.isnan(outcomes)
+        rows, markets = np.nonzero(valid)
+        score = scores[rows, markets]
+        y_true = (outcomes[rows, markets] > lines[markets]).astype(int)
+        y_pred = pd.Series(predictions[rows, markets], dtype=object).str.startswith(
+            POSITIVE_LABELS).to_numpy(dtype=bool).astype(int)
+
+        binary = pd.DataFrame({
+            'market': np.array(MARKETS[1:], dtype=object)[markets],
+            'model_type': model_types[rows],
+            'y_true': y_true,
+            'y_pred': y_pred,
+            'score': score,
+            'confidence': np.where(y_pred == 1, score, 1 - score),
+            'squared_error': (score - y_true) ** 2
+        })
+
+        return pd.concat([match_result, binary], ignore_index=True)[columns]
+
+    def _scores(self, state: Dict) -> Dict:
+        """Totals, accuracy, Brier score and flat-odds ROI of a state"""
+        n, correct = state['predictions'], state['correct']
+        return {
+            'total_predictions': n,
+            'correct_predictions': correct,
+            'accuracy_pct': correct / n * 100,
+            'brier_score': state['squared_error'] / n,
+            'roi_pct': (correct * self.odds - n) / n * 100
+        }
+
+    def _confidence_threshold(self, state: Dict) -> Optional[float]:
+        """
+        Lowest calibration bin edge (%) above which the predictions were
+        profitable at flat odds, or None if no such edge
+        """
+        count = np.cumsum(state['calibration_count'][::-1])[::-1]
+        hits = np.cumsum(state['calibration_hits'][::-1])[::-1]
+        occupied = np.asarray(state['calibration_count']) > 0
+        profitable = occupied & (hits * self.odds > count)
+        if not profitable.any():
+            return None
+        return float(np.argmax(profitable) * 100 / self.calibration_bins)
+
+
+def merge_states(states: Dict[Tuple[str, str], Dict],
+                 increments: Dict[Tuple[str, str], Dict]) -> Dict[Tuple[str, str], Dict]:
+    """Stored statistics with the increments folded in"""
+    merged = dict(states)
+    for key, increment in increments.items():
+        merged[key] = combine([state for state in [states.get(key), increment] if state])
+    return merged
+
+
+def combine(states: List[Dict]) -> Optional[Dict]:
+    """Sum of statistics (element-wise for the arrays); None if there are none"""
+    if not states:
+        return None
+
+    total = dict(states[0])
+    for state in states[1:]:
+        for name, value in state.items():
+            if name not in total:
+                total[name] = value
+            elif isinstance(value, list):
+                total[name] = np.add(total[name], value).tolist()
+            else:
+                total[name] += value
+    return total
+
+
+def macro_f1(confusion: np.ndarray) -> float:
+    """Macro F1 over the classes that were predicted or happened"""
+    tp = np.diag(confusion)
+    predicted, actual = confusion.sum(axis=0), confusion.sum(axis=1)
+    present = (predicted + actual) > 0
+    f1 = 2 * tp[present] / (predicted[present] + actual[present])
+    return float(f1.mean()) if present.any() else 0.0
+
+
+def roc_auc(negatives: List[int], positives: List[int]) -> Optional[float]:
+    """
+    ROC-AUC from probability histograms: chance that a positive outcome got a
+    higher probability than a negative one (ties count half); None without both
+    """
+    negatives, positives = np.asarray(negatives), np.asarray(positives)
+    if not negatives.sum() or not positives.sum():
+        return None
+
+    below = np.cumsum(negatives) - negatives
+    wins = (positives * (below + negatives / 2)).sum()
+    return float(wins / (negatives.sum() * positives.sum()))
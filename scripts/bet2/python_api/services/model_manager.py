@@ -1,223 +1,191 @@
 """
 Model Manager Service - Multi-Model Support
 Loads and manages XGBoost, Random Forest, or Ensemble models
+
+Models are loaded lazily, per market, into an LRU-bounded cache. The cache
+is shared by the prediction server's request threads: lookups, inserts and
+evictions run under a lock, loading a model runs outside it. When a model
+has a compact export (<name>.trees, see services/compact_trees.py) it is
+served from the flat arrays instead of the sklearn/XGBoost pickle. Models
+stamped with the hash of the assembly plan they were trained on are only
+served alongside that plan.
 """
 import joblib
 import logging
+import pickle
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import json
 
+from config import MODEL_CACHE_SIZE, MODEL_MMAP_MODE, MODEL_FORMAT, ENSEMBLE_WEIGHTS
+from services.compact_trees import CompactTreeModel
+from services.ensemble_model import EnsembleModel
+from services.feature_engineering import assembly_plan_hash
+
 logger = logging.getLogger(__name__)
 
 
 class ModelManager:
     """
     Manages loading and caching of prediction models
-    
+
     Supports:
     - xgboost: XGBoost only
-    - randomforest: Random Forest only  
-    - ensemble: Weighted average of both
+    - randomforest: Random Forest only
+    - ensemble: Weighted average of both (EnsembleModel, config.ENSEMBLE_WEIGHTS)
+
+    Usage:
+        manager = ModelManager('premier_league', model_type='ensemble')
+        model = manager.get_model('goals', 'over_2_5')   # loads on first use
+        models = manager.get_all_models()                # lazy mapping
+        manager.memory_report()                          # bytes per loaded model
     """
 
-    def __init__(self, competition: str, model_type: str = 'ensemble'):
+    # Markets per model group (match_result has a single unnamed market)
+    MARKETS = {
+        'match_result': [None],
+        'goals': ['over_0_5', 'over_1_5', 'over_2_5', 'over_3_5', 'btts'],
+        'cards': [
+            'total_cards_over_2_5',
+            'total_cards_over_3_5',
+            'total_cards_over_4_5',
+            'team_cards_over_1_5',
+            'team_cards_over_2_5'
+        ]
+    }
+
+    def __init__(
+        self,
+        competition: str,
+        model_type: str = 'ensemble',
+        cache_size: int = MODEL_CACHE_SIZE,
+        mmap_mode: Optional[str] = MODEL_MMAP_MODE,
+        model_format: str = MODEL_FORMAT,
+        ensemble_weights: Optional[Dict[str, float]] = None
+    ):
         """
         Initialize ModelManager
-        
+
         Args:
             competition: Competition name (e.g., 'premier_league')
             model_type: 'xgboost', 'randomforest', or 'ensemble'
+            cache_size: Maximum number of markets kept loaded (LRU)
+            mmap_mode: mmap_mode for compact exports and Random Forest pickles (e.g. 'r')
+            model_format: 'compact' to prefer exported models, 'pickle' to always unpickle
+            ensemble_weights: Member weights for ensembles (default: config.ENSEMBLE_WEIGHTS)
         """
         self.competition = competition
         self.model_type = model_type
         self.models_dir = Path(__file__).parent.parent / 'models' / competition
-        self.cache = {}
+        self.cache_size = cache_size
+        self.mmap_mode = mmap_mode
+        self.model_format = model_format
+        self.ensemble_weights = ensemble_weights or ENSEMBLE_WEIGHTS
+        self.cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Hash of the plan from load_assembly_plan (read on first model load)
+        self.plan_hash = None
+        self._plan_loaded = False
 
         logger.info(
             f"ModelManager initialized for {competition} with model_type={model_type}")
 
+    def get_model(self, group: str, name: Optional[str] = None):
+        """
+        Load (or fetch from cache) the model for one market
+
+        Args:
+            group: 'match_result', 'goals' or 'cards'
+            name: Market within the group (e.g. 'over_2_5'); None for match_result
+
+        Returns:
+            Model object, or EnsembleModel when several members are loaded
+
+        Raises:
+            FileNotFoundError: If the market has no trained model
+        """
+        cache_key = (group, name, self.model_type)
+
+        with self._cache_lock:
+            model = self.cache.get(cache_key)
+            if model is not None:
+                self.cache.move_to_end(cache_key)
+                return model
+
+        model = self._load_market(group, name)
+
+        with self._cache_lock:
+            # Another thread may have loaded the same market meanwhile
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.cache.move_to_end(cache_key)
+                return cached
+
+            self.cache[cache_key] = model
+            while len(self.cache) > self.cache_size:
+                evicted, _ = self.cache.popitem(last=False)
+                logger.info(f"Evicted model from cache: {self._market_label(*evicted[:2])}")
+
+        return model
+
     def load_model(self, model_name: str, model_dir: Optional[Path] = None):
         """
         Load a single model (XGBoost or RF)
-        
+
         Args:
             model_name: Name of model (e.g., 'match_result')
             model_dir: Optional custom directory
-            
+
         Returns:
             Loaded model object
         """
-        cache_key = f"{model_name}_{self.model_type}"
-
-        if cache_key in self.cache:
-            return self.cache[cache_key]
-
         if model_dir is None:
-            model_dir = self.models_dir / model_name
-
-        model_dir = Path(model_dir)
-
-        if not model_dir.exists():
-            raise FileNotFoundError(f"Model directory not found: {model_dir}")
-
-        # Load based on model_type
-        if self.model_type == 'xgboost':
-            model_path = model_dir / 'xgboost_model.pkl'
-            if not model_path.exists():
-                raise FileNotFoundError(
-                    f"XGBoost model not found: {model_path}")
-            model = joblib.load(model_path)
-            logger.info(f"Loaded XGBoost model: {model_name}")
-
-        elif self.model_type == 'randomforest':
-            model_path = model_dir / 'randomforest_model.pkl'
-            if not model_path.exists():
-                raise FileNotFoundError(
-                    f"Random Forest model not found: {model_path}")
-            model = joblib.load(model_path)
-            logger.info(f"Loaded Random Forest model: {model_name}")
-
-        elif self.model_type == 'ensemble':
-            # Load both models
-            xgb_path = model_dir / 'xgboost_model.pkl'
-            rf_path = model_dir / 'randomforest_model.pkl'
-
-            if not xgb_path.exists() or not rf_path.exists():
-                raise FileNotFoundError(
-                    f"Ensemble requires both models in {model_dir}")
-
-            xgb_model = joblib.load(xgb_path)
-            rf_model = joblib.load(rf_path)
-
-            # Return dict with both models
-            model = {
-                'xgboost': xgb_model,
-                'randomforest': rf_model,
-                'type': 'ensemble'
-            }
-            logger.info(f"Loaded Ensemble models: {model_name}")
+            return self.get_model(model_name)
 
-        else:
-            raise ValueError(
-                f"Invalid model_type: {self.model_type}. Must be 'xgboost', 'randomforest', or 'ensemble'")
-
-        self.cache[cache_key] = model
-        return model
+        return self._load_market(model_name, None, Path(model_dir))
 
-    def get_all_models(self) -> Dict:
-        """Load all models for prediction (match result, goals, cards)"""
-        models = {}
+    def get_all_models(self) -> Mapping:
+        """
+        Models for prediction (match result, goals, cards)
 
-        # =========================================
-        # MATCH RESULT MODEL (1X2)
-        # =========================================
-        try:
-            models['match_result'] = self.load_model('match_result')
-        except FileNotFoundError as e:
-            logger.warning(f"Match result model not found: {e}")
+        Returns a read-only mapping with the same layout as before
+        (models['match_result'], models['goals']['btts'], ...); each market
+        is loaded on first access.
+        """
+        return LazyModels(self)
 
-        # =========================================
-        # GOALS MODELS (O/U + BTTS)
-        # =========================================
-        models['goals'] = {}
-        goal_types = ['over_0_5', 'over_1_5', 'over_2_5', 'over_3_5', 'btts']
+    def available_markets(self, group: str) -> List[Optional[str]]:
+        """Markets of a group that have model files (without loading them)"""
+        return [name for name in self.MARKETS.get(group, [])
+                if self._resolve_paths(group, name) is not None]
 
-        for goal_type in goal_types:
-            try:
-                goals_dir = self.models_dir / 'goals'
-
-                if self.model_type == 'xgboost':
-                    model_path = goals_dir / f'{goal_type}_xgboost.pkl'
-                    if not model_path.exists():
-                        # Fallback to old naming
-                        model_path = goals_dir / f'{goal_type}_model.pkl'
-                    if model_path.exists():
-                        models['goals'][goal_type] = joblib.load(model_path)
-                        logger.info(f"Loaded XGBoost goal model: {goal_type}")
-
-                elif self.model_type == 'randomforest':
-                    model_path = goals_dir / f'{goal_type}_randomforest.pkl'
-                    if model_path.exists():
-                        models['goals'][goal_type] = joblib.load(model_path)
-                        logger.info(f"Loaded RF goal model: {goal_type}")
-
-                elif self.model_type == 'ensemble':
-                    xgb_path = goals_dir / f'{goal_type}_xgboost.pkl'
-                    rf_path = goals_dir / f'{goal_type}_randomforest.pkl'
-
-                    # Fallback for XGB
-                    if not xgb_path.exists():
-                        xgb_path = goals_dir / f'{goal_type}_model.pkl'
-
-                    if xgb_path.exists() and rf_path.exists():
-                        models['goals'][goal_type] = {
-                            'xgboost': joblib.load(xgb_path),
-                            'randomforest': joblib.load(rf_path),
-                            'type': 'ensemble'
-                        }
-                        logger.info(f"Loaded ensemble goal model: {goal_type}")
-                    elif xgb_path.exists():
-                        # Fallback to XGBoost only
-                        models['goals'][goal_type] = joblib.load(xgb_path)
-                        logger.warning(
-                            f"Only XGBoost available for {goal_type}")
-
-            except Exception as e:
-                logger.warning(f"Could not load goal model {goal_type}: {e}")
-
-        # =========================================
-        # CARDS MODELS (Total and Team O/U)
-        # =========================================
-        models['cards'] = {}
-        cards_types = [
-            'total_cards_over_2_5',
-            'total_cards_over_3_5',
-            'total_cards_over_4_5',
-            'team_cards_over_1_5',
-            'team_cards_over_2_5'
-        ]
+    def memory_report(self) -> Dict[str, Dict[str, int]]:
+        """
+        Approximate resident bytes of every loaded model
 
-        for cards_type in cards_types:
-            try:
-                cards_dir = self.models_dir / 'cards'
-
-                if self.model_type == 'xgboost':
-                    model_path = cards_dir / f'{cards_type}_xgboost.pkl'
-                    if model_path.exists():
-                        models['cards'][cards_type] = joblib.load(model_path)
-                        logger.info(
-                            f"Loaded XGBoost cards model: {cards_type}")
-
-                elif self.model_type == 'randomforest':
-                    model_path = cards_dir / f'{cards_type}_randomforest.pkl'
-                    if model_path.exists():
-                        models['cards'][cards_type] = joblib.load(model_path)
-                        logger.info(f"Loaded RF cards model: {cards_type}")
-
-                elif self.model_type == 'ensemble':
-                    xgb_path = cards_dir / f'{cards_type}_xgboost.pkl'
-                    rf_path = cards_dir / f'{cards_type}_randomforest.pkl'
-
-                    if xgb_path.exists() and rf_path.exists():
-                        models['cards'][cards_type] = {
-                            'xgboost': joblib.load(xgb_path),
-                            'randomforest': joblib.load(rf_path),
-                            'type': 'ensemble'
-                        }
-                        logger.info(
-                            f"Loaded ensemble cards model: {cards_type}")
-                    elif xgb_path.exists():
-                        # Fallback to XGBoost only
-                        models['cards'][cards_type] = joblib.load(xgb_path)
-                        logger.warning(
-                            f"Only XGBoost available for {cards_type}")
-
-            except Exception as e:
-                logger.warning(f"Could not load cards model {cards_type}: {e}")
-
-        return models
+        Returns:
+            {'goals/over_2_5': {'xgboost': bytes, 'randomforest': bytes}, ...}
+        """
+        with self._cache_lock:
+            loaded = list(self.cache.items())
+
+        report = {}
+        for (group, name, _), model in loaded:
+            members = model.members if isinstance(model, EnsembleModel) \
+                else {self.model_type: model}
+            report[self._market_label(group, name)] = {
+                member: self._model_nbytes(member_model)
+                for member, member_model in members.items()
+            }
+        return report
 
+    def clear_cache(self):
+        """Drop all loaded models"""
+        with self._cache_lock:
+            self.cache = OrderedDict()
 
     def set_model_type(self, model_type: str):
         """Change model type and clear cache"""
@@ -225,7 +193,7 @@ class ModelManager:
             raise ValueError(f"Invalid model_type: {model_type}")
 
         self.model_type = model_type
-        self.cache = {}
+        self.clear_cache()
         logger.info(f"Model type changed to: {model_type}")
 
     def get_model_metadata(self, model_name: str) -> Dict:
@@ -237,3 +205,190 @@ class ModelManager:
                 return json.load(f)
 
         return {}
+
+    def load_assembly_plan(self) -> Optional[Dict]:
+        """
+        Load the feature assembly plan saved with the models
+
+        Returns:
+            Plan dict (see FeatureEngineer.get_assembly_plan), or None if the
+            models were trained before plans were saved
+        """
+        plan_path = self.models_dir / 'assembly_plan.json'
+        plan = None
+
+        if plan_path.exists():
+            with open(plan_path, 'r') as f:
+                plan = json.load(f)
+
+        # Models loaded from now on must have been trained with this plan
+        self.plan_hash = assembly_plan_hash(plan) if plan is not None else None
+        self._plan_loaded = True
+        return plan
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _member_paths(self, group: str, name: Optional[str], model_dir: Optional[Path] = None) -> Dict[str, Path]:
+        """Candidate XGBoost/RF files for a market"""
+        model_dir = model_dir or self.models_dir / group
+
+        if name is None:
+            return {
+                'xgboost': model_dir / 'xgboost_model.pkl',
+                'randomforest': model_dir / 'randomforest_model.pkl'
+            }
+
+        xgb_path = model_dir / f'{name}_xgboost.pkl'
+        if not xgb_path.exists() and group == 'goals':
+            # Fallback to old naming
+            xgb_path = model_dir / f'{name}_model.pkl'
+
+        return {
+            'xgboost': xgb_path,
+            'randomforest': model_dir / f'{name}_randomforest.pkl'
+        }
+
+    def _resolve_paths(self, group: str, name: Optional[str], model_dir: Optional[Path] = None) -> Optional[Dict[str, Path]]:
+        """Files to load for this market and model_type (None if unavailable)"""
+        paths = {member: path for member, path in
+                 self._member_paths(group, name, model_dir).items()
+                 if path.exists() or self._compact_path(path).exists()}
+
+        if self.model_type in ('xgboost', 'randomforest'):
+            if self.model_type not in paths:
+                return None
+            return {self.model_type: paths[self.model_type]}
+
+        if self.model_type == 'ensemble':
+            if len(paths) == 2:
+                return paths
+            # Goals/cards fall back to XGBoost only; match result needs both
+            if name is not None and 'xgboost' in paths:
+                return {'xgboost': paths['xgboost']}
+            return None
+
+        raise ValueError(
+            f"Invalid model_type: {self.model_type}. Must be 'xgboost', 'randomforest', or 'ensemble'")
+
+    def _load_market(self, group: str, name: Optional[str], model_dir: Optional[Path] = None):
+        label = self._market_label(group, name)
+        paths = self._resolve_paths(group, name, model_dir)
+
+        if paths is None:
+            raise FileNotFoundError(
+                f"No {self.model_type} model for {label} in {model_dir or self.models_dir / group}")
+
+        members = {member: self._load_file(path, member) for member, path in paths.items()}
+        self._check_plan(label, members)
+
+        if len(members) > 1:
+            logger.info(f"Loaded Ensemble models: {label}")
+            return EnsembleModel(members, self.ensemble_weights)
+
+        member, model = next(iter(members.items()))
+        if self.model_type == 'ensemble':
+            logger.warning(f"Only XGBoost available for {label}")
+        else:
+            logger.info(f"Loaded {member} model: {label}")
+        return model
+
+    def _check_plan(self, label: str, members: Dict):
+        """Refuse models trained with a different assembly plan than the one served"""
+        if not self._plan_loaded:
+            self.load_assembly_plan()
+
+        for member, model in members.items():
+            trained = getattr(model, 'assembly_plan_hash', None)
+            # Models from before plans were stamped carry no hash
+            if trained is not None and trained != self.plan_hash:
+                raise ValueError(
+                    f"{label} {member} model was trained with assembly plan {trained}, "
+                    f"but {self.models_dir / 'assembly_plan.json'} is {self.plan_hash}; "
+                    f"retrain it")
+
+    def _load_file(self, path: Path, member: str):
+        compact_path = self._compact_path(path)
+        if (self.model_format == 'compact' and compact_path.exists()) or not path.exists():
+            return CompactTreeModel.load(compact_path, mmap_mode=self.mmap_mode)
+
+        if member == 'randomforest' and self.mmap_mode:
+            return joblib.load(path, mmap_mode=self.mmap_mode)
+        return joblib.load(path)
+
+    @staticmethod
+    def _compact_path(path: Path) -> Path:
+        """Exported model directory for a .pkl path"""
+        return path.with_suffix('.trees')
+
+    @staticmethod
+    def _market_label(group: str, name: Optional[str]) -> str:
+        return group if name is None else f'{group}/{name}'
+
+    @staticmethod
+    def _model_nbytes(model) -> int:
+        """Bytes held by the model's fitted structures (trees/boosters)"""
+        if isinstance(model, CompactTreeModel):
+            return model.nbytes
+
+        if hasattr(model, 'estimators_'):
+            # sklearn forest: node and value arrays of every tree
+            total = 0
+            for estimator in model.estimators_:
+                state = estimator.tree_.__getstate__()
+                total += state['nodes'].nbytes + state['values'].nbytes
+            return total
+
+        if hasattr(model, 'get_booster'):
+            return len(model.get_booster().save_raw())
+
+        return len(pickle.dumps(model))
+
+
+class LazyModels(Mapping):
+    """models['match_result'] / models['goals'][name] / models['cards'][name]"""
+
+    def __init__(self, manager: ModelManager):
+        self.manager = manager
+
+    def __getitem__(self, group: str):
+        if group not in ModelManager.MARKETS:
+            raise KeyError(group)
+
+        if group == 'match_result':
+            try:
+                return self.manager.get_model('match_result')
+            except FileNotFoundError as e:
+                raise KeyError(str(e))
+
+        return LazyMarketGroup(self.manager, group)
+
+    def __iter__(self):
+        return iter(ModelManager.MARKETS)
+
+    def __len__(self):
+        return len(ModelManager.MARKETS)
+
+
+class LazyMarketGroup(Mapping):
+    """Markets of one group, loaded through the manager on access"""
+
+    def __init__(self, manager: ModelManager, group: str):
+        self.manager = manager
+        self.group = group
+
+    def __getitem__(self, name: str):
+        if name not in ModelManager.MARKETS[self.group]:
+            raise KeyError(name)
+
+        try:
+            return self.manager.get_model(self.group, name)
+        except FileNotFoundError as e:
+            raise KeyError(str(e))
+
+    def __iter__(self):
+        return iter(self.manager.available_markets(self.group))
+
+    def __len__(self):
+        return len(self.manager.available_markets(self.group))
@@ -18,6 +18,8 @@ from sklearn.metrics import (
 )
 import xgboost as xgb
 
+from services.training_orchestrator import model_params, load_tuned_params
+
 logger = logging.getLogger(__name__)
 
 
@@ -52,20 +54,27 @@ class ModelTrainer:
         (self.models_dir / 'goals').mkdir(exist_ok=True)
 
         self.training_history = []
+        self.tuned_params = load_tuned_params(competition)
+        # Hash of the assembly plan the models are trained for (stamped on each model)
+        self.assembly_plan_hash = None
 
     def train_all_models(
         self, 
         train_df: pd.DataFrame, 
         val_df: pd.DataFrame,
-        feature_columns: List[str]
+        feature_columns: List[str],
+        X_train: Optional[np.ndarray] = None,
+        X_val: Optional[np.ndarray] = None
     ) -> Dict:
         """
         Train all prediction models
 
         Args:
-            train_df: Training data with features
-            val_df: Validation data with features
+            train_df: Training data with features (targets only if X_* given)
+            val_df: Validation data with features (targets only if X_* given)
             feature_columns: List of feature column names
+            X_train: Feature matrix of train_df (e.g. from MatrixCache)
+            X_val: Feature matrix of val_df
 
         Returns:
             Dictionary with training results
@@ -81,7 +90,7 @@ class ModelTrainer:
         # Train match result model (1X2)
         logger.info("Training match result model...")
         results['match_result'] = self.train_match_result_model(
-            train_df, val_df, feature_columns
+            train_df, val_df, feature_columns, X_train, X_val
         )
 
         # Train goals models (Over/Under)
@@ -89,13 +98,13 @@ class ModelTrainer:
         for threshold in [0.5, 1.5, 2.5, 3.5]:
             logger.info(f"Training Over/Under {threshold} model...")
             results['goals'][f'over_{threshold}'] = self.train_goals_model(
-                train_df, val_df, feature_columns, threshold
+                train_df, val_df, feature_columns, threshold, X_train, X_val
             )
 
         # Train BTTS model
         logger.info("Training BTTS model...")
         results['goals']['btts'] = self.train_btts_model(
-            train_df, val_df, feature_columns
+            train_df, val_df, feature_columns, X_train, X_val
         )
 
         # Save training history
@@ -108,7 +117,9 @@ class ModelTrainer:
         self,
         train_df: pd.DataFrame,
         val_df: pd.DataFrame,
-        feature_columns: List[str]
+        feature_columns: List[str],
+        X_train: Optional[np.ndarray] = None,
+        X_val: Optional[np.ndarray] = None
     ) -> Dict:
         """
         Train model for match result prediction (Home Win, Draw, Away Win)
@@ -119,27 +130,17 @@ class ModelTrainer:
         logger.info("Training match result (1X2) model...")
 
         # Prepare data
-        X_train, y_train = self._prepare_match_result_data(train_df, feature_columns)
-        X_val, y_val = self._prepare_match_result_data(val_df, feature_columns)
+        X_train, y_train = self._prepare_match_result_data(train_df, feature_columns, X_train)
+        X_val, y_val = self._prepare_match_result_data(val_df, feature_columns, X_val)
 
         logger.info(f"Training samples: {len(X_train)}, Validation samples: {len(X_val)}")
         logger.info(f"Features: {len(feature_columns)}")
         logger.info(f"Class distribution: {dict(pd.Series(y_train).value_counts())}")
 
-        # Train XGBoost model with BETTER REGULARIZATION
+        # Train XGBoost model (shared defaults, overlaid with tune.py results)
         model = xgb.XGBClassifier(
-            objective='multi:softprob',
-            num_class=3,
-            n_estimators=200,
-            max_depth=4,  # REDUCED from 6 to prevent overfitting
-            learning_rate=0.05,  # REDUCED from 0.1 for better generalization
-            subsample=0.8,
-            colsample_bytree=0.8,
-            min_child_weight=3,  # ADDED regularization
-            gamma=0.1,  # ADDED regularization
-            reg_alpha=0.1,  # ADDED L1 regularization
-            reg_lambda=1.0,  # ADDED L2 regularization
-            random_state=42,
+            **model_params('match_result', 'match_result', 'xgboost',
+                           self.tuned_params.get('match_result')),
             eval_metric='mlogloss'
         )
 
@@ -168,7 +169,7 @@ class ModelTrainer:
 
         # Save model
         model_path = self.models_dir / 'match_result' / 'xgboost_model.pkl'
-        joblib.dump(model, model_path)
+        self._save_model(model, model_path)
         logger.info(f"Model saved to {model_path}")
 
         # Save metadata
@@ -197,7 +198,8 @@ class ModelTrainer:
     def _prepare_match_result_data(
         self,
         df: pd.DataFrame,
-        feature_columns: List[str]
+        feature_columns: List[str],
+        X: Optional[np.ndarray] = None
     ) -> Tuple[pd.DataFrame, pd.Series]:
         """Prepare data for match result model"""
 
@@ -218,22 +220,23 @@ class ModelTrainer:
         y = df.apply(map_result, axis=1)
 
         # Get features
-        X = df[feature_columns].fillna(0)
-
-        return X.values, y.values
+        return self._features(df, feature_columns, X), y.values
 
     def train_goals_model(
         self,
         train_df: pd.DataFrame,
         val_df: pd.DataFrame,
         feature_columns: List[str],
-        threshold: float
+        threshold: float,
+        X_train: Optional[np.ndarray] = None,
+        X_val: Optional[np.ndarray] = None
     ) -> Dict:
         """
         Train model for goals Over/Under prediction
 
         Args:
             threshold: Goals threshold (0.5, 1.5, 2.5, 3.5)
+            X_train, X_val: Precomputed feature matrices (default: built from the frames)
 
         Returns:
             Dictionary with model, metrics, and metadata
@@ -241,24 +244,16 @@ class ModelTrainer:
         logger.info(f"Training Over/Under {threshold} model...")
 
         # Prepare data
-        X_train, y_train = self._prepare_goals_data(train_df, feature_columns, threshold)
-        X_val, y_val = self._prepare_goals_data(val_df, feature_columns, threshold)
+        X_train, y_train = self._prepare_goals_data(train_df, feature_columns, threshold, X_train)
+        X_val, y_val = self._prepare_goals_data(val_df, feature_columns, threshold, X_val)
 
         logger.info(f"Over {threshold} - Positive: {y_train.sum()}, Negative: {len(y_train) - y_train.sum()}")
 
-        # Train XGBoost binary classifier with BETTER REGULARIZATION
+        # Train XGBoost binary classifier (shared defaults, overlaid with tune.py results)
+        market = f'over_{str(threshold).replace(".", "_")}'
         model = xgb.XGBClassifier(
-            objective='binary:logistic',
-            n_estimators=150,
-            max_depth=4,  # REDUCED from 5
-            learning_rate=0.05,  # REDUCED from 0.1
-            subsample=0.8,
-            colsample_bytree=0.8,
-            min_child_weight=3,  # ADDED
-            gamma=0.1,  # ADDED
-            reg_alpha=0.1,  # ADDED
-            reg_lambda=1.0,  # ADDED
-            random_state=42,
+            **model_params('goals', 'goals', 'xgboost',
+                           self.tuned_params.get(f'goals/{market}')),
             eval_metric='logloss'
         )
 
@@ -286,7 +281,7 @@ class ModelTrainer:
         # Save model
         model_name = f'over_{str(threshold).replace(".", "_")}_model.pkl'
         model_path = self.models_dir / 'goals' / model_name
-        joblib.dump(model, model_path)
+        self._save_model(model, model_path)
 
         # Save metadata
         metadata = {
@@ -308,26 +303,20 @@ class ModelTrainer:
         self,
         train_df: pd.DataFrame,
         val_df: pd.DataFrame,
-        feature_columns: List[str]
+        feature_columns: List[str],
+        X_train: Optional[np.ndarray] = None,
+        X_val: Optional[np.ndarray] = None
     ) -> Dict:
         """Train Both Teams To Score (BTTS) model"""
         logger.info("Training BTTS model...")
 
         # Prepare data
-        X_train, y_train = self._prepare_btts_data(train_df, feature_columns)
-        X_val, y_val = self._prepare_btts_data(val_df, feature_columns)
+        X_train, y_train = self._prepare_btts_data(train_df, feature_columns, X_train)
+        X_val, y_val = self._prepare_btts_data(val_df, feature_columns, X_val)
 
-        # Train model with BETTER REGULARIZATION
+        # Train model (shared defaults, overlaid with tune.py results)
         model = xgb.XGBClassifier(
-            objective='binary:logistic',
-            n_estimators=150,
-            max_depth=4,  # REDUCED from 5
-            learning_rate=0.05,  # REDUCED from 0.1
-            min_child_weight=3,  # ADDED
-            gamma=0.1,  # ADDED
-            reg_alpha=0.1,  # ADDED
-            reg_lambda=1.0,  # ADDED
-            random_state=42
+            **model_params('goals', 'btts', 'xgboost', self.tuned_params.get('goals/btts'))
         )
 
 
@@ -349,7 +338,7 @@ class ModelTrainer:
 
         # Save
         model_path = self.models_dir / 'goals' / 'btts_model.pkl'
-        joblib.dump(model, model_path)
+        self._save_model(model, model_path)
 
         metadata = {
             'model_type': 'xgboost_classifier',
@@ -368,7 +357,8 @@ class ModelTrainer:
         self,
         df: pd.DataFrame,
         feature_columns: List[str],
-        threshold: float
+        threshold: float,
+        X: Optional[np.ndarray] = None
     ) -> Tuple[pd.DataFrame, pd.Series]:
         """Prepare data for goals Over/Under model"""
 
@@ -377,23 +367,36 @@ class ModelTrainer:
         total_goals = df['goals_for'] + df['goals_against']
         y = (total_goals > threshold).astype(int)
 
-        X = df[feature_columns].fillna(0)
-
-        return X.values, y.values
+        return self._features(df, feature_columns, X), y.values
 
     def _prepare_btts_data(
         self,
         df: pd.DataFrame,
-        feature_columns: List[str]
+        feature_columns: List[str],
+        X: Optional[np.ndarray] = None
     ) -> Tuple[pd.DataFrame, pd.Series]:
         """Prepare data for BTTS model"""
 
         df = df.copy()
         y = ((df['goals_for'] > 0) & (df['goals_against'] > 0)).astype(int)
 
-        X = df[feature_columns].fillna(0)
+        return self._features(df, feature_columns, X), y.values
 
-        return X.values, y.values
+    @staticmethod
+    def _features(
+        df: pd.DataFrame,
+        feature_columns: List[str],
+        X: Optional[np.ndarray]
+    ) -> np.ndarray:
+        """Feature matrix with missing values as 0 (a given matrix is only copied if it has any)"""
+        if X is None:
+            return df[feature_columns].fillna(0).values
+        return np.where(np.isnan(X), 0, X).astype(X.dtype) if np.isnan(X).any() else X
+
+    def _save_model(self, model, model_path: Path):
+        """Pickle a trained model, stamped with the assembly plan hash"""
+        model.assembly_plan_hash = self.assembly_plan_hash
+        joblib.dump(model, model_path)
 
     def _save_training_history(self, results: Dict):
         """Save training history to JSON file"""
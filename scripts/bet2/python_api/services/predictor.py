@@ -8,6 +8,10 @@ import logging
 from typing import Dict, List, Tuple
 from datetime import datetime
 
+from config import COMPACT_FEATURE_FRAMES
+from services.feature_store import FeatureStore
+from services.ensemble_model import member_proba
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,28 +24,53 @@ class Predictor:
         prediction = predictor.predict_match('Arsenal', 'Chelsea')
     """
 
-    def __init__(self, model_manager, data_loader, feature_engineer):
-        """Initialize Predictor with pre-generated features"""
+    def __init__(self, model_manager, data_loader, feature_engineer,
+                 compact: bool = COMPACT_FEATURE_FRAMES):
+        """
+        Initialize Predictor with pre-generated features
+
+        Args:
+            compact: Keep historical_features as a compact frame (float32,
+                     categoricals, only the columns predictions need)
+        """
         self.model_manager = model_manager
         self.data_loader = data_loader
         self.feature_engineer = feature_engineer
+        self.compact = compact
 
         # Load all models
         self.models = self.model_manager.get_all_models()
+        self.assembly_plan = self._load_assembly_plan()
 
         # Pre-generate features from historical data
         logger.info(
             "Pre-loading and generating features from historical data...")
-        self.historical_features = self._preload_features()
-        logger.info(
-            f"Features ready for {len(self.historical_features['team_name'].unique())} teams")
+        features = self._preload_features()
+        # Snapshot first: matchup vectors use full-precision latest rows
+        self._build_snapshot(features)
+        self.feature_memory = None
+        self.historical_features = self._compact(features) if compact else features
+        logger.info(f"Features ready for {len(self.team_index)} teams")
 
     def _preload_features(self) -> pd.DataFrame:
-        """Pre-generate features from all historical data"""
-        seasons = self.data_loader.get_available_seasons()
-        df = self.data_loader.load_multiple_seasons(seasons)
-        df_with_features = self.feature_engineer.generate_features(df)
-        return df_with_features
+        """Load features for all historical data (incrementally updated store)"""
+        store = FeatureStore(self.data_loader, self.feature_engineer)
+        return store.load_features()
+
+    def _compact(self, features: pd.DataFrame) -> pd.DataFrame:
+        """Compact frame of the columns predictions and targets need, with a memory report"""
+        # Source columns of the saved plan may differ from the current engineer's
+        sources = [entry[side] for entry in self.assembly_plan['features']
+                   for side in ('home', 'away') if entry.get(side) is not None]
+        compact = self.feature_engineer.compact_frame(features, extra_columns=sources)
+
+        self.feature_memory = self.feature_engineer.memory_report(features, compact)
+        logger.info(
+            f"Historical features: {self.feature_memory['bytes_before'] / 1e6:.1f}MB -> "
+            f"{self.feature_memory['bytes_after'] / 1e6:.1f}MB "
+            f"({self.feature_memory['columns_before']} -> "
+            f"{self.feature_memory['columns_after']} columns)")
+        return compact
 
     def _calculate_certainty(self, probabilities: dict, prediction_type: str = 'multi') -> tuple:
         """
@@ -101,408 +130,351 @@ class Predictor:
         Returns:
             Dictionary with predictions and probabilities
         """
-        logger.info(f"Generating prediction: {home_team} vs {away_team}")
+        return self.predict_matches([(home_team, away_team)])[0]
+
+    def predict_matches(self, fixtures: List[Tuple[str, str]]) -> List[Dict]:
+        """
+        Generate predictions for several matches at once (e.g. a matchweek)
+
+        Feature vectors are stacked into one matrix, so every model is called
+        once per batch instead of once per match.
+
+        Args:
+            fixtures: List of (home_team, away_team) pairs
+
+        Returns:
+            One prediction dictionary per fixture, in input order (same
+            structure as predict_match; failed fixtures have success=False)
+        """
+        results = [None] * len(fixtures)
+        valid = []
+
+        for i, (home_team, away_team) in enumerate(fixtures):
+            logger.info(f"Generating prediction: {home_team} vs {away_team}")
+            try:
+                self._team_rows([home_team, away_team])
+                valid.append(i)
+            except Exception as e:
+                logger.error(f"Prediction error: {str(e)}", exc_info=True)
+                results[i] = self._error_response(e)
+
+        if not valid:
+            return results
+
+        home_teams = [fixtures[i][0] for i in valid]
+        away_teams = [fixtures[i][1] for i in valid]
 
         try:
-            # Build feature vector for this matchup
-            features = self._build_match_features(home_team, away_team)
+            # Home perspective for all markets, away perspective for away team cards
+            features = self._build_feature_matrix(home_teams, away_teams)
+            away_features = self._build_feature_matrix(away_teams, home_teams)
 
             # Get predictions
-            match_result = self._predict_match_result(features)
-            double_chance = self._calculate_double_chance(match_result)
+            match_results = self._predict_match_result(features)
             goals = self._predict_goals(features)
-            # CHANGED - added team names
-            cards = self._predict_cards(features, home_team, away_team)
+            cards = self._predict_cards(features, away_features, home_teams, away_teams)
 
+        except Exception as e:
+            logger.error(f"Prediction error: {str(e)}", exc_info=True)
+            for i in valid:
+                results[i] = self._error_response(e)
+            return results
+
+        for j, i in enumerate(valid):
             # Build response
-            prediction = {
+            results[i] = {
                 'success': True,
                 'match': {
-                    'home_team': home_team,
-                    'away_team': away_team,
+                    'home_team': home_teams[j],
+                    'away_team': away_teams[j],
                     'date': datetime.now().isoformat()
                 },
                 'predictions': {
-                    'match_result': match_result,
-                    'double_chance': double_chance,
-                    'goals': goals,
-                    'cards': cards  # NEW
+                    'match_result': match_results[j],
+                    'double_chance': self._calculate_double_chance(match_results[j]),
+                    'goals': goals[j],
+                    'cards': cards[j]
                 },
                 'timestamp': datetime.now().isoformat()
             }
 
-            return prediction
-
-        except Exception as e:
-            logger.error(f"Prediction error: {str(e)}", exc_info=True)
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
-
+        return results
 
-        except Exception as e:
-            logger.error(f"Prediction error: {str(e)}", exc_info=True)
-            return {
-                'success': False,
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            }
+    @staticmethod
+    def _error_response(error: Exception) -> Dict:
+        return {
+            'success': False,
+            'error': str(error),
+            'timestamp': datetime.now().isoformat()
+        }
 
-    def _build_match_features(self, home_team: str, away_team: str) -> np.ndarray:
-        """
-        Build feature vector for a specific matchup
-        
-        This combines:
-        - Home team's recent features
-        - Away team's recent features (as opponent features)
-        - Differential features (home - away)
-        - Cross features (combined metrics)
+    def _build_snapshot(self, features: pd.DataFrame):
         """
-        # Get feature names
-        feature_names = self.feature_engineer.get_model_feature_names()
-
-        # Get home team's most recent match features
-        home_data = self.historical_features[
-            self.historical_features['team_name'] == home_team
-        ].sort_values('date')
-
-        if len(home_data) == 0:
-            raise ValueError(f"No historical data found for {home_team}")
-
-        home_latest = home_data.iloc[-1]
-
-        # Get away team's most recent match features
-        away_data = self.historical_features[
-            self.historical_features['team_name'] == away_team
-        ].sort_values('date')
-
-        if len(away_data) == 0:
-            raise ValueError(f"No historical data found for {away_team}")
-
-        away_latest = away_data.iloc[-1]
-
-        # Build feature vector
-        features = {}
-
-        for feat in feature_names:
-            if feat.startswith('opp_'):
-                # Opponent feature - use away team's base feature
-                base_feat = feat.replace('opp_', '')
-                features[feat] = away_latest.get(base_feat, 0)
-
-            elif feat.startswith('diff_'):
-                # Differential feature - home minus away
-                base_feat = feat.replace('diff_', '')
-                home_val = home_latest.get(base_feat, 0)
-                away_val = away_latest.get(base_feat, 0)
-                features[feat] = home_val - away_val
-
-            elif feat in ['combined_goal_threat', 'combined_def_weakness',
-                          'btts_likelihood', 'total_goals_expected', 'xg_total_expected']:
-                # Cross features - recalculate from both teams
-                if feat == 'combined_goal_threat':
-                    features[feat] = (
-                        home_latest.get('goals_for_L5_mean', 0) +
-                        away_latest.get('goals_for_L5_mean', 0)
-                    ) / 2
-                elif feat == 'combined_def_weakness':
-                    features[feat] = (
-                        home_latest.get('goals_against_L5_mean', 0) +
-                        away_latest.get('goals_against_L5_mean', 0)
-                    ) / 2
-                elif feat == 'btts_likelihood':
-                    features[feat] = (
-                        (home_latest.get('goals_for_L5_mean', 0) *
-                         away_latest.get('goals_against_L5_mean', 0)) +
-                        (away_latest.get('goals_for_L5_mean', 0) *
-                         home_latest.get('goals_against_L5_mean', 0))
-                    ) / 2
-                elif feat == 'total_goals_expected':
-                    features[feat] = (
-                        home_latest.get('goals_for_L5_mean', 0) +
-                        away_latest.get('goals_for_L5_mean', 0)
-                    )
-                elif feat == 'xg_total_expected':
-                    features[feat] = (
-                        home_latest.get('xg_for_L5_mean', 0) +
-                        away_latest.get('xg_for_L5_mean', 0)
-                    )
+        Precompute each team's latest feature row and compile the assembly plan
 
+        team_snapshot holds one row per team with every source column the
+        plan needs, plus a trailing 0.0 column that missing columns point at.
+        Building a matchup vector is then a handful of array gathers (see
+        _build_feature_matrix).
+        """
+        entries = self.assembly_plan['features']
+
+        latest = features.sort_values(
+            ['team_name', 'date'], kind='stable'
+        ).drop_duplicates('team_name', keep='last')
+
+        referenced = {entry[side] for entry in entries for side in ('home', 'away')
+                      if entry.get(side) is not None}
+        columns = sorted(referenced & set(latest.columns))
+        missing = sorted(referenced - set(columns))
+        if missing:
+            logger.warning(f"Assembly plan columns not in features (using 0): {missing}")
+
+        column_index = {column: i for i, column in enumerate(columns)}
+        zero = len(columns)
+
+        self.team_snapshot = np.hstack([
+            latest[columns].to_numpy(dtype=np.float64),
+            np.zeros((len(latest), 1))
+        ])
+        self.team_index = {team: i for i, team in enumerate(latest['team_name'])}
+        self.n_model_features = len(entries)
+
+        # operation -> (output positions, home column indices, away column indices)
+        # ('constant' -> (output positions, values))
+        grouped = {}
+        for position, entry in enumerate(entries):
+            operation = entry['operation']
+            if operation not in self.feature_engineer.ASSEMBLY_OPERATIONS:
+                raise ValueError(f"Unsupported assembly operation: {operation}")
+
+            arrays = grouped.setdefault(operation, ([], [], []))
+            arrays[0].append(position)
+            if operation == 'constant':
+                arrays[1].append(entry['value'])
+            else:
+                arrays[1].append(column_index.get(entry.get('home'), zero))
+                arrays[2].append(column_index.get(entry.get('away'), zero))
+
+        self.assembly = {}
+        for operation, (positions, first, second) in grouped.items():
+            if operation == 'constant':
+                self.assembly[operation] = (
+                    np.array(positions, dtype=np.intp), np.array(first, dtype=np.float64))
             else:
-                # Regular team feature - use home team's value
-                features[feat] = home_latest.get(feat, 0)
+                self.assembly[operation] = (
+                    np.array(positions, dtype=np.intp),
+                    np.array(first, dtype=np.intp),
+                    np.array(second, dtype=np.intp))
 
-        # Override venue to Home
-        if 'is_home' in features:
-            features['is_home'] = 1.0
+    def _load_assembly_plan(self) -> Dict:
+        """Plan saved with the models; derived from the feature engineer if absent"""
+        plan = self.model_manager.load_assembly_plan()
 
-        # Convert to array in correct order
-        feature_array = np.array([features.get(f, 0) for f in feature_names])
+        if plan is None:
+            logger.info("No saved assembly plan, deriving it from current features")
+            return self.feature_engineer.get_assembly_plan()
 
-        # Handle NaNs
-        feature_array = np.nan_to_num(feature_array, nan=0.0)
+        if plan.get('version') != self.feature_engineer.VERSION:
+            logger.warning(
+                f"Models were trained with feature version {plan.get('version')}, "
+                f"current is {self.feature_engineer.VERSION}")
 
-        return feature_array.reshape(1, -1)
+        return plan
 
-    def _predict_match_result(self, features: np.ndarray) -> Dict:
-        """Predict match result (1X2) - supports ensemble"""
-        model = self.models['match_result']
+    def _team_rows(self, teams: List[str]) -> np.ndarray:
+        """Snapshot row index per team"""
+        rows = []
+        for team in teams:
+            if team not in self.team_index:
+                raise ValueError(f"No historical data found for {team}")
+            rows.append(self.team_index[team])
+        return np.array(rows, dtype=np.intp)
 
-        # Check if ensemble
-        if isinstance(model, dict) and model.get('type') == 'ensemble':
-            # Ensemble prediction
-            xgb_proba = model['xgboost'].predict_proba(features)[0]
-            rf_proba = model['randomforest'].predict_proba(features)[0]
+    def _build_feature_matrix(self, home_teams: List[str], away_teams: List[str]) -> np.ndarray:
+        """
+        Build feature vectors for several matchups (one row per match)
 
-            # Weighted average (60% RF, 40% XGB based on performance)
-            probabilities = 0.6 * rf_proba + 0.4 * xgb_proba
-            prediction = int(np.argmax(probabilities))
+        Args:
+            home_teams: Home team per match
+            away_teams: Away team per match
 
-            logger.debug("Used ensemble prediction (60% RF, 40% XGB)")
-        else:
-            # Single model prediction
-            probabilities = model.predict_proba(features)[0]
-            prediction = model.predict(features)[0]
+        Returns:
+            (n_matches, n_model_features) array in model feature order
+        """
+        home = self.team_snapshot[self._team_rows(home_teams)]
+        away = self.team_snapshot[self._team_rows(away_teams)]
+        features = np.zeros((len(home), self.n_model_features))
+
+        for operation, arrays in self.assembly.items():
+            if operation == 'constant':
+                positions, values = arrays
+                features[:, positions] = values
+                continue
+
+            positions, home_cols, away_cols = arrays
+            features[:, positions] = self.feature_engineer.apply_operation(
+                operation,
+                home[:, home_cols], home[:, away_cols],
+                away[:, home_cols], away[:, away_cols])
 
-        result_map = {0: 'Home Win', 1: 'Draw', 2: 'Away Win'}
-        predicted_result = result_map[prediction]
+        # Handle NaNs
+        return np.nan_to_num(features, nan=0.0)
 
-        # Calculate certainty (margin-based)
-        prob_dict = {
-            'home_win': float(probabilities[0]),
-            'draw': float(probabilities[1]),
-            'away_win': float(probabilities[2])
-        }
+    def _build_match_features(self, home_team: str, away_team: str) -> np.ndarray:
+        """Build the (1, n_features) vector for a specific matchup"""
+        return self._build_feature_matrix([home_team], [away_team])
+
+    @staticmethod
+    def _predict_proba(model, features: np.ndarray) -> np.ndarray:
+        """Class probabilities for all rows (single model or EnsembleModel)"""
+        return member_proba(model, features)
+
+    def _binary_market(self, probability: float, positive: str, negative: str) -> Dict:
+        """Format a binary market, e.g. ('Over', 'Under') or ('Yes', 'No')"""
+        positive_key = positive.lower()
+        negative_key = negative.lower()
+
+        # Calculate certainty
+        prob_dict = {positive_key: float(probability),
+                     negative_key: float(1 - probability)}
         certainty, certainty_level = self._calculate_certainty(
-            prob_dict, 'multi')
+            prob_dict, 'binary')
 
         return {
-            'prediction': predicted_result,
-            'probabilities': prob_dict,
+            'prediction': positive if probability > 0.5 else negative,
+            f'probability_{positive_key}': float(probability),
+            f'probability_{negative_key}': float(1 - probability),
             'certainty': certainty,
             'certainty_level': certainty_level
         }
 
-    def _predict_goals(self, features: np.ndarray) -> Dict:
-        """Predict goals (Over/Under and BTTS) - supports ensemble"""
-        goals_predictions = {}
+    def _predict_binary_markets(
+        self,
+        group: str,
+        markets: Dict[str, str],
+        features: np.ndarray,
+        labels: Tuple[str, str] = ('Over', 'Under')
+    ) -> List[Dict]:
+        """
+        Predict several binary markets of one model group for all rows
 
-        # Over/Under predictions - map display names to file names
-        thresholds = {
-            'over_0.5': 'over_0_5',
-            'over_1.5': 'over_1_5',
-            'over_2.5': 'over_2_5',
-            'over_3.5': 'over_3_5'
-        }
+        Args:
+            group: Model group ('goals' or 'cards')
+            markets: Display name -> model file name
+            features: Feature matrix (one row per match)
+            labels: Positive/negative prediction labels
+
+        Returns:
+            One {display_name: market} dict per row (unavailable models skipped)
+        """
+        predictions = [{} for _ in range(len(features))]
 
-        for display_name, file_name in thresholds.items():
+        for display_name, file_name in markets.items():
             try:
-                model = self.models['goals'][file_name]
-
-                # Check if ensemble
-                if isinstance(model, dict) and model.get('type') == 'ensemble':
-                    xgb_proba = model['xgboost'].predict_proba(features)[0][1]
-                    rf_proba = model['randomforest'].predict_proba(features)[
-                        0][1]
-                    probability = 0.6 * rf_proba + 0.4 * xgb_proba
-                    prediction = 1 if probability > 0.5 else 0
-                else:
-                    probability = model.predict_proba(features)[0][1]
-                    prediction = model.predict(features)[0]
-
-                # Calculate certainty
-                prob_dict = {'over': float(
-                    probability), 'under': float(1 - probability)}
-                certainty, certainty_level = self._calculate_certainty(
-                    prob_dict, 'binary')
-
-                goals_predictions[display_name] = {
-                    'prediction': 'Over' if prediction == 1 else 'Under',
-                    'probability_over': float(probability),
-                    'probability_under': float(1 - probability),
-                    'certainty': certainty,
-                    'certainty_level': certainty_level
-                }
+                model = self.models[group][file_name]
+                probabilities = self._predict_proba(model, features)[:, 1]
+
+                for row, probability in enumerate(probabilities):
+                    predictions[row][display_name] = self._binary_market(
+                        probability, *labels)
 
             except (KeyError, FileNotFoundError, Exception) as e:
-                logger.warning(f"Model for {display_name} not available: {e}")
+                logger.warning(f"Model for {group} {display_name} not available: {e}")
 
-        # BTTS prediction
-        try:
-            btts_model = self.models['goals']['btts']
-
-            if isinstance(btts_model, dict) and btts_model.get('type') == 'ensemble':
-                xgb_proba = btts_model['xgboost'].predict_proba(features)[0][1]
-                rf_proba = btts_model['randomforest'].predict_proba(features)[
-                    0][1]
-                probability = 0.6 * rf_proba + 0.4 * xgb_proba
-                prediction = 1 if probability > 0.5 else 0
-            else:
-                probability = btts_model.predict_proba(features)[0][1]
-                prediction = btts_model.predict(features)[0]
+        return predictions
+
+    def _predict_match_result(self, features: np.ndarray) -> List[Dict]:
+        """Predict match result (1X2) for all rows - supports ensemble"""
+        probabilities = self._predict_proba(self.models['match_result'], features)
+
+        result_map = {0: 'Home Win', 1: 'Draw', 2: 'Away Win'}
+        results = []
+
+        for row in probabilities:
+            prediction = int(np.argmax(row))
 
-            # Calculate certainty
-            prob_dict = {'yes': float(probability),
-                         'no': float(1 - probability)}
+            # Calculate certainty (margin-based)
+            prob_dict = {
+                'home_win': float(row[0]),
+                'draw': float(row[1]),
+                'away_win': float(row[2])
+            }
             certainty, certainty_level = self._calculate_certainty(
-                prob_dict, 'binary')
+                prob_dict, 'multi')
 
-            goals_predictions['btts'] = {
-                'prediction': 'Yes' if prediction == 1 else 'No',
-                'probability_yes': float(probability),
-                'probability_no': float(1 - probability),
+            results.append({
+                'prediction': result_map[prediction],
+                'probabilities': prob_dict,
                 'certainty': certainty,
                 'certainty_level': certainty_level
-            }
+            })
+
+        return results
+
+    def _predict_goals(self, features: np.ndarray) -> List[Dict]:
+        """Predict goals (Over/Under and BTTS) for all rows - supports ensemble"""
+        # Over/Under predictions - map display names to file names
+        thresholds = {
+            'over_0.5': 'over_0_5',
+            'over_1.5': 'over_1_5',
+            'over_2.5': 'over_2_5',
+            'over_3.5': 'over_3_5'
+        }
+
+        goals_predictions = self._predict_binary_markets('goals', thresholds, features)
+        btts = self._predict_binary_markets(
+            'goals', {'btts': 'btts'}, features, labels=('Yes', 'No'))
 
-        except (KeyError, FileNotFoundError, Exception) as e:
-            logger.warning(f"BTTS model not available: {e}")
+        for row, market in zip(goals_predictions, btts):
+            row.update(market)
 
         return goals_predictions
 
-    def _predict_cards(self, features: np.ndarray, home_team: str, away_team: str) -> Dict:
+    def _predict_cards(
+        self,
+        features: np.ndarray,
+        away_features: np.ndarray,
+        home_teams: List[str],
+        away_teams: List[str]
+    ) -> List[Dict]:
         """
-        Predict cards for both teams separately
-        
+        Predict cards for both teams separately, for all rows
+
         Args:
-            features: Feature vector (from home team perspective)
-            home_team: Home team name
-            away_team: Away team name
+            features: Feature matrix (home team perspective)
+            away_features: Feature matrix (away team perspective)
+            home_teams: Home team name per row
+            away_teams: Away team name per row
         """
-        cards_predictions = {
-            'total_match': {},
-            'home_team': {'team_name': home_team},
-            'away_team': {'team_name': away_team}
-        }
+        n_matches = len(features)
 
-        # ==========================================
-        # TOTAL MATCH CARDS (both teams combined)
-        # ==========================================
+        # Total match cards (both teams combined)
         total_thresholds = {
             'over_2.5': 'total_cards_over_2_5',
             'over_3.5': 'total_cards_over_3_5',
             'over_4.5': 'total_cards_over_4_5'
         }
+        total_match = self._predict_binary_markets('cards', total_thresholds, features)
 
-        for display_name, file_name in total_thresholds.items():
-            try:
-                model = self.models['cards'][file_name]
-
-                if isinstance(model, dict) and model.get('type') == 'ensemble':
-                    xgb_proba = model['xgboost'].predict_proba(features)[0][1]
-                    rf_proba = model['randomforest'].predict_proba(features)[
-                        0][1]
-                    probability = 0.6 * rf_proba + 0.4 * xgb_proba
-                    prediction = 1 if probability > 0.5 else 0
-                else:
-                    probability = model.predict_proba(features)[0][1]
-                    prediction = model.predict(features)[0]
-
-                prob_dict = {'over': float(probability), 'under': float(1 - probability)}
-                certainty, certainty_level = self._calculate_certainty(prob_dict, 'binary')
-                
-                cards_predictions['total_match'][display_name] = {
-                    'prediction': 'Over' if prediction == 1 else 'Under',
-                    'probability_over': float(probability),
-                    'probability_under': float(1 - probability),
-                    'certainty': certainty,
-                    'certainty_level': certainty_level
-                }
-
-
-            except (KeyError, FileNotFoundError, Exception) as e:
-                logger.warning(
-                    f"Model for total {display_name} not available: {e}")
-
-        # ==========================================
-        # HOME TEAM CARDS
-        # ==========================================
+        # Team cards: home and away perspectives stacked, one call per model
         team_thresholds = {
             'over_1.5': 'team_cards_over_1_5',
             'over_2.5': 'team_cards_over_2_5'
         }
+        team = self._predict_binary_markets(
+            'cards', team_thresholds, np.vstack([features, away_features]))
 
-        for display_name, file_name in team_thresholds.items():
-            try:
-                model = self.models['cards'][file_name]
-
-                if isinstance(model, dict) and model.get('type') == 'ensemble':
-                    xgb_proba = model['xgboost'].predict_proba(features)[0][1]
-                    rf_proba = model['randomforest'].predict_proba(features)[
-                        0][1]
-                    probability = 0.6 * rf_proba + 0.4 * xgb_proba
-                    prediction = 1 if probability > 0.5 else 0
-                else:
-                    probability = model.predict_proba(features)[0][1]
-                    prediction = model.predict(features)[0]
-
-                # Calculate certainty
-                prob_dict = {'over': float(probability), 'under': float(1 - probability)}
-                certainty, certainty_level = self._calculate_certainty(prob_dict, 'binary')
-                
-                cards_predictions['home_team'][display_name] = {
-                    'prediction': 'Over' if prediction == 1 else 'Under',
-                    'probability_over': float(probability),
-                    'probability_under': float(1 - probability),
-                    'certainty': certainty,
-                    'certainty_level': certainty_level
-                }
-
-
-            except (KeyError, FileNotFoundError, Exception) as e:
-                logger.warning(
-                    f"Home team cards {display_name} not available: {e}")
-
-        # ==========================================
-        # AWAY TEAM CARDS (using opponent features)
-        # ==========================================
-        # Build away team feature vector (swap home/away perspective)
-        try:
-            away_features = self._build_match_features(away_team, home_team)
-
-            for display_name, file_name in team_thresholds.items():
-                try:
-                    model = self.models['cards'][file_name]
-
-                    if isinstance(model, dict) and model.get('type') == 'ensemble':
-                        xgb_proba = model['xgboost'].predict_proba(away_features)[
-                            0][1]
-                        rf_proba = model['randomforest'].predict_proba(away_features)[
-                            0][1]
-                        probability = 0.6 * rf_proba + 0.4 * xgb_proba
-                        prediction = 1 if probability > 0.5 else 0
-                    else:
-                        probability = model.predict_proba(away_features)[0][1]
-                        prediction = model.predict(features)[0]
-
-                    # Calculate certainty
-                    prob_dict = {'over': float(
-                        probability), 'under': float(1 - probability)}
-                    certainty, certainty_level = self._calculate_certainty(
-                        prob_dict, 'binary')
-
-                    cards_predictions['away_team'][display_name] = {
-                        'prediction': 'Over' if prediction == 1 else 'Under',
-                        'probability_over': float(probability),
-                        'probability_under': float(1 - probability),
-                        'certainty': certainty,
-                        'certainty_level': certainty_level
-                    }
-
-                except (KeyError, FileNotFoundError, Exception) as e:
-                    logger.warning(
-                        f"Away team cards {display_name} not available: {e}")
-
-        except Exception as e:
-            logger.warning(
-                f"Could not generate away team cards prediction: {e}")
+        cards_predictions = []
+        for row in range(n_matches):
+            cards_predictions.append({
+                'total_match': total_match[row],
+                'home_team': {'team_name': home_teams[row], **team[row]},
+                'away_team': {'team_name': away_teams[row], **team[n_matches + row]}
+            })
 
         return cards_predictions
 
-
-
     def _calculate_double_chance(self, match_result: Dict) -> Dict:
         """
         Calculate double chance probabilities from match result
@@ -0,0 +1,158 @@
+"""
+Streak Kernels
+Vectorized run-length calculations for streak and games-since features
+
+All features are computed on the *previous* match (shift by one within each
+team), so the current result never leaks into its own streak value.
+
+Pure NumPy by default. A numba-compiled loop is opt-in (config.STREAK_NUMBA):
+its import and JIT/cache load cost ~0.5s per process, which short-lived CLI
+and cron processes never win back on a few thousand rows. numba is only
+imported when that path is used.
+"""
+import pandas as pd
+import numpy as np
+import importlib.util
+import logging
+from typing import Dict
+
+from config import STREAK_NUMBA
+
+logger = logging.getLogger(__name__)
+
+NUMBA_AVAILABLE = importlib.util.find_spec('numba') is not None
+
+# Compiled kernel, built on first use of the numba path
+_numba_kernel = None
+
+
+def _streaks_numpy(hits: np.ndarray, group_start: np.ndarray) -> np.ndarray:
+    """
+    Consecutive hits ending at each row (group-sorted, already shifted)
+
+    Args:
+        hits: (n, k) boolean matrix
+        group_start: (n,) sorted position of each row's first group row
+    """
+    positions = np.arange(len(hits))[:, None]
+    last_miss = np.where(~hits, positions, -1)
+    last_miss = np.maximum(np.maximum.accumulate(last_miss, axis=0),
+                           group_start[:, None] - 1)
+    return (positions - last_miss).astype(np.int64)
+
+
+def _games_since_numpy(hits: np.ndarray, group_start: np.ndarray) -> np.ndarray:
+    """
+    Rows since the last hit at each row (group-sorted, already shifted)
+
+    Args:
+        hits: (n, k) boolean matrix
+        group_start: (n,) sorted position of each row's first group row
+    """
+    positions = np.arange(len(hits))[:, None]
+    last_hit = np.where(hits, positions, -1)
+    last_hit = np.maximum(np.maximum.accumulate(last_hit, axis=0),
+                          group_start[:, None] - 1)
+    return (positions - last_hit).astype(np.int64)
+
+
+def _run_lengths_numba(hits: np.ndarray, is_start: np.ndarray, since: bool) -> np.ndarray:
+    """Streak / games-since run lengths with the numba kernel (compiled on first call)"""
+    global _numba_kernel
+    if _numba_kernel is None:
+        from numba import njit
+
+        # cache=True falls back to a user-wide cache dir when __pycache__ is read-only
+        @njit(cache=True)
+        def run_lengths(hits, is_start, since):
+            n, k = hits.shape
+            out = np.zeros((n, k), dtype=np.int64)
+            for j in range(k):
+                current = 0
+                for i in range(n):
+                    if is_start[i]:
+                        current = 0
+                    if since:
+                        current = 0 if hits[i, j] else current + 1
+                    else:
+                        current = current + 1 if hits[i, j] else 0
+                    out[i, j] = current
+            return out
+
+        _numba_kernel = run_lengths
+
+    return _numba_kernel(hits, is_start, since)
+
+
+def calculate_streaks(
+    groups,
+    streak_hits: Dict[str, np.ndarray],
+    since_hits: Dict[str, np.ndarray] = None,
+    use_numba: bool = None
+) -> pd.DataFrame:
+    """
+    Compute all streak and games-since features for all teams in one call
+
+    Rows must be in chronological order within each group. Each hit array
+    marks matches where the condition held (e.g. result == 'W'); values are
+    shifted by one match per group before counting, like
+    `groupby(team)[col].transform(lambda x: calc(x.shift(1)))`.
+
+    Args:
+        groups: Group label per row (e.g. df['team_name'])
+        streak_hits: Feature name -> boolean array; output is the length of
+                     the run of hits ending at the previous match
+        since_hits: Feature name -> boolean array; output is the number of
+                    matches since the last hit (counting the first match)
+        use_numba: Use the compiled kernel when numba is available
+                   (default: config.STREAK_NUMBA)
+
+    Returns:
+        DataFrame of int64 columns in input row order (index = groups index)
+    """
+    since_hits = since_hits or {}
+    index = groups.index if isinstance(groups, pd.Series) else None
+
+    codes, _ = pd.factorize(np.asarray(groups))
+    n = len(codes)
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+
+    is_start = np.ones(n, dtype=bool)
+    is_start[1:] = sorted_codes[1:] != sorted_codes[:-1]
+    group_start = np.maximum.accumulate(np.where(is_start, np.arange(n), 0))
+
+    def shifted(hit_map: Dict[str, np.ndarray]) -> np.ndarray:
+        # Previous match per group; the first match of each group is a miss
+        matrix = np.column_stack(
+            [np.asarray(h, dtype=bool)[order] for h in hit_map.values()]
+        ) if hit_map else np.zeros((n, 0), dtype=bool)
+        result = np.zeros_like(matrix)
+        result[1:] = matrix[:-1]
+        result[is_start] = False
+        return result
+
+    if use_numba is None:
+        use_numba = STREAK_NUMBA
+    compiled = use_numba and NUMBA_AVAILABLE
+    columns = {}
+
+    for hit_map, since in [(streak_hits, False), (since_hits, True)]:
+        if not hit_map:
+            continue
+
+        hits = shifted(hit_map)
+        if compiled:
+            values = _run_lengths_numba(hits, is_start, since)
+        elif since:
+            values = _games_since_numpy(hits, group_start)
+        else:
+            values = _streaks_numpy(hits, group_start)
+
+        unsorted = np.empty_like(values)
+        unsorted[order] = values
+
+        for j, name in enumerate(hit_map):
+            columns[name] = unsorted[:, j]
+
+    return pd.DataFrame(columns, index=index)
@@ -0,0 +1,536 @@
+"""
+Training Orchestrator Service
+Trains every market x algorithm job in parallel from one shared feature matrix
+
+Features are generated once (via the FeatureStore) and materialized as a
+float32 matrix by the MatrixCache; workers memory-map the cached .npy file
+and slice the train/validation rows, so each job only receives its targets.
+
+All models of a competition share one assembly plan (models/<competition>/
+assembly_plan.json). A run over some of the groups keeps the saved plan's
+features, so the other groups' models stay servable; every model is stamped
+with the hash of its plan (see ModelManager._check_plan). Jobs write into a
+staging directory next to the models; only when every job succeeded are the
+models and the plan renamed into place, so the served directory never mixes
+models of two plans.
+"""
+import numpy as np
+import pandas as pd
+import logging
+import os
+import shutil
+import time
+import joblib
+import json
+import xgboost as xgb
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, f1_score
+
+from config import MODEL_PARAMS, ENSEMBLE_WEIGHTS, TRAINING_CPU_BUDGET, FEATURE_SELECTION
+from services.compact_trees import export_model
+from services.data_loader import DataLoader
+from services.feature_engineering import FeatureEngineer, assembly_plan_hash
+from services.feature_selector import FeatureSelector
+from services.matrix_cache import MatrixCache, matrix_file
+
+logger = logging.getLogger(__name__)
+
+# XGBoost settings per market family (RF settings come from config.MODEL_PARAMS)
+XGB_PARAMS = {
+    'match_result': {
+        'objective': 'multi:softprob',
+        'num_class': 3,
+        'n_estimators': 200,
+        'max_depth': 4,
+        'learning_rate': 0.05,
+        'subsample': 0.8,
+        'colsample_bytree': 0.8,
+        'min_child_weight': 3,
+        'gamma': 0.1,
+        'reg_alpha': 0.1,
+        'reg_lambda': 1.0,
+        'random_state': 42
+    },
+    'goals': {
+        'objective': 'binary:logistic',
+        'n_estimators': 150,
+        'max_depth': 4,
+        'learning_rate': 0.05,
+        'subsample': 0.8,
+        'colsample_bytree': 0.8,
+        'min_child_weight': 3,
+        'gamma': 0.1,
+        'reg_alpha': 0.1,
+        'reg_lambda': 1.0,
+        'random_state': 42
+    },
+    'btts': {
+        'objective': 'binary:logistic',
+        'n_estimators': 150,
+        'max_depth': 4,
+        'learning_rate': 0.05,
+        'min_child_weight': 3,
+        'gamma': 0.1,
+        'reg_alpha': 0.1,
+        'reg_lambda': 1.0,
+        'random_state': 42
+    },
+    'cards': MODEL_PARAMS['xgboost']['binary']
+}
+
+
+def add_targets(df: pd.DataFrame) -> pd.DataFrame:
+    """Add the 1X2 and cards target columns (goals targets come from features)"""
+    df = df.copy()
+    # Cards targets: both teams combined, and this team only
+    df['match_total_cards'] = (
+        df['cards_yellow'] + df['cards_red'] + df.get('cards_yellow_red', 0) +
+        df['cards_yellow_against'] + df['cards_red_against'] +
+        df.get('cards_yellow_red_against', 0)
+    )
+    df['team_total_cards'] = df['cards_yellow'] + \
+        df['cards_red'] + df.get('cards_yellow_red', 0)
+    df['result_encoded'] = df['result'].map({'W': 0, 'D': 1, 'L': 2})
+    return df
+
+
+def market_targets(df: pd.DataFrame, groups: List[str]) -> Dict:
+    """
+    Target vector of every market in the given groups
+
+    Args:
+        df: Frame with targets (see add_targets)
+        groups: Subset of 'match_result', 'goals', 'cards'
+
+    Returns:
+        {(group, name): (XGB_PARAMS family, y)}; name is None for match_result
+    """
+    targets = {}
+
+    if 'match_result' in groups:
+        targets[('match_result', None)] = ('match_result', df['result_encoded'].values)
+
+    if 'goals' in groups:
+        for threshold in [0.5, 1.5, 2.5, 3.5]:
+            column = f'over_{str(threshold).replace(".", "_")}'
+            if column not in df.columns:
+                logger.warning(f"Column {column} not found, skipping")
+                continue
+            targets[('goals', column)] = ('goals', df[column].values)
+
+        if 'both_scored' in df.columns:
+            targets[('goals', 'btts')] = ('btts', df['both_scored'].values)
+
+    if 'cards' in groups:
+        for column, thresholds in [('match_total_cards', [2.5, 3.5, 4.5]),
+                                   ('team_total_cards', [1.5, 2.5])]:
+            prefix = 'total_cards' if column == 'match_total_cards' else 'team_cards'
+            for threshold in thresholds:
+                name = f'{prefix}_over_{str(threshold).replace(".", "_")}'
+                targets[('cards', name)] = ('cards', (df[column] > threshold).astype(int).values)
+
+    return targets
+
+
+def model_params(group: str, family: str, algorithm: str, tuned: Optional[Dict] = None) -> Dict:
+    """
+    Hyperparameters for one market (copy, safe to modify)
+
+    Args:
+        group: 'match_result', 'goals' or 'cards'
+        family: XGB_PARAMS key ('match_result', 'goals', 'btts', 'cards')
+        algorithm: 'xgboost' or 'randomforest'
+        tuned: This market's entry of load_tuned_params(), overlaid on the defaults
+    """
+    if algorithm == 'xgboost':
+        params = dict(XGB_PARAMS[family])
+    else:
+        params = dict(MODEL_PARAMS['randomforest'][
+            'match_result' if group == 'match_result' else 'binary'])
+
+    params.update((tuned or {}).get(algorithm, {}))
+    return params
+
+
+def build_model(algorithm: str, params: Dict):
+    """Unfitted XGBClassifier or RandomForestClassifier"""
+    if algorithm == 'xgboost':
+        return xgb.XGBClassifier(**params)
+    return RandomForestClassifier(**params)
+
+
+def select_features(cache: MatrixCache, matrix: Dict, split_idx: int,
+                    min_match_number: int = 5, n_jobs: int = -1):
+    """
+    Run the FeatureSelector on the training rows and load the selected matrix
+
+    Args:
+        cache: MatrixCache the full matrix came from
+        matrix: Full matrix (MatrixCache.load)
+        split_idx: Rows before this index are the training period
+        min_match_number: Row view of `matrix`
+        n_jobs: Threads for the importance pass
+
+    Returns:
+        (selected matrix, selection dict)
+    """
+    targets = {group if name is None else f'{group}/{name}': y
+               for (group, name), (_, y) in market_targets(
+                   matrix['rows'].iloc[:split_idx], TrainingOrchestrator.GROUPS).items()}
+
+    selection = FeatureSelector(n_jobs=n_jobs).select(
+        matrix['X'][:split_idx], targets, matrix['columns'])
+    return cache.load(min_match_number, columns=selection['features']), selection
+
+
+def saved_plan_features(models_dir: Path, feature_engineer: FeatureEngineer,
+                        available: List[str]) -> Optional[List[str]]:
+    """
+    Features of the assembly plan saved with the models, for runs that retrain
+    only some groups (the other groups' models were trained on exactly these)
+
+    Args:
+        models_dir: Competition models directory
+        feature_engineer: FeatureEngineer of the run (plan version must match)
+        available: Columns of the full matrix
+
+    Returns:
+        Feature names in plan order, or None if there is no usable plan
+    """
+    plan_path = Path(models_dir) / 'assembly_plan.json'
+    if not plan_path.exists():
+        return None
+
+    with open(plan_path, 'r') as f:
+        plan = json.load(f)
+
+    features = [entry['feature'] for entry in plan['features']]
+    if plan.get('version') != feature_engineer.VERSION or \
+            feature_engineer.get_assembly_plan(features) != plan or \
+            not set(features) <= set(available):
+        logger.warning(f"Saved assembly plan {plan_path} is stale: selecting features again; "
+                       f"models of the groups not retrained will be refused until they are")
+        return None
+
+    return features
+
+
+def params_dir(competition: str) -> Path:
+    """Directory holding the versioned params files"""
+    return Path(__file__).parent.parent / 'models' / competition / 'params'
+
+
+def load_tuned_params(competition: str) -> Dict:
+    """
+    Latest tuned parameters for a competition (written by tune.py)
+
+    Returns:
+        {'match_result': {'xgboost': {...}, 'randomforest': {...}},
+         'goals/over_2_5': {...}, ...}; empty if the competition was never tuned
+    """
+    files = sorted(params_dir(competition).glob('v*.json'))
+    if not files:
+        return {}
+
+    with open(files[-1], 'r') as f:
+        content = json.load(f)
+
+    return {label: {algorithm: study['params'] for algorithm, study in studies.items()}
+            for label, studies in content.get('markets', {}).items()}
+
+
+class TrainingOrchestrator:
+    """
+    Trains XGBoost + Random Forest for every market with a process pool
+
+    Usage:
+        orchestrator = TrainingOrchestrator('premier_league', cpu_budget=4)
+        results = orchestrator.run(['match_result', 'goals', 'cards'])
+        orchestrator.log_summary(results)
+    """
+
+    GROUPS = ['match_result', 'goals', 'cards']
+    ALGORITHMS = ['xgboost', 'randomforest']
+
+    def __init__(
+        self,
+        competition: str = 'premier_league',
+        cpu_budget: Optional[int] = TRAINING_CPU_BUDGET,
+        models_dir: Optional[Path] = None,
+        feature_selection: bool = FEATURE_SELECTION
+    ):
+        """
+        Initialize TrainingOrchestrator
+
+        Args:
+            competition: Competition name (e.g., 'premier_league')
+            cpu_budget: CPUs shared by all jobs (None = all available)
+            models_dir: Output directory (default: models/<competition>)
+            feature_selection: Prune features with the FeatureSelector first
+        """
+        self.competition = competition
+        self.cpu_budget = max(1, cpu_budget or os.cpu_count() or 1)
+        self.models_dir = Path(models_dir) if models_dir else \
+            Path(__file__).parent.parent / 'models' / competition
+
+        self.feature_selection = feature_selection
+        self.feature_engineer = FeatureEngineer(rolling_windows=[3, 5, 10])
+        # Overlay of the latest tune.py output (empty if never tuned)
+        self.tuned_params = load_tuned_params(competition)
+        self.feature_columns = None
+        self.selection = None
+        self.matrix = None
+        self.split_idx = None
+        self.train_df = None
+        self.val_df = None
+        self.X_train = None
+        self.X_val = None
+
+    def prepare(self, groups: Optional[List[str]] = None):
+        """
+        Load the cached matrix and split train/validation (chronological 80/20)
+
+        Args:
+            groups: Groups about to be trained (default: all); a subset keeps
+                    the features of the saved assembly plan
+        """
+        cache = MatrixCache(DataLoader(self.competition), self.feature_engineer)
+        self.matrix = cache.load(min_match_number=5)
+
+        rows = self.matrix['rows']
+        self.split_idx = int(len(rows) * 0.8)
+
+        partial = groups is not None and set(groups) != set(self.GROUPS)
+        features = saved_plan_features(self.models_dir, self.feature_engineer,
+                                       self.matrix['columns']) if partial else None
+        if features is not None:
+            logger.info(f"Training {', '.join(groups)} only: keeping the saved assembly plan")
+            if features != self.matrix['columns']:
+                self.matrix = cache.load(min_match_number=5, columns=features)
+        elif self.feature_selection:
+            self.matrix, self.selection = select_features(
+                cache, self.matrix, self.split_idx, n_jobs=self.cpu_budget)
+
+        self.feature_columns = self.matrix['columns']
+        logger.info(f"Using {len(self.feature_columns)} features")
+
+        # Row frames carry the targets; X_* are views of the (memory-mapped) matrix
+        self.train_df = rows.iloc[:self.split_idx]
+        self.val_df = rows.iloc[self.split_idx:]
+        self.X_train = self.matrix['X'][:self.split_idx]
+        self.X_val = self.matrix['X'][self.split_idx:]
+
+        logger.info(f"Training: {len(self.train_df)} samples")
+        logger.info(f"Validation: {len(self.val_df)} samples")
+
+    def build_jobs(self, groups: List[str], models_dir: Optional[Path] = None) -> List[Dict]:
+        """One job per (market, algorithm), in market order, saving under models_dir"""
+        train_targets = market_targets(self.train_df, groups)
+        val_targets = market_targets(self.val_df, groups)
+        jobs = []
+
+        for (group, name), (family, y_train) in train_targets.items():
+            y_val = val_targets[(group, name)][1]
+            for algorithm in self.ALGORITHMS:
+                jobs.append({
+                    'group': group,
+                    'name': name,
+                    'algorithm': algorithm,
+                    'params': model_params(group, family, algorithm, self.tuned_params.get(
+                        group if name is None else f'{group}/{name}')),
+                    'split': self.split_idx,
+                    'y_train': y_train,
+                    'y_val': y_val,
+                    'path': self._model_path(group, name, algorithm, models_dir)
+                })
+
+        return jobs
+
+    def run(self, groups: Optional[List[str]] = None) -> Dict[str, Dict[str, Dict]]:
+        """
+        Train, save and export all models of the given groups
+
+        Args:
+            groups: Subset of GROUPS (default: all)
+
+        Returns:
+            {'goals/over_2_5': {'xgboost': metrics, 'randomforest': metrics,
+                                'ensemble': metrics}, ...}
+        """
+        groups = groups or self.GROUPS
+        if self.train_df is None:
+            self.prepare(groups)
+
+        # How Predictor rebuilds these feature vectors for new matchups
+        plan = self.feature_engineer.get_assembly_plan(self.feature_columns)
+
+        staging = self.models_dir.with_name(f'.{self.models_dir.name}.staging')
+        if staging.exists():
+            shutil.rmtree(staging)  # left over from an interrupted run
+
+        jobs = self.build_jobs(groups, staging)
+        # Most expensive first so the pool does not wait on a late large forest
+        schedule = sorted(jobs, key=lambda job: -job['params'].get('n_estimators', 100) *
+                          job['params'].get('max_depth', 6) *
+                          (3 if job['group'] == 'match_result' else 1))
+
+        processes = min(self.cpu_budget, len(jobs))
+        threads = max(1, self.cpu_budget // processes)
+        for job in jobs:
+            job['params']['n_jobs'] = self._job_threads(job['params'], threads)
+            job['plan_hash'] = assembly_plan_hash(plan)
+
+        logger.info(f"Training {len(jobs)} models: {processes} processes x "
+                    f"{threads} threads (CPU budget {self.cpu_budget})")
+
+        started = time.perf_counter()
+
+        try:
+            with matrix_file(self.matrix) as path:
+                if processes == 1:
+                    outcomes = [train_job(job, path) for job in schedule]
+                else:
+                    with ProcessPoolExecutor(max_workers=processes) as pool:
+                        outcomes = list(pool.map(train_job, schedule, [path] * len(schedule)))
+
+            logger.info(f"Trained {len(jobs)} models in {time.perf_counter() - started:.1f}s")
+
+            self.feature_engineer.save_assembly_plan(
+                staging / 'assembly_plan.json', self.feature_columns)
+            if self.selection is not None:
+                FeatureSelector.save(self.selection, staging / 'feature_selection.json')
+
+            self._promote(staging)
+        finally:
+            # A failed job leaves the served models and plan untouched
+            shutil.rmtree(staging, ignore_errors=True)
+
+        for job, outcome in zip(schedule, outcomes):
+            job['outcome'] = outcome
+        return self._collect(jobs)
+
+    def log_summary(self, results: Dict[str, Dict[str, Dict]]):
+        """Accuracy per market and algorithm"""
+        logger.info("=" * 80)
+        for label, metrics in results.items():
+            best = max(metrics, key=lambda member: metrics[member]['accuracy'])
+            scores = ', '.join(f"{member}={values['accuracy']:.4f}"
+                               for member, values in metrics.items())
+            logger.info(f"  {label:<30} {scores} (Best: {best})")
+        logger.info("=" * 80)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _model_path(self, group: str, name: Optional[str], algorithm: str,
+                    models_dir: Optional[Path] = None) -> Path:
+        models_dir = models_dir or self.models_dir
+        if name is None:
+            return models_dir / group / f'{algorithm}_model.pkl'
+        return models_dir / group / f'{name}_{algorithm}.pkl'
+
+    def _promote(self, staging: Path):
+        """Rename staged models into models_dir, then the plan files (each rename atomic)"""
+        groups = [path for path in sorted(staging.iterdir()) if path.is_dir()]
+        for group in groups:
+            (self.models_dir / group.name).mkdir(parents=True, exist_ok=True)
+            for path in sorted(group.iterdir()):
+                _replace(path, self.models_dir / group.name / path.name)
+
+        # Written last: the plan change is what makes the prediction server reload
+        for name in ['feature_selection.json', 'assembly_plan.json']:
+            if (staging / name).exists():
+                _replace(staging / name, self.models_dir / name)
+
+        logger.info(f"Models and assembly plan moved into {self.models_dir}")
+
+    @staticmethod
+    def _job_threads(params: Dict, threads: int) -> int:
+        """Threads for one job: config n_jobs, capped by the job's CPU share"""
+        n_jobs = params.get('n_jobs')
+        if n_jobs is None or n_jobs < 0:
+            return threads
+        return min(n_jobs, threads)
+
+    def _collect(self, jobs: List[Dict]) -> Dict[str, Dict[str, Dict]]:
+        """Group job metrics per market and add the weighted ensemble"""
+        results = {}
+        probabilities = {}
+
+        for job in jobs:
+            label = self._label(job)
+            results.setdefault(label, {})[job['algorithm']] = job['outcome']['metrics']
+            probabilities.setdefault(label, {})[job['algorithm']] = job['outcome']['val_proba']
+
+        for job in jobs:
+            members = probabilities[self._label(job)]
+            if job['algorithm'] != 'xgboost' or set(members) != set(self.ALGORITHMS):
+                continue
+
+            total = sum(ENSEMBLE_WEIGHTS[member] for member in members)
+            proba = sum(ENSEMBLE_WEIGHTS[member] / total * members[member] for member in members)
+            results[self._label(job)]['ensemble'] = _metrics(
+                job, job['y_val'], np.argmax(proba, axis=1))
+
+        return results
+
+    @staticmethod
+    def _label(job: Dict) -> str:
+        return job['group'] if job['name'] is None else f"{job['group']}/{job['name']}"
+
+
+def train_job(job: Dict, matrix_path: Path) -> Dict:
+    """
+    Fit, evaluate, save and export one model (runs in a worker process)
+
+    Args:
+        job: Entry from TrainingOrchestrator.build_jobs
+        matrix_path: Shared .npy matrix; rows before job['split'] train, the rest validate
+
+    Returns:
+        {'metrics': {...}, 'val_proba': validation probabilities, 'seconds': float}
+    """
+    started = time.perf_counter()
+    X = np.load(matrix_path, mmap_mode='r')
+    X_train, X_val = X[:job['split']], X[job['split']:]
+
+    model = build_model(job['algorithm'], job['params'])
+    model.fit(X_train, job['y_train'])
+    model.assembly_plan_hash = job.get('plan_hash')
+    val_proba = model.predict_proba(X_val)
+    metrics = _metrics(job, job['y_val'], model.predict(X_val))
+
+    path = Path(job['path'])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(model, path)
+    export_model(model, path.with_suffix('.trees'))
+
+    seconds = time.perf_counter() - started
+    logger.info(f"  {TrainingOrchestrator._label(job)} {job['algorithm']}: accuracy={metrics['accuracy']:.4f} ({seconds:.1f}s)")
+
+    return {'metrics': metrics, 'val_proba': val_proba, 'seconds': seconds}
+
+
+def _replace(source: Path, target: Path):
+    """os.replace, also for directories (.trees exports): the old copy is moved aside first"""
+    if not source.is_dir() or not target.exists():
+        os.replace(source, target)
+        return
+
+    previous = target.with_name(target.name + '.old')
+    if previous.exists():
+        shutil.rmtree(previous)
+    os.replace(target, previous)
+    os.replace(source, target)
+    shutil.rmtree(previous)
+
+
+def _metrics(job: Dict, y_true: np.ndarray, y_pred: np.ndarray) -> Dict:
+    metrics = {'accuracy': float(accuracy_score(y_true, y_pred))}
+    if job['group'] == 'match_result':
+        metrics['f1_macro'] = float(f1_score(y_true, y_pred, average='macro'))
+    return metrics
@@ -0,0 +1,113 @@
+"""
+Test script for the DataLoader Arrow store
+Arrow reads match the CSV, support projection/filters and follow CSV edits;
+Arrow-only seasons work with every cache keyed on the season files
+"""
+import sys
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pandas as pd
+
+from prediction_server import PredictorPool
+from services.data_loader import DataLoader
+from services.feature_engineering import FeatureEngineer
+from services.feature_store import FeatureStore
+from services.matrix_cache import MatrixCache
+
+
+def _loaders(tmp):
+    """Arrow and CSV loaders over a copy of one season"""
+    source = DataLoader('premier_league', data_format='csv')
+    shutil.copy(source.data_dir / '2024-2025_all_teams.csv', tmp)
+
+    arrow, csv = DataLoader('premier_league'), DataLoader('premier_league', data_format='csv')
+    arrow.data_dir = csv.data_dir = Path(tmp)
+    return arrow, csv
+
+
+def test_arrow_matches_csv():
+    """Same frame as the CSV path, with and without projection and filters"""
+    with tempfile.TemporaryDirectory() as tmp:
+        arrow, csv = _loaders(tmp)
+
+        pd.testing.assert_frame_equal(arrow.load_season('2024-2025'), csv.load_season('2024-2025'))
+        assert (Path(tmp) / '2024-2025_all_teams.arrow').exists()
+
+        query = dict(columns=['date', 'opponent', 'goals_for'], teams=['Arsenal', 'Chelsea'],
+                     start_date='2024-12-01', end_date='2025-03-01')
+        subset = arrow.load_season('2024-2025', **query)
+        pd.testing.assert_frame_equal(subset, csv.load_season('2024-2025', **query))
+        assert list(subset.columns) == ['date', 'opponent', 'goals_for', 'season']
+        assert subset['date'].between('2024-12-01', '2025-03-01').all()
+
+        assert arrow.get_team_list('2024-2025') == csv.get_team_list('2024-2025')
+        pd.testing.assert_frame_equal(arrow.get_team_data('2024-2025', 'Arsenal'),
+                                      csv.get_team_data('2024-2025', 'Arsenal'))
+
+    print("Arrow store matches the CSV")
+
+
+def test_csv_edits_are_imported():
+    """A CSV newer than the Arrow file is re-imported; export round-trips"""
+    with tempfile.TemporaryDirectory() as tmp:
+        arrow, _ = _loaders(tmp)
+        rows = len(arrow.load_season('2024-2025'))
+
+        csv_path = Path(tmp) / '2024-2025_all_teams.csv'
+        df = pd.read_csv(csv_path)
+        df.iloc[:-2].to_csv(csv_path, index=False)
+        arrow_mtime = (Path(tmp) / '2024-2025_all_teams.arrow').stat().st_mtime_ns
+        os.utime(csv_path, ns=(arrow_mtime + 10**9, arrow_mtime + 10**9))
+
+        assert len(arrow.load_season('2024-2025')) == rows - 2
+
+        exported = arrow.export_csv('2024-2025', Path(tmp) / 'export.csv')
+        assert len(pd.read_csv(exported)) == rows - 2
+
+    print("CSV edits reach the Arrow store")
+
+
+def test_arrow_only_season():
+    """A season with no CSV left: feature store, matrix cache key and server signature use its Arrow file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        arrow, _ = _loaders(tmp)
+        source = DataLoader('premier_league', data_format='csv').data_dir
+        shutil.copy(source / '2025-2026_all_teams.csv', tmp)
+        arrow.import_csv('2024-2025')
+        (Path(tmp) / '2024-2025_all_teams.csv').unlink()
+
+        assert arrow.get_available_seasons() == ['2025-2026', '2024-2025']
+        assert arrow.source_file('2024-2025') == Path(tmp) / '2024-2025_all_teams.arrow'
+        assert arrow.source_file('2025-2026') == Path(tmp) / '2025-2026_all_teams.csv'
+
+        features = FeatureStore(arrow, FeatureEngineer(), store_dir=Path(tmp) / 'features').load_features()
+        assert set(features['season']) == {'2024-2025', '2025-2026'}
+
+        cache = MatrixCache(arrow, FeatureEngineer(), cache_dir=Path(tmp) / 'matrix_cache')
+        key = cache.cache_key({'min_match_number': 5})
+
+        manager = SimpleNamespace(models_dir=Path(tmp) / 'models')
+        signature = PredictorPool._signature(arrow, manager)
+        assert str(Path(tmp) / '2024-2025_all_teams.arrow') in [entry[0] for entry in signature[:-1]]
+
+        # Rewriting the Arrow-only season is a data change for each of them
+        arrow_path = Path(tmp) / '2024-2025_all_teams.arrow'
+        arrow_path.write_bytes(arrow_path.read_bytes() + b'\0')
+        assert cache.cache_key({'min_match_number': 5}) != key
+        assert PredictorPool._signature(arrow, manager) != signature
+
+    DataLoader.clear_cache()
+    print("Arrow-only seasons are keyed by their Arrow file")
+
+
+if __name__ == "__main__":
+    test_arrow_matches_csv()
+    test_csv_edits_are_imported()
+    test_arrow_only_season()
@@ -0,0 +1,57 @@
+"""
+Test script for the feature assembly plan
+Applying the plan to (team row, opponent row) must reproduce the training features
+"""
+import sys
+import json
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+
+from services.data_loader import DataLoader
+from services.feature_engineering import FeatureEngineer
+
+
+def test_plan_matches_training_features():
+    """opp_/diff_/cross features rebuilt from the plan equal the generated ones"""
+    loader = DataLoader('premier_league')
+    engineer = FeatureEngineer(rolling_windows=[3, 5, 10])
+    df = engineer.generate_features(loader.load_season('2025-2026'))
+
+    plan = engineer.get_assembly_plan()
+    json.dumps(plan)  # must be serializable
+    assert [entry['feature'] for entry in plan['features']] == \
+        engineer.get_model_feature_names()
+
+    # Pair every row with its opponent's row for the same fixture
+    pairs = df.merge(
+        df, left_on=['opponent', 'date'], right_on=['team_name', 'date'],
+        suffixes=('', '__opp'))
+    assert len(pairs) > 0
+
+    checked = 0
+    for entry in plan['features']:
+        if entry['operation'] in ('home', 'constant'):
+            continue
+
+        home_col, away_col = entry['home'], entry['away']
+        team_a = pairs[home_col].values if home_col else None
+        team_b = pairs[away_col].values if away_col else None
+        opp_a = pairs[f'{home_col}__opp'].values if home_col else None
+        opp_b = pairs[f'{away_col}__opp'].values if away_col else None
+
+        rebuilt = engineer.apply_operation(entry['operation'], team_a, team_b, opp_a, opp_b)
+        np.testing.assert_allclose(
+            rebuilt, pairs[entry['feature']].values, rtol=0, atol=1e-12,
+            err_msg=entry['feature'])
+        checked += 1
+
+    assert checked > 0
+    print(f"Assembly plan reproduces {checked} opponent/differential/cross features")
+
+
+if __name__ == "__main__":
+    test_plan_matches_training_features()
@@ -0,0 +1,56 @@
+"""
+Test script for the walk-forward Backtester
+Metrics agree with sklearn and folds never train on their own matchweeks
+"""
+import sys
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+from sklearn.metrics import brier_score_loss, log_loss
+
+from services.backtester import Backtester, score_probabilities
+
+
+def test_score_probabilities():
+    """Brier and log-loss match sklearn; ROI at flat odds"""
+    rng = np.random.default_rng(2)
+
+    y = rng.integers(0, 2, size=200)
+    p = rng.uniform(0.05, 0.95, size=200)
+    scores = score_probabilities(y, np.column_stack([1 - p, p]), odds=2.0)
+    assert np.isclose(scores['brier'], brier_score_loss(y, p))
+    assert np.isclose(scores['log_loss'], log_loss(y, p))
+    wins = ((p > 0.5).astype(int) == y).sum()
+    assert np.isclose(scores['roi_pct'], (wins * 2.0 - 200) / 200 * 100)
+
+    y3 = rng.integers(0, 3, size=200)
+    p3 = rng.dirichlet([1, 1, 1], size=200)
+    scores = score_probabilities(y3, p3, odds=3.0)
+    assert np.isclose(scores['log_loss'], log_loss(y3, p3))
+    assert np.isclose(scores['brier'], np.mean(np.sum((p3 - np.eye(3)[y3]) ** 2, axis=1)))
+
+
+def test_folds_are_walk_forward():
+    """Training rows predate every test row; each replayed week is tested once"""
+    backtester = Backtester('premier_league', retrain_every=3)
+    folds = backtester.build_folds()
+    assert len(folds) > 0
+
+    dates = backtester.df['date'].values
+    tested = np.concatenate([fold['test'] for fold in folds])
+    assert len(tested) == len(np.unique(tested))
+
+    for fold in folds:
+        assert len(fold['train']) >= backtester.min_train_rows
+        assert dates[fold['train']].max() < dates[fold['test']].min()
+        assert len(fold['weeks']) <= 3
+
+    print(f"{len(folds)} walk-forward folds")
+
+
+if __name__ == "__main__":
+    test_score_probabilities()
+    test_folds_are_walk_forward()
@@ -0,0 +1,48 @@
+"""
+Test script for FeatureEngineer.compact_frame
+Compact frames keep what models, the assembly plan and targets need, in smaller dtypes
+"""
+import sys
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+import pandas as pd
+
+from services.data_loader import DataLoader
+from services.feature_engineering import FeatureEngineer
+
+
+def test_compact_frame():
+    """float32 features, categorical teams, raw-only columns dropped, less memory"""
+    engineer = FeatureEngineer(rolling_windows=[3, 5, 10])
+    df = engineer.generate_features(DataLoader('premier_league').load_season('2025-2026'))
+
+    compact = engineer.compact_frame(df, extra_columns=['possession'])
+    features = engineer.get_model_feature_names()
+
+    assert set(features) <= set(compact.columns)
+    assert {'goals_for', 'goals_against', 'date', 'season', 'possession'} <= set(compact.columns)
+    assert 'referee' not in compact.columns and 'captain' not in compact.columns
+    assert compact.index.equals(df.index)
+
+    assert isinstance(compact['team_name'].dtype, pd.CategoricalDtype)
+    assert (compact['venue'] == 'Home').sum() == (df['venue'] == 'Home').sum()
+    assert not any(dtype == np.float64 for dtype in compact.dtypes)
+    assert (compact['match_number'].values == df['match_number'].values).all()
+    np.testing.assert_allclose(
+        compact[features].to_numpy(dtype=np.float64),
+        df[features].to_numpy(dtype=np.float64), rtol=1e-6, atol=1e-6)
+
+    report = engineer.memory_report(df, compact)
+    assert report['bytes_after'] < report['bytes_before'] / 2
+    assert report['columns_after'] == compact.shape[1]
+
+    print(f"Compact frame: {report['bytes_before']} -> {report['bytes_after']} bytes "
+          f"({report['saved_pct']}% saved)")
+
+
+if __name__ == "__main__":
+    test_compact_frame()
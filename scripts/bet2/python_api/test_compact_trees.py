@@ -0,0 +1,91 @@
+"""
+Test script for the compact tree export
+Exported models must reproduce predict_proba of the originals within 1e-6
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.ensemble import RandomForestClassifier
+
+from services.compact_trees import CompactTreeModel, export_model
+
+
+def test_compact_proba_parity():
+    """RF and XGBoost, binary and 3-class, with and without missing values"""
+    rng = np.random.default_rng(7)
+    X = rng.normal(size=(400, 10))
+    X_test = rng.normal(size=(100, 10))
+    X_test[::7, 3] = np.nan
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_classes in [2, 3]:
+            y = rng.integers(0, n_classes, size=400)
+            models = {
+                'randomforest': RandomForestClassifier(
+                    n_estimators=30, max_depth=7, random_state=42).fit(X, y),
+                'xgboost': xgb.XGBClassifier(
+                    n_estimators=40, max_depth=4, learning_rate=0.1,
+                    random_state=42).fit(X, y)
+            }
+
+            for name, model in models.items():
+                path = export_model(model, Path(tmp) / f'{name}_{n_classes}.trees')
+
+                for mmap_mode in [None, 'r']:
+                    compact = CompactTreeModel.load(path, mmap_mode=mmap_mode)
+                    for rows in [X_test[:1], X_test]:
+                        np.testing.assert_allclose(
+                            compact.predict_proba(rows), model.predict_proba(rows),
+                            rtol=0, atol=1e-6, err_msg=f'{name} ({n_classes} classes)')
+
+                np.testing.assert_array_equal(
+                    compact.predict(X_test[:20]), model.predict(X_test[:20]))
+
+    print("Compact models match the original probabilities")
+
+
+def test_input_validation():
+    """Wrong widths (and, for named exports, wrong column order) raise ValueError like sklearn"""
+    rng = np.random.default_rng(9)
+    X = pd.DataFrame(rng.normal(size=(200, 10)), columns=[f'f{i}' for i in range(10)])
+    y = rng.integers(0, 2, size=200)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, model in {
+            'randomforest': RandomForestClassifier(n_estimators=5, random_state=1).fit(X, y),
+            'xgboost': xgb.XGBClassifier(n_estimators=5, max_depth=3).fit(X, y)
+        }.items():
+            compact = CompactTreeModel.load(export_model(model, Path(tmp) / f'{name}.trees'))
+            assert list(compact.feature_names_in_) == list(X.columns)
+
+            for bad in [X.values[:, :9], X.values[:3, :9], np.hstack([X.values, X.values[:, :1]])]:
+                for method in [model.predict_proba, compact.predict_proba, compact.apply]:
+                    try:
+                        method(bad)
+                        assert False, f"{name}: {bad.shape[1]} columns accepted"
+                    except ValueError as e:
+                        assert 'feature' in str(e).lower()
+
+            reordered = X[list(reversed(X.columns))]
+            for method in [model.predict_proba, compact.predict_proba]:
+                try:
+                    method(reordered)
+                    assert False, f"{name}: reordered columns accepted"
+                except ValueError:
+                    pass
+
+            np.testing.assert_allclose(compact.predict_proba(X), model.predict_proba(X), atol=1e-6)
+
+    print("Compact models reject inputs of the wrong shape")
+
+
+if __name__ == "__main__":
+    test_compact_proba_parity()
+    test_input_validation()
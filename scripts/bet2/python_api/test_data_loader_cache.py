@@ -0,0 +1,59 @@
+"""
+Test script for the memoized DataLoader
+Hits return independent copies, edits invalidate, validation runs once per file version
+"""
+import sys
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pandas as pd
+
+from services.data_loader import DataLoader
+
+
+def test_memoized_seasons():
+    """Second load is served from memory; projections and filters agree with a cold read"""
+    DataLoader.clear_cache()
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copy(DataLoader('premier_league').data_dir / '2024-2025_all_teams.csv', tmp)
+        loader = DataLoader('premier_league', data_format='csv')
+        loader.data_dir = Path(tmp)
+
+        validations = []
+        original = loader._validate_dataframe
+        loader._validate_dataframe = lambda df, season: validations.append(season) or original(df, season)
+
+        first = loader.load_season('2024-2025')
+        first['goals_for'] = -1  # callers get copies
+        second = loader.load_season('2024-2025')
+        assert (second['goals_for'] >= 0).all()
+        assert len(validations) == 1
+
+        query = dict(columns=['date', 'goals_for'], teams=['Arsenal'], start_date='2025-01-01')
+        cached = loader.load_season('2024-2025', **query)
+        DataLoader.clear_cache()
+        cold = loader.load_season('2024-2025', **query)
+        pd.testing.assert_frame_equal(cached, cold)
+
+        # Edited file: new fingerprint, re-read and re-validated
+        loader.load_season('2024-2025')
+        csv_path = Path(tmp) / '2024-2025_all_teams.csv'
+        pd.read_csv(csv_path).iloc[:-2].to_csv(csv_path, index=False)
+        os.utime(csv_path, ns=(csv_path.stat().st_mtime_ns + 10**9,) * 2)
+
+        validations.clear()
+        assert len(loader.load_season('2024-2025')) == len(second) - 2
+        assert len(validations) == 1
+        assert sum(key[0] == str(csv_path) for key in DataLoader._season_cache) == 1
+
+    DataLoader.clear_cache()
+    print("Seasons are memoized per file version")
+
+
+if __name__ == "__main__":
+    test_memoized_seasons()
@@ -0,0 +1,166 @@
+"""
+Test script for DatabaseService
+Pooled WAL connections, batch saves, concurrent writers and retry while locked
+"""
+import io
+import sys
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import save_prediction_to_db
+from services import database_service
+from services.database_service import DatabaseService
+
+SCHEMA_DB = Path(__file__).parent / 'database' / 'predictions.db'
+
+
+def make_database(path: Path) -> DatabaseService:
+    """Empty database with the schema of database/predictions.db"""
+    source = sqlite3.connect(f"file:{SCHEMA_DB}?mode=ro", uri=True)
+    schema = [sql for (sql,) in source.execute(
+        "SELECT sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'")]
+    source.close()
+
+    conn = sqlite3.connect(path)
+    for sql in schema:
+        conn.execute(sql)
+    conn.commit()
+    conn.close()
+    return DatabaseService(path)
+
+
+def prediction(home: str, away: str, match_date: str = '2025-10-04') -> dict:
+    return {
+        'home_team': home, 'away_team': away, 'match_date': match_date,
+        'predictions': {'match_result': {
+            'prediction': 'Home Win', 'certainty': 61.0,
+            'probabilities': {'home_win': 0.61, 'draw': 0.22, 'away_win': 0.17}}}
+    }
+
+
+def test_pooled_wal_connection():
+    """One tuned connection per thread, reused across calls; saves are readable"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_database(Path(tmp) / 'predictions.db')
+
+        conn = db._get_connection()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+        assert db.save_prediction(prediction('Arsenal', 'Chelsea'))
+        assert db.save_actual_result({
+            'match_id': 'Arsenal_Chelsea_2025-10-04', 'home_team': 'Arsenal',
+            'away_team': 'Chelsea', 'actual_result': 'Home Win', 'goals_home': 2,
+            'goals_away': 0, 'total_goals': 2, 'btts_actual': 'No',
+            'match_date': '2025-10-04'})
+        assert db._get_connection() is conn
+        assert DatabaseService(db.db_path)._get_connection() is conn
+
+        rows = db.get_predictions_with_results()
+        assert len(rows) == 1 and rows[0]['is_matched'] == 1 and rows[0]['prob_home'] == 0.61
+
+        db.close()
+        assert db._get_connection() is not conn
+        db.close()
+
+    print("Pooled WAL connection reused across calls")
+
+
+def test_batch_saves():
+    """A matchweek in one executemany transaction; a bad row leaves nothing behind"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_database(Path(tmp) / 'predictions.db')
+        week = [prediction(f'Home {i}', f'Away {i}') for i in range(10)]
+
+        assert db.save_predictions(week) == 10
+        assert db.save_actual_results([{
+            'match_id': f'Home {i}_Away {i}_2025-10-04', 'home_team': f'Home {i}',
+            'away_team': f'Away {i}', 'actual_result': 'Draw', 'goals_home': 1,
+            'goals_away': 1, 'total_goals': 2, 'btts_actual': 'Yes',
+            'match_date': '2025-10-04'} for i in range(4)]) == 4
+        assert len(db.get_predictions_with_results()) == 4
+
+        bad = [prediction('Leeds United', 'Wolves'), prediction('Sunderland', 'Burnley')]
+        bad[1]['predictions']['match_result']['certainty'] = {'not': 'bindable'}
+        assert db.save_predictions(bad) == 0
+        assert db._query("SELECT COUNT(*) AS n FROM predictions")[0]['n'] == 10
+        assert db.save_predictions([]) == 0
+        db.close()
+
+    ndjson = io.StringIO(json.dumps(week[0]) + '\n\n' + json.dumps(week[1]) + '\n')
+    assert save_prediction_to_db.read_ndjson(ndjson) == week[:2]
+    try:
+        save_prediction_to_db.read_ndjson(io.StringIO('{"home_team": \n'))
+        assert False, "invalid line accepted"
+    except ValueError as e:
+        assert 'line 1' in str(e)
+
+    print("Batch saves are all-or-nothing")
+
+
+def test_concurrent_writers():
+    """Threads write through their own connections without 'database is locked'"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_database(Path(tmp) / 'predictions.db')
+        results = []
+
+        def save(thread_id):
+            service = DatabaseService(db.db_path)
+            for i in range(20):
+                results.append(service.save_prediction(
+                    prediction(f'Home {thread_id}', f'Away {i}')))
+                service.get_unmatched_predictions()
+            service.close()
+
+        threads = [threading.Thread(target=save, args=(t,)) for t in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(results) == 80 and all(results)
+        assert db._query("SELECT COUNT(*) AS n FROM predictions")[0]['n'] == 80
+        db.close()
+
+    print("80 concurrent saves from 4 threads")
+
+
+def test_retry_while_locked():
+    """A save outlasting the busy timeout is retried until the lock is released"""
+    timeout = database_service.DB_BUSY_TIMEOUT
+    database_service.DB_BUSY_TIMEOUT = 0.05
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = make_database(Path(tmp) / 'predictions.db')
+            db._get_connection()
+
+            blocker = sqlite3.connect(db.db_path, isolation_level=None, check_same_thread=False)
+            blocker.execute("BEGIN IMMEDIATE")
+            release = threading.Timer(0.3, blocker.commit)
+            release.start()
+
+            started = time.perf_counter()
+            assert db.save_prediction(prediction('Everton', 'Fulham'))
+            assert time.perf_counter() - started >= 0.25
+            release.join()
+            blocker.close()
+            db.close()
+    finally:
+        database_service.DB_BUSY_TIMEOUT = timeout
+
+    print("Save retried until the competing write lock was released")
+
+
+if __name__ == "__main__":
+    test_pooled_wal_connection()
+    test_batch_saves()
+    test_concurrent_writers()
+    test_retry_while_locked()
@@ -0,0 +1,57 @@
+"""
+Test script for EnsembleModel
+Weighted member probabilities, N members, and weight validation
+"""
+import sys
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+from services.ensemble_model import EnsembleModel
+
+
+def test_weighted_members():
+    """Probabilities are the normalized weighted sum of member probabilities"""
+    rng = np.random.default_rng(5)
+    X = rng.normal(size=(300, 6))
+    y = rng.integers(0, 3, size=300)
+
+    members = {
+        'randomforest': RandomForestClassifier(
+            n_estimators=20, max_depth=5, random_state=42).fit(X, y),
+        'logistic': LogisticRegression(max_iter=500).fit(X, y),
+        'shallow': RandomForestClassifier(
+            n_estimators=5, max_depth=2, random_state=1).fit(X, y)
+    }
+    weights = {'randomforest': 3.0, 'logistic': 1.0, 'shallow': 1.0}
+
+    model = EnsembleModel(members, weights)
+    expected = sum(weights[name] / 5.0 * member.predict_proba(X[:40])
+                   for name, member in members.items())
+
+    np.testing.assert_allclose(model.predict_proba(X[:40]), expected, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(model.predict_proba(X[:40]).sum(axis=1), 1.0)
+    np.testing.assert_array_equal(model.predict(X[:40]), np.argmax(expected, axis=1))
+
+    # Weights only for members that are present; extra weights are ignored
+    single = EnsembleModel({'logistic': members['logistic']}, weights)
+    np.testing.assert_allclose(
+        single.predict_proba(X[:5]), members['logistic'].predict_proba(X[:5]))
+
+    for bad_weights in [{'randomforest': 1.0}, {**weights, 'shallow': 0.0}]:
+        try:
+            EnsembleModel(members, bad_weights)
+            assert False, "missing weight should raise"
+        except ValueError:
+            pass
+
+    print("EnsembleModel weights members correctly")
+
+
+if __name__ == "__main__":
+    test_weighted_members()
@@ -0,0 +1,72 @@
+"""
+Test script for FeatureSelector
+Blocked correlation pruning matches the plain greedy filter; unused features are dropped
+"""
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+
+from services.feature_selector import FeatureSelector
+
+
+def test_correlation_pruning():
+    """Same kept set for any block size as the one-column-at-a-time greedy filter"""
+    rng = np.random.default_rng(8)
+    base = rng.normal(size=(500, 12))
+    X = np.hstack([
+        base,
+        base[:, :5] * 2 + 0.01 * rng.normal(size=(500, 5)),   # near-duplicates
+        np.ones((500, 1)),                                    # constant
+        base[:, 5:9] + rng.normal(size=(500, 4))              # correlated, below threshold
+    ])
+    columns = [f'f{i}' for i in range(X.shape[1])]
+
+    corr = np.abs(np.corrcoef(X[:, np.std(X, axis=0) > 0], rowvar=False))
+    variable = [j for j in range(X.shape[1]) if np.std(X[:, j]) > 0]
+    expected = []
+    for position, j in enumerate(variable):
+        if not any(corr[variable.index(k), position] > 0.95 for k in expected):
+            expected.append(j)
+
+    for block_size in [1, 4, 7, 64]:
+        selection = FeatureSelector(
+            importance_threshold=None, block_size=block_size).select(X, {}, columns)
+        assert selection['index'] == expected, block_size
+
+    assert selection['dropped']['constant'] == ['f17']
+    assert selection['dropped']['correlated'] == {f'f{12 + i}': f'f{i}' for i in range(5)}
+
+    print(f"Kept {len(expected)} of {len(columns)} features")
+
+
+def test_importance_pass():
+    """A feature no booster splits on is dropped; the selection round-trips as JSON"""
+    rng = np.random.default_rng(3)
+    X = rng.normal(size=(400, 4))
+    X[:, 3] = 0.0
+    X[:3, 3] = 1.0  # non-constant but never useful
+    targets = {'goals/over_2_5': (X[:, 0] + X[:, 1] > 0).astype(int),
+               'match_result': np.digitize(X[:, 2], [-0.5, 0.5])}
+
+    selector = FeatureSelector(importance_threshold=0.0, n_jobs=1)
+    selection = selector.select(X, targets, ['a', 'b', 'c', 'unused'])
+    assert selection['features'] == ['a', 'b', 'c']
+    assert selection['dropped']['low_importance'] == ['unused']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        selector.save(selection, Path(tmp) / 'feature_selection.json')
+        with open(Path(tmp) / 'feature_selection.json') as f:
+            assert json.load(f)['features'] == ['a', 'b', 'c']
+
+    print("Importance pass drops unused features")
+
+
+if __name__ == "__main__":
+    test_correlation_pruning()
+    test_importance_pass()
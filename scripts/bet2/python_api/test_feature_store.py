@@ -0,0 +1,123 @@
+"""
+Test script for the incremental FeatureStore
+Appending matches updates the store to exactly what a full rebuild produces;
+a feature code change rebuilds it
+"""
+import sys
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pandas as pd
+
+import services.feature_store as feature_store
+from services.data_loader import DataLoader
+from services.feature_engineering import FeatureEngineer
+from services.feature_store import FeatureStore
+
+CUTOFF = '2025-09-27'  # the copied season stops before its last matchweeks
+
+
+def test_incremental_equals_rebuild():
+    """New rows (both sides of each fixture) get the features of a full generate_features"""
+    source = DataLoader('premier_league').data_dir
+    DataLoader.clear_cache()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp) / 'data'
+        data_dir.mkdir()
+        shutil.copy(source / '2024-2025_all_teams.csv', data_dir)
+        season_csv = data_dir / '2025-2026_all_teams.csv'
+        full_season = pd.read_csv(source / '2025-2026_all_teams.csv')
+        full_season[full_season['date'] < CUTOFF].to_csv(season_csv, index=False)
+
+        loader = DataLoader('premier_league', data_format='csv')
+        loader.data_dir = data_dir
+        engineer = FeatureEngineer()
+        store = FeatureStore(loader, engineer, store_dir=Path(tmp) / 'features')
+
+        before = store.load_features()
+        assert store.get_high_water_mark() < pd.Timestamp(CUTOFF)
+
+        # Scraper appends the last matchweeks
+        full_season.to_csv(season_csv, index=False)
+        os.utime(season_csv, ns=(season_csv.stat().st_mtime_ns + 10**9,) * 2)
+
+        incremental_calls = []
+        original = engineer.generate_features_incremental
+        engineer.generate_features_incremental = \
+            lambda stored, new_df: incremental_calls.append(len(new_df)) or original(stored, new_df)
+
+        updated = store.load_features()
+        new_rows = int((full_season['date'] >= CUTOFF).sum())
+        assert incremental_calls == [new_rows]
+        assert len(updated) == len(before) + new_rows
+
+        expected = FeatureEngineer().generate_features(
+            loader.load_multiple_seasons(loader.get_available_seasons()))
+        expected = expected.sort_values(['team_name', 'date']).reset_index(drop=True)
+        pd.testing.assert_frame_equal(updated[expected.columns], expected,
+                                      check_dtype=False, check_exact=False, rtol=1e-9)
+
+        # Touched fixtures: each new team row and its mirror (the opponent's row)
+        new = updated[updated['date'] >= CUTOFF]
+        mirrors = new.merge(new, left_on=['team_name', 'opponent', 'date'],
+                            right_on=['opponent', 'team_name', 'date'], suffixes=('', '_mirror'))
+        assert len(mirrors) == len(new)
+        opponent_columns = [c for c in engineer.get_feature_names() if c.startswith('opp_')]
+        assert opponent_columns
+        for column in opponent_columns:
+            expected_new = expected.loc[expected['date'] >= CUTOFF, column].to_numpy()
+            pd.testing.assert_series_equal(
+                new[column].reset_index(drop=True), pd.Series(expected_new, name=column),
+                check_dtype=False)
+
+        # The persisted store reads back the same rows
+        reread = FeatureStore(loader, FeatureEngineer(), store_dir=Path(tmp) / 'features')
+        pd.testing.assert_frame_equal(reread.load_features(), updated)
+
+    DataLoader.clear_cache()
+    print(f"{new_rows} appended rows match a full rebuild")
+
+
+def test_code_change_rebuilds():
+    """Stored features built by other feature code (e.g. rolling_engine.py) are not reused"""
+    source = DataLoader('premier_league').data_dir
+    DataLoader.clear_cache()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp) / 'data'
+        data_dir.mkdir()
+        shutil.copy(source / '2025-2026_all_teams.csv', data_dir)
+
+        loader = DataLoader('premier_league', data_format='csv')
+        loader.data_dir = data_dir
+
+        def load(engineer):
+            builds = []
+            original = engineer.generate_features
+            engineer.generate_features = lambda df: builds.append(len(df)) or original(df)
+            FeatureStore(loader, engineer, store_dir=Path(tmp) / 'features').load_features()
+            return builds
+
+        assert len(load(FeatureEngineer())) == 1
+        assert load(FeatureEngineer()) == []
+
+        original_hash = feature_store.feature_code_hash
+        feature_store.feature_code_hash = lambda: 'edited rolling_engine.py'
+        try:
+            assert len(load(FeatureEngineer())) == 1
+        finally:
+            feature_store.feature_code_hash = original_hash
+
+    DataLoader.clear_cache()
+    print("Feature code changes rebuild the store")
+
+
+if __name__ == "__main__":
+    test_incremental_equals_rebuild()
+    test_code_change_rebuilds()
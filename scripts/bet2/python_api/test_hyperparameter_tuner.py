@@ -0,0 +1,98 @@
+"""
+Test script for HyperparameterTuner
+Candidate sampling, time-series folds, trial scoring, params versions
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+from sklearn.metrics import log_loss
+
+import services.hyperparameter_tuner as hyperparameter_tuner
+import services.training_orchestrator as training_orchestrator
+from services.hyperparameter_tuner import HyperparameterTuner, evaluate_trial, _log_loss
+from services.training_orchestrator import model_params, load_tuned_params
+
+
+def test_candidates_and_folds():
+    """Current params come first; sampling is deterministic; folds expand forward"""
+    tuner = HyperparameterTuner(n_candidates=6, n_folds=3)
+    base = model_params('goals', 'goals', 'xgboost')
+
+    candidates = tuner._sample('xgboost', base, 'goals/over_2_5')
+    assert candidates[0] == base
+    assert len(candidates) == 6
+    assert candidates == tuner._sample('xgboost', base, 'goals/over_2_5')
+    assert all(candidate['objective'] == 'binary:logistic' for candidate in candidates)
+
+    folds = tuner._time_series_folds(400)
+    assert [fold['train_end'] for fold in folds] == [100, 200, 300]
+    assert all(fold['val_end'] == fold['train_end'] + 100 for fold in folds)
+
+
+def test_evaluate_trial():
+    """Early-stopped XGBoost trial reports its rounds; log-loss matches sklearn"""
+    rng = np.random.default_rng(4)
+    X = rng.normal(size=(400, 6))
+    y = (X[:, 0] + 0.5 * rng.normal(size=400) > 0).astype(int)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        np.save(Path(tmp) / 'X.npy', X)
+        outcome = evaluate_trial({
+            'algorithm': 'xgboost',
+            'params': model_params('goals', 'goals', 'xgboost'),
+            'budget': 300,
+            'y': y,
+            'folds': HyperparameterTuner(n_folds=2)._time_series_folds(len(X)),
+            'threads': 1
+        }, Path(tmp) / 'X.npy')
+
+    assert 0 < outcome['score'] < np.log(2)
+    assert 1 <= outcome['n_estimators'] <= 300
+
+    p = rng.dirichlet([1, 1, 1], size=50)
+    y3 = rng.integers(0, 3, size=50)
+    assert np.isclose(_log_loss(y3, p, np.array([0, 1, 2])), log_loss(y3, p))
+
+    print("Tuner trials score correctly")
+
+
+def study(label: str, algorithm: str, max_depth: int) -> dict:
+    best = {'params': {'max_depth': max_depth, 'n_jobs': 4}, 'score': 0.9}
+    if algorithm == 'xgboost':
+        best['n_estimators'] = 120
+    return {'label': label, 'algorithm': algorithm, 'best': best, 'baseline': {'score': 1.0}}
+
+
+def test_partial_run_keeps_other_markets():
+    """Tuning one group (tune.py --groups cards) keeps the other groups' params"""
+    original = hyperparameter_tuner.params_dir, training_orchestrator.params_dir
+
+    with tempfile.TemporaryDirectory() as tmp:
+        hyperparameter_tuner.params_dir = training_orchestrator.params_dir = lambda c: Path(tmp)
+        try:
+            tuner = HyperparameterTuner()
+            tuner._write([study('match_result', 'xgboost', 4), study('goals/over_2_5', 'randomforest', 8),
+                          study('cards/over_3_5', 'xgboost', 3)], 'f', 'd')
+            tuner._write([study('cards/over_3_5', 'xgboost', 6)], 'f', 'd')
+            params = load_tuned_params('premier_league')
+        finally:
+            hyperparameter_tuner.params_dir, training_orchestrator.params_dir = original
+
+    assert params == {
+        'match_result': {'xgboost': {'max_depth': 4, 'n_estimators': 120}},
+        'goals/over_2_5': {'randomforest': {'max_depth': 8}},
+        'cards/over_3_5': {'xgboost': {'max_depth': 6, 'n_estimators': 120}}
+    }
+
+    print("Partial tuning runs keep the other markets' params")
+
+
+if __name__ == "__main__":
+    test_candidates_and_folds()
+    test_evaluate_trial()
+    test_partial_run_keeps_other_markets()
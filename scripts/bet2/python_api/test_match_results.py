@@ -0,0 +1,83 @@
+"""
+Test script for match_results.py
+One merge resolves every prediction to the same outcome as the per-prediction scan
+"""
+import sys
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pandas as pd
+
+from match_results import season_of, load_matches, resolve_outcomes
+from services.data_loader import DataLoader
+
+
+def scan_outcome(prediction: dict, matches: pd.DataFrame):
+    """Reference: the row-by-row lookup the matcher used to do per prediction"""
+    date = pd.Timestamp(prediction['match_date'])
+    home = matches[(matches['team_name'] == prediction['home_team']) &
+                   (matches['opponent'] == prediction['away_team']) & (matches['date'] == date)]
+    if home.empty:
+        return None
+    away = matches[(matches['team_name'] == prediction['away_team']) &
+                   (matches['opponent'] == prediction['home_team']) & (matches['date'] == date)]
+
+    row = home.iloc[0]
+    goals = int(row['goals_for']) + int(row['goals_against'])
+    cards = int(row['cards']) + (int(away.iloc[0]['cards']) if not away.empty else 0)
+    return {
+        'actual_result': {'W': 'Home Win', 'D': 'Draw'}.get(row['result'], 'Away Win'),
+        'actual_goals': goals,
+        'actual_cards': cards,
+        'correct_goals_25': int((prediction['prediction_goals_25'] == 'Over' and goals > 2.5) or
+                                (prediction['prediction_goals_25'] == 'Under' and goals <= 2.5)),
+        'correct_cards_45': int((prediction['prediction_cards_45'] == 'Over' and cards > 4.5) or
+                                (prediction['prediction_cards_45'] == 'Under' and cards <= 4.5))
+    }
+
+
+def test_resolve_outcomes():
+    """Merged outcomes equal the per-prediction lookup; unknown fixtures are not found"""
+    loader = DataLoader('premier_league')
+    errors = []
+    matches = load_matches(loader, ['2024-2025', '2025-2026', '1999-2000'], errors)
+    assert errors == ["CSV file not found for 1999-2000"]
+
+    home_rows = matches[matches.index % 7 == 0].head(120)
+    predictions = pd.DataFrame({
+        'id': range(len(home_rows)),
+        'home_team': home_rows['team_name'].values,
+        'away_team': home_rows['opponent'].values,
+        'match_date': home_rows['date'].dt.strftime('%Y-%m-%d').values,
+        'prediction_1x2': 'Draw',
+        'prediction_btts': 'Yes',
+        'prediction_goals_25': ['Over', 'Under', None] * 40,
+        'prediction_cards_45': ['Under', None, 'Over'] * 40
+    })
+    for column in ['prediction_goals_05', 'prediction_goals_15', 'prediction_goals_35',
+                   'prediction_cards_25', 'prediction_cards_35']:
+        predictions[column] = 'Over'
+    predictions.loc[len(predictions)] = dict(
+        predictions.iloc[0], id=len(predictions), away_team='Nobody')
+
+    df = resolve_outcomes(predictions, matches)
+    assert list(df['id']) == list(predictions['id'])
+    assert df['found'].sum() == len(predictions) - 1 and not df['found'].iloc[-1]
+
+    for prediction, (_, row) in zip(predictions.to_dict('records')[:-1], df.iterrows()):
+        expected = scan_outcome(prediction, matches)
+        assert {key: row[key] for key in expected} == expected, prediction
+
+    print(f"{df['found'].sum()} predictions resolved in one merge")
+
+
+def test_season_of():
+    assert season_of(pd.Timestamp('2025-03-01')) == '2024-2025'
+    assert season_of(pd.Timestamp('2025-08-16')) == '2025-2026'
+
+
+if __name__ == "__main__":
+    test_resolve_outcomes()
+    test_season_of()
@@ -0,0 +1,137 @@
+"""
+Test script for MatrixCache
+Cached matrix matches the feature frame, reloads memory-mapped, is
+invalidated by data and feature-code changes, and keeps other runs' column
+subsets
+"""
+import sys
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+
+import services.feature_engineering as feature_engineering
+import services.matrix_cache as matrix_cache
+from services.data_loader import DataLoader
+from services.feature_engineering import FeatureEngineer
+from services.feature_store import FeatureStore
+from services.matrix_cache import MatrixCache
+
+
+def test_cached_matrix():
+    """float32 matrix and row frame match the feature store; second load is a memmap hit"""
+    loader = DataLoader('premier_league')
+    engineer = FeatureEngineer(rolling_windows=[3, 5, 10])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        matrix = MatrixCache(loader, engineer, cache_dir=tmp).load(min_match_number=5)
+
+        df = FeatureStore(loader, FeatureEngineer(rolling_windows=[3, 5, 10])).load_features()
+        df = df.sort_values('date').reset_index(drop=True)
+        df = df[df['match_number'] >= 5].reset_index(drop=True)
+
+        assert matrix['X'].dtype == np.float32
+        assert matrix['columns'] == engineer.get_model_feature_names()
+        np.testing.assert_array_equal(
+            matrix['X'], df[matrix['columns']].to_numpy(dtype=np.float32))
+        assert (matrix['rows']['team_name'].values == df['team_name'].values).all()
+        assert 'result_encoded' in matrix['rows'] and 'match_total_cards' in matrix['rows']
+
+        reloaded = MatrixCache(loader, FeatureEngineer(rolling_windows=[3, 5, 10]),
+                               cache_dir=tmp).load(min_match_number=5)
+        assert isinstance(reloaded['X'], np.memmap)
+        assert reloaded['path'] == matrix['path']
+
+    print(f"Cached matrix {matrix['X'].shape} matches the feature store")
+
+
+def test_key_invalidation():
+    """Key changes with CSV contents, feature version and code, windows and row view"""
+    loader = DataLoader('premier_league')
+    engineer = FeatureEngineer(rolling_windows=[3, 5, 10])
+    view = {'min_match_number': 5}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for csv in loader.data_dir.glob('*_all_teams.csv'):
+            shutil.copy(csv, tmp)
+        loader.data_dir = Path(tmp)
+        cache = MatrixCache(loader, engineer, cache_dir=tmp)
+        key = cache.cache_key(view)
+
+        # Same contents, new mtime: still a hit
+        csv = sorted(Path(tmp).glob('*_all_teams.csv'))[-1]
+        csv.write_bytes(csv.read_bytes())
+        assert cache.cache_key(view) == key
+
+        assert cache.cache_key({'min_match_number': 0}) != key
+
+        engineer.VERSION = 'test'
+        assert cache.cache_key(view) != key
+        engineer.VERSION = FeatureEngineer.VERSION
+
+        matrix_cache.feature_code_hash = lambda: 'edited rolling_engine.py'
+        try:
+            assert cache.cache_key(view) != key
+        finally:
+            matrix_cache.feature_code_hash = feature_engineering.feature_code_hash
+
+        engineer.rolling_windows = [3, 5]
+        assert cache.cache_key(view) != key
+        engineer.rolling_windows = [3, 5, 10]
+
+        with open(csv, 'a') as f:
+            f.write('\n')
+        assert cache.cache_key(view) != key
+
+    print("Cache key follows data and feature code")
+
+
+def test_selections_coexist():
+    """Caching one feature selection keeps the other recently used ones (and the full matrix)"""
+    loader = DataLoader('premier_league')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = MatrixCache(loader, FeatureEngineer(rolling_windows=[3, 5, 10]),
+                            cache_dir=tmp, max_selections=2)
+        full = cache.load(min_match_number=5)
+        subsets = [full['columns'][:20], full['columns'][10:40], full['columns'][::7]]
+
+        first = cache.load(min_match_number=5, columns=subsets[0])
+        second = cache.load(min_match_number=5, columns=subsets[1])
+        # A run still training from the first selection can read it
+        assert np.load(first['path'], mmap_mode='r').shape == (len(full['X']), 20)
+        assert full['path'].exists()
+
+        first = cache.load(min_match_number=5, columns=subsets[0])  # used again
+        time.sleep(0.01)
+        cache.load(min_match_number=5, columns=subsets[2])
+        assert first['path'].exists() and full['path'].exists()
+        assert not second['path'].exists()  # least recently used beyond max_selections
+
+        np.testing.assert_array_equal(
+            cache.load(min_match_number=5, columns=subsets[0])['X'],
+            full['X'][:, :20])
+
+    print("Feature selections of concurrent runs keep their cache entries")
+
+
+def test_code_hash_covers_feature_modules():
+    """Every services module feature_engineering builds on is part of the code hash"""
+    used = {getattr(value, '__module__', None) for value in vars(feature_engineering).values()}
+    modules = {module.split('.')[-1] + '.py' for module in used
+               if module and module.startswith('services.')}
+    assert modules == set(feature_engineering.FEATURE_CODE_MODULES)
+
+    print(f"Code hash covers {sorted(modules)}")
+
+
+if __name__ == "__main__":
+    test_cached_matrix()
+    test_key_invalidation()
+    test_selections_coexist()
+    test_code_hash_covers_feature_modules()
@@ -0,0 +1,99 @@
+"""
+Test script for MetadataIndex
+Index matches the DataLoader, follows file changes and never imports pandas
+"""
+import sys
+import json
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import DATA_DIR
+from services.data_loader import DataLoader
+from services.metadata_index import MetadataIndex
+
+
+def test_index_matches_loader():
+    """Teams, row counts and date ranges agree with the loaded seasons"""
+    loader = DataLoader('premier_league')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = MetadataIndex(index_path=Path(tmp) / 'metadata_index.json')
+        assert index.seasons('premier_league') == loader.get_available_seasons()
+
+        for season in loader.get_available_seasons():
+            summary = loader.get_data_summary(season)
+            info = index.season_info('premier_league', season)
+            assert index.teams('premier_league', season) == loader.get_team_list(season)
+            assert info['rows'] == summary['total_rows']
+            assert (info['start'], info['end']) == (
+                summary['date_range']['start'], summary['date_range']['end'])
+
+        competitions = index.competitions()
+        assert [c['id'] for c in competitions] == ['premier_league']
+        assert competitions[0]['seasons'] == loader.get_available_seasons()
+        assert (Path(tmp) / 'metadata_index.json').exists()
+
+    print(f"Index matches DataLoader for {len(loader.get_available_seasons())} seasons")
+
+
+def test_stale_entries_rebuilt():
+    """A changed season file is re-indexed; a removed one disappears"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        shutil.copy(DATA_DIR / 'competitions.csv', data_dir)
+        (data_dir / 'premier_league').mkdir()
+        csv = data_dir / 'premier_league' / '2025-2026_all_teams.csv'
+        shutil.copy(DATA_DIR / 'premier_league' / csv.name, csv)
+
+        index = MetadataIndex(data_dir=data_dir)
+        rows = index.season_info('premier_league', '2025-2026')['rows']
+        teams = index.teams('premier_league', '2025-2026')
+
+        lines = csv.read_text().splitlines()
+        csv.write_text('\n'.join(
+            [lines[0]] + [line for line in lines[1:] if not line.startswith('Arsenal,')]) + '\n')
+
+        # A fresh reader (next PHP request) sees the stored index is stale
+        index = MetadataIndex(data_dir=data_dir)
+        assert index.teams('premier_league', '2025-2026') == [t for t in teams if t != 'Arsenal']
+        assert index.season_info('premier_league', '2025-2026')['rows'] < rows
+
+        with open(data_dir / 'metadata_index.json') as f:
+            stored = json.load(f)
+        assert 'Arsenal' not in stored['seasons']['premier_league']['2025-2026']['teams']
+
+        csv.unlink()
+        assert MetadataIndex(data_dir=data_dir).competitions()[0]['seasons'] == []
+
+    print("Stale entries are rebuilt from the changed files")
+
+
+def test_scripts_skip_pandas():
+    """get_teams.py / get_competitions.py answer from the index without pandas"""
+    script_dir = Path(__file__).parent
+    code = (
+        "import sys, runpy; sys.argv = ['get_teams.py', 'premier_league', '2025-2026']; "
+        "runpy.run_path('get_teams.py', run_name='__main__'); "
+        "runpy.run_path('get_competitions.py', run_name='__main__'); "
+        "print('pandas' in sys.modules)"
+    )
+    output = subprocess.run([sys.executable, '-c', code], cwd=script_dir,
+                            capture_output=True, text=True, check=True).stdout.splitlines()
+
+    teams, competitions, pandas_loaded = json.loads(output[0]), json.loads(output[1]), output[2]
+    assert teams['success'] and teams['teams'][0] == {'id': 'arsenal', 'name': 'Arsenal'}
+    assert competitions['success'] and competitions['competitions'][0]['id'] == 'premier_league'
+    assert pandas_loaded == 'False'
+
+    print(f"Scripts returned {len(teams['teams'])} teams without importing pandas")
+
+
+if __name__ == "__main__":
+    test_index_matches_loader()
+    test_stale_entries_rebuilt()
+    test_scripts_skip_pandas()
@@ -0,0 +1,205 @@
+"""
+Test script for MetricsTracker
+One pass scores every market and model; incremental updates equal a full rebuild
+"""
+import sys
+import sqlite3
+import tempfile
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import brier_score_loss, f1_score, roc_auc_score, precision_score, recall_score
+
+from database.init_db import migrate
+from services.database_service import DatabaseService
+from services.metrics_tracker import MetricsTracker, BINARY_MARKETS, MATCH_RESULT_LABELS
+
+
+def populate(db_path: Path, n: int = 400, seed: int = 7):
+    """Predictions of two models; probabilities on the 0.001 grid of the AUC histograms"""
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(db_path)
+
+    for i in range(n):
+        home = rng.dirichlet([4, 3, 3]).round(3)
+        row = {
+            'match_id': f'm{i}', 'home_team': f'Home {i}', 'away_team': f'Away {i}',
+            'model_type': ['ensemble', 'xgboost'][i % 2], 'match_date': '2025-10-04',
+            'prediction_1x2': MATCH_RESULT_LABELS[int(home.argmax())],
+            'prob_home': home[0], 'prob_draw': home[1], 'prob_away': home[2]
+        }
+        for _, _, prediction, probability, _, _ in BINARY_MARKETS:
+            if rng.random() < 0.1:
+                continue  # market not predicted
+            p = round(float(rng.random()), 3)
+            row[probability] = p
+            row[prediction] = ('Yes' if p > 0.5 else 'No') if prediction == 'prediction_btts' \
+                else ('Over' if p > 0.5 else 'Under')
+
+        columns = ', '.join(row)
+        conn.execute(f"INSERT INTO predictions ({columns}) VALUES ({', '.join('?' * len(row))})",
+                     [float(v) if isinstance(v, np.floating) else v for v in row.values()])
+
+    conn.commit()
+    conn.close()
+
+
+def match(db: DatabaseService, ids: range, seed: int = 11):
+    """Outcomes for the predictions: even ids via actual_results, odd ones on the row"""
+    rng = np.random.default_rng(seed)
+    results = []
+    for i in ids:
+        goals_home, goals_away = rng.poisson(1.5), rng.poisson(1.2)
+        actual = 'Home Win' if goals_home > goals_away else (
+            'Away Win' if goals_away > goals_home else 'Draw')
+        cards = int(rng.poisson(4))
+        if i % 2 == 0:
+            results.append({
+                'match_id': f'm{i}', 'home_team': f'Home {i}', 'away_team': f'Away {i}',
+                'actual_result': actual, 'goals_home': int(goals_home), 'goals_away': int(goals_away),
+                'total_goals': int(goals_home + goals_away),
+                'btts_actual': 'Yes' if goals_home and goals_away else 'No',
+                'total_cards': cards, 'match_date': '2025-10-04'})
+        else:
+            db._write([("""
+                UPDATE predictions SET is_matched = 1, actual_result = ?, actual_goals = ?,
+                       actual_btts = ?, actual_cards = ?
+                WHERE match_id = ?
+            """, [(actual, int(goals_home + goals_away), int(bool(goals_home and goals_away)),
+                   cards, f'm{i}')])])
+    db.save_actual_results(results)
+
+
+def expected_metrics(db: DatabaseService) -> dict:
+    """Reference: sklearn per market and model over all matched predictions"""
+    df = pd.DataFrame(db.get_matched_outcomes(unfolded_only=False))
+    expected = {}
+    for model_type, group in df.groupby('model_type'):
+        probabilities = group[['prob_home', 'prob_draw', 'prob_away']].to_numpy()
+        actual = group['actual_result'].map(MATCH_RESULT_LABELS.index).to_numpy()
+        predicted = group['prediction_1x2'].map(MATCH_RESULT_LABELS.index).to_numpy()
+        expected[('1X2', model_type)] = {
+            'total_predictions': len(group),
+            'correct_predictions': int((actual == predicted).sum()),
+            'brier_score': np.mean([brier_score_loss(actual == k, probabilities[:, k])
+                                    for k in range(3)]),
+            'f1_score': f1_score(actual, predicted, average='macro')
+        }
+
+        for market, _, prediction, probability, outcome, line in BINARY_MARKETS:
+            valid = group[group[prediction].notna()]
+            y_true = (valid[outcome] > line).astype(int)
+            y_pred = valid[prediction].isin(['Over', 'Yes']).astype(int)
+            expected[(market, model_type)] = {
+                'total_predictions': len(valid),
+                'correct_predictions': int((y_true == y_pred).sum()),
+                'brier_score': brier_score_loss(y_true, valid[probability]),
+                'roc_auc': roc_auc_score(y_true, valid[probability]),
+                'precision_score': precision_score(y_true, y_pred, zero_division=0),
+                'recall_score': recall_score(y_true, y_pred, zero_division=0)
+            }
+    return expected
+
+
+def stored_metrics(db: DatabaseService) -> dict:
+    rows = db._query("SELECT * FROM accuracy_metrics")
+    return {(row['market'], row['model_type']): row for row in rows}
+
+
+def test_metrics_match_sklearn():
+    """Every market and model in one update, equal to sklearn on the full history"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'predictions.db'
+        migrate(db_path)
+        populate(db_path)
+        db = DatabaseService(db_path)
+        match(db, range(400))
+
+        result = MetricsTracker(db).update()
+        assert result['success'] and result['folded'] == 400
+
+        stored = stored_metrics(db)
+        expected = expected_metrics(db)
+        assert len(stored) == len(expected) == 18
+        for key, values in expected.items():
+            for name, value in values.items():
+                assert abs(stored[key][name] - value) < 1e-9, (key, name, stored[key][name], value)
+
+        performance = {row['market']: row for row in db.get_market_rankings()}
+        assert performance['1X2']['total_predictions'] == 400
+        db.close()
+
+    print(f"{len(expected)} (market, model) metrics equal sklearn's")
+
+
+def test_incremental_equals_rebuild():
+    """Folding in matchweeks one by one gives the rebuild's metrics, without duplicate rows"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'predictions.db'
+        migrate(db_path)
+        populate(db_path, n=300)
+        db = DatabaseService(db_path)
+        tracker = MetricsTracker(db)
+
+        assert tracker.update() == {'success': True, 'folded': 0, 'metrics': [], 'performance': []}
+        for week in range(3):
+            match(db, range(week * 100, week * 100 + 100), seed=week)
+            assert tracker.update()['folded'] == 100
+        assert tracker.update()['folded'] == 0
+
+        incremental = stored_metrics(db)
+        summary = tracker.summary()
+        assert len(db._query("SELECT * FROM accuracy_metrics")) == len(incremental) == 18
+
+        rebuilt = tracker.update(rebuild=True)
+        assert rebuilt['folded'] == 300
+        for key, row in stored_metrics(db).items():
+            for name in ['total_predictions', 'correct_predictions', 'brier_score', 'roc_auc',
+                         'f1_score', 'total_roi_pct']:
+                assert row[name] == incremental[key][name] or \
+                    abs(row[name] - incremental[key][name]) < 1e-9, (key, name)
+
+        assert summary['total_predictions'] == 300
+        assert sum(b['predictions'] for b in summary['calibration']) == sum(
+            row['total_predictions'] for row in incremental.values())
+        assert [m['model_type'] for m in summary['models']] == sorted(
+            ['ensemble', 'xgboost'], key=lambda t: incremental[('1X2', t)]['brier_score'])
+        assert summary['best_market'] == summary['markets'][0]['market']
+        db.close()
+
+    print("Incremental metric updates equal a full rebuild")
+
+
+def test_summary_on_unmigrated_database():
+    """Dashboard figures of a database without metric_state (user_version 0) are empty"""
+    shipped = Path(__file__).parent / 'database' / 'predictions.db'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'predictions.db'
+        db_path.write_bytes(shipped.read_bytes())
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+        conn.close()
+
+        db = DatabaseService(db_path)
+        assert not db._query("SELECT name FROM sqlite_master WHERE name = 'metric_state'")
+        summary = MetricsTracker(db).summary()
+        assert summary['total_predictions'] == summary['total_correct'] == summary['overall_roi'] == 0
+        assert summary['avg_brier_score'] is None and summary['models'] == []
+        assert sum(b['predictions'] for b in summary['calibration']) == 0
+
+        # Read-only: the schema is left for migrate()
+        assert not db._query("SELECT name FROM sqlite_master WHERE name = 'metric_state'")
+        db.close()
+
+    print("Unmigrated databases give empty dashboard figures")
+
+
+if __name__ == "__main__":
+    test_metrics_match_sklearn()
+    test_incremental_equals_rebuild()
+    test_summary_on_unmigrated_database()
@@ -0,0 +1,106 @@
+"""
+Test script for ModelManager
+The LRU model cache stays consistent under concurrent requests; models
+trained with another assembly plan are refused
+"""
+import sys
+import random
+import tempfile
+import threading
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+
+from services.feature_engineering import FeatureEngineer, assembly_plan_hash
+from services.model_manager import ModelManager
+from services.training_orchestrator import train_job
+
+
+def test_concurrent_lru():
+    """Request threads load/evict markets while /health reads the memory report"""
+    manager = ModelManager('premier_league', cache_size=2)
+    markets = [('match_result', None)] + [('goals', name) for name in ModelManager.MARKETS['goals']]
+    errors = []
+    done = threading.Event()
+
+    def request(seed):
+        rng = random.Random(seed)
+        try:
+            for _ in range(40):
+                group, name = rng.choice(markets)
+                assert manager.get_model(group, name) is not None
+        except Exception as e:
+            errors.append(e)
+
+    def health():
+        try:
+            while not done.is_set():
+                assert len(manager.memory_report()) <= 2
+        except Exception as e:
+            errors.append(e)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=request, args=(seed,)) for seed in range(6)]
+        monitor = threading.Thread(target=health)
+        monitor.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        done.set()
+        monitor.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == [], errors
+    assert len(manager.cache) == 2
+
+    print("240 concurrent model requests with a 2-market cache")
+
+
+def test_plan_mismatch_refused():
+    """A market retrained with another plan (partial run) is refused, not served misaligned"""
+    rng = np.random.default_rng(5)
+    X = rng.normal(size=(250, 4)).astype(np.float32)
+    y = (X[:, 0] > 0).astype(int)
+    engineer = FeatureEngineer()
+    plan = engineer.get_assembly_plan(['goals_for_L3_mean', 'goals_for_L5_mean', 'is_home', 'rest_days'])
+    other = engineer.get_assembly_plan(['goals_for_L3_mean', 'xg_for_L3_mean', 'is_home', 'rest_days'])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        np.save(Path(tmp) / 'X.npy', X)
+        for name, trained_with in [('over_2_5', plan), ('over_3_5', other), ('btts', None)]:
+            for algorithm in ['xgboost', 'randomforest']:
+                train_job({
+                    'group': 'goals', 'name': name, 'algorithm': algorithm,
+                    'params': {'n_estimators': 5, 'max_depth': 3, 'random_state': 42, 'n_jobs': 1},
+                    'split': 200, 'y_train': y[:200], 'y_val': y[200:],
+                    'path': Path(tmp) / 'goals' / f'{name}_{algorithm}.pkl',
+                    'plan_hash': trained_with and assembly_plan_hash(trained_with)
+                }, Path(tmp) / 'X.npy')
+        engineer.save_assembly_plan(Path(tmp) / 'assembly_plan.json', [
+            entry['feature'] for entry in plan['features']])
+
+        for model_format in ['compact', 'pickle']:
+            manager = ModelManager('premier_league', model_format=model_format)
+            manager.models_dir = Path(tmp)
+            assert manager.get_model('goals', 'over_2_5').predict_proba(X[:3]).shape == (3, 2)
+            assert manager.get_model('goals', 'btts') is not None  # trained before stamping
+
+            try:
+                manager.get_model('goals', 'over_3_5')
+                assert False, "model of another plan was served"
+            except ValueError as e:
+                assert 'assembly plan' in str(e)
+
+    print("Models of another assembly plan are refused")
+
+
+if __name__ == "__main__":
+    test_concurrent_lru()
+    test_plan_mismatch_refused()
@@ -0,0 +1,46 @@
+"""
+Test script for predict.py as a prediction server client
+Server-side failures keep the non-zero exit code callers check
+"""
+import io
+import sys
+import json
+import contextlib
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import predict
+
+
+def run_main(server_response) -> tuple:
+    """(exit code, printed JSON) of predict.py with the server answering server_response"""
+    original, argv = predict.predict_via_server, sys.argv
+    predict.predict_via_server = lambda *args: server_response
+    sys.argv = ['predict.py', 'Arsenal', 'Nobody FC']
+    output = io.StringIO()
+    code = 0
+    try:
+        with contextlib.redirect_stdout(output):
+            predict.main()
+    except SystemExit as e:
+        code = e.code
+    finally:
+        predict.predict_via_server, sys.argv = original, argv
+    return code, json.loads(output.getvalue())
+
+
+def test_server_failure_exits_nonzero():
+    """{"success": false} from the server exits 1, as an in-process failure does"""
+    code, output = run_main({'success': False, 'error': "Team 'Nobody FC' not found"})
+    assert code == 1 and output == {'success': False, 'error': "Team 'Nobody FC' not found"}
+
+    code, output = run_main({'success': True, 'home_team': 'Arsenal', 'model_type': 'ensemble'})
+    assert code == 0 and output['success']
+
+    print("Server-side failures exit 1")
+
+
+if __name__ == "__main__":
+    test_server_failure_exits_nonzero()
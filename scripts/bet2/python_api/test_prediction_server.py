@@ -0,0 +1,86 @@
+"""
+Test script for the prediction server's PredictorPool
+File scans are rate-limited and run outside the pool lock; a retrain's new
+assembly plan triggers a reload
+"""
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from prediction_server import PredictorPool
+from services.feature_engineering import FeatureEngineer, assembly_plan_hash
+
+
+class CountingPool(PredictorPool):
+    """Pool with a scripted signature that records every scan"""
+
+    def __init__(self, check_interval: float):
+        super().__init__(check_interval)
+        self.scans = []
+        self.signature = ('files', 'plan1')
+
+    def _signature(self, loader, manager) -> tuple:
+        self.scans.append(self.lock.locked())
+        return self.signature
+
+
+def test_signature_checks():
+    """No scan within the interval; later scans hold no lock and keep an unchanged predictor"""
+    predictor = SimpleNamespace(data_loader=None, model_manager=SimpleNamespace(plan_hash='plan1'))
+
+    pool = CountingPool(check_interval=60)
+    pool.predictors[('premier_league', 'ensemble')] = (('files', 'plan1'), predictor, float('inf'))
+    for _ in range(100):
+        assert pool.get('premier_league', 'ensemble') is predictor
+    assert pool.scans == []
+
+    pool = CountingPool(check_interval=0)
+    pool.predictors[('premier_league', 'ensemble')] = (('files', 'plan1'), predictor, 0.0)
+    for _ in range(3):
+        assert pool.get('premier_league', 'ensemble') is predictor
+    assert pool.scans == [False, False, False]
+
+    print("Predictor pool scans files at most once per interval, outside its lock")
+
+
+def test_plan_changes_reload():
+    """Signature follows the plan (and selection) files; a predictor checked against another plan is stale"""
+    engineer = FeatureEngineer()
+    loader = SimpleNamespace(get_available_seasons=lambda: [], source_fingerprint=None)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = SimpleNamespace(models_dir=Path(tmp), plan_hash=None)
+        before = PredictorPool._signature(loader, manager)
+        assert before == (None,)
+
+        engineer.save_assembly_plan(Path(tmp) / 'assembly_plan.json', ['is_home', 'rest_days'])
+        old = PredictorPool._signature(loader, manager)
+        assert old[-1] == assembly_plan_hash(engineer.get_assembly_plan(['is_home', 'rest_days']))
+        assert str(Path(tmp) / 'assembly_plan.json') in old[0]
+
+        (Path(tmp) / 'feature_selection.json').write_text('{}')
+        assert PredictorPool._signature(loader, manager)[:-1] != old[:-1]
+
+        # Predictor built while the retrain still had the old plan on disk
+        pool = PredictorPool()
+        predictor = SimpleNamespace(data_loader=loader, model_manager=manager)
+        manager.plan_hash = old[-1]
+        signature = PredictorPool._signature(loader, manager)
+        assert pool._reusable(predictor, signature)
+
+        engineer.save_assembly_plan(Path(tmp) / 'assembly_plan.json', ['rest_days', 'is_home'])
+        assert not pool._reusable(predictor, signature)
+        manager.plan_hash = PredictorPool._signature(loader, manager)[-1]
+        assert not pool._reusable(predictor, signature)
+        assert pool._reusable(predictor, PredictorPool._signature(loader, manager))
+
+    print("Assembly plan changes reload the predictor")
+
+
+if __name__ == "__main__":
+    test_signature_checks()
+    test_plan_changes_reload()
@@ -0,0 +1,105 @@
+"""
+Test script for Predictor
+Batched predictions equal per-match ones; failed fixtures don't affect the rest;
+the compiled assembly plan builds the same vectors as a per-feature assembly
+"""
+import sys
+import math
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+
+from services.data_loader import DataLoader
+from services.feature_engineering import FeatureEngineer
+from services.model_manager import ModelManager
+from services.predictor import Predictor
+
+FIXTURES = [('Arsenal', 'Chelsea'), ('Nobody FC', 'Chelsea'), ('Everton', 'Fulham'),
+            ('Chelsea', 'Arsenal'), ('Liverpool', 'Manchester City')]
+
+
+class GeneratedFeaturesPredictor(Predictor):
+    """Predictor on freshly generated features (leaves the feature store untouched)"""
+
+    def _preload_features(self):
+        loader = self.data_loader
+        return self.feature_engineer.generate_features(
+            loader.load_multiple_seasons(loader.get_available_seasons()))
+
+
+def make_predictor() -> Predictor:
+    return GeneratedFeaturesPredictor(
+        ModelManager('premier_league'), DataLoader('premier_league'), FeatureEngineer())
+
+
+def without_timestamps(result: dict) -> dict:
+    result = dict(result)
+    result.pop('timestamp')
+    if 'match' in result:
+        result['match'] = {k: v for k, v in result['match'].items() if k != 'date'}
+    return result
+
+
+def test_batch_equals_single():
+    """predict_matches gives each fixture what predict_match gives it alone"""
+    predictor = make_predictor()
+
+    batch = predictor.predict_matches(FIXTURES)
+    single = [predictor.predict_match(home, away) for home, away in FIXTURES]
+
+    assert [result['success'] for result in batch] == [True, False, True, True, True]
+    assert batch[1]['error'] == single[1]['error'] == "No historical data found for Nobody FC"
+    for batched, alone in zip(batch, single):
+        assert without_timestamps(batched) == without_timestamps(alone)
+
+    print(f"{len(FIXTURES)} batched predictions equal per-match predictions")
+
+
+def reference_vector(predictor: Predictor, features, home_team: str, away_team: str) -> list:
+    """One feature at a time from the teams' latest rows, following the plan entries"""
+    latest = features.sort_values(['team_name', 'date']).groupby('team_name').tail(1)
+    home = latest[latest['team_name'] == home_team].iloc[0]
+    away = latest[latest['team_name'] == away_team].iloc[0]
+
+    def value(row, column):
+        return float(row[column]) if column in row.index else 0.0
+
+    vector = []
+    for entry in predictor.assembly_plan['features']:
+        if entry['operation'] == 'constant':
+            vector.append(entry['value'])
+            continue
+        a, b = entry.get('home'), entry.get('away')
+        result = predictor.feature_engineer.apply_operation(
+            entry['operation'], value(home, a), value(home, b), value(away, a), value(away, b))
+        vector.append(0.0 if math.isnan(result) else result)
+    return vector
+
+
+def test_compiled_plan_matches_reference():
+    """_build_feature_matrix rows equal the per-feature assembly of each matchup"""
+    predictor = make_predictor()
+    features = predictor._preload_features()
+    fixtures = [fixture for fixture in FIXTURES if 'Nobody FC' not in fixture]
+
+    matrix = predictor._build_feature_matrix(
+        [home for home, _ in fixtures], [away for _, away in fixtures])
+    assert matrix.shape == (len(fixtures), len(predictor.assembly_plan['features']))
+
+    operations = {entry['operation'] for entry in predictor.assembly_plan['features']}
+    assert {'home', 'away', 'diff', 'cross_product', 'constant'} <= operations
+
+    for row, (home, away) in zip(matrix, fixtures):
+        np.testing.assert_allclose(row, reference_vector(predictor, features, home, away),
+                                   rtol=0, atol=1e-12, err_msg=f"{home} vs {away}")
+
+    print(f"Compiled plan matches the reference assembly for {len(fixtures)} matchups "
+          f"({len(operations)} operations)")
+
+
+if __name__ == "__main__":
+    test_batch_equals_single()
+    test_compiled_plan_matches_reference()
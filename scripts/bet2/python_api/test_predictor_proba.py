@@ -0,0 +1,68 @@
+"""
+Test script for Predictor._predict_proba
+The direct Random Forest path must match sklearn's predict_proba, including
+its input validation
+"""
+import sys
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+from services.predictor import Predictor
+
+
+def test_forest_proba_parity():
+    """Binary and 3-class forests, single row and batch"""
+    rng = np.random.default_rng(3)
+    X = rng.normal(size=(300, 8))
+
+    for n_classes in [2, 3]:
+        y = rng.integers(0, n_classes, size=300)
+        model = RandomForestClassifier(
+            n_estimators=25, max_depth=6, random_state=42).fit(X, y)
+
+        for rows in [X[:1], X[:50]]:
+            np.testing.assert_allclose(
+                Predictor._predict_proba(model, rows),
+                model.predict_proba(rows),
+                rtol=0, atol=1e-12)
+
+    # Other models go through their own predict_proba
+    model = LogisticRegression().fit(X, rng.integers(0, 2, size=300))
+    np.testing.assert_array_equal(
+        Predictor._predict_proba(model, X[:5]), model.predict_proba(X[:5]))
+
+    print("Direct forest probabilities match sklearn")
+
+
+def test_forest_input_validation():
+    """Wrong widths and reordered named columns raise ValueError, as in sklearn"""
+    rng = np.random.default_rng(8)
+    X = pd.DataFrame(rng.normal(size=(200, 8)), columns=[f'f{i}' for i in range(8)])
+    model = RandomForestClassifier(n_estimators=5, random_state=42).fit(
+        X, rng.integers(0, 3, size=200))
+
+    for bad in [X.values[:4, :7], np.hstack([X.values[:4], X.values[:4, :1]]),
+                X[list(reversed(X.columns))]]:
+        for predict_proba in [model.predict_proba, lambda rows: Predictor._predict_proba(model, rows)]:
+            try:
+                predict_proba(bad)
+                assert False, f"{np.shape(bad)} input accepted"
+            except ValueError:
+                pass
+
+    np.testing.assert_allclose(Predictor._predict_proba(model, X[:5]),
+                               model.predict_proba(X[:5]), rtol=0, atol=1e-12)
+
+    print("Direct forest path rejects inputs of the wrong shape")
+
+
+if __name__ == "__main__":
+    test_forest_proba_parity()
+    test_forest_input_validation()
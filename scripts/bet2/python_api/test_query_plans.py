@@ -0,0 +1,123 @@
+"""
+Test script for database/init_db.py migrations and query plans
+Hot queries use their indexes (EXPLAIN QUERY PLAN) instead of scanning tables
+"""
+import re
+import sys
+import shutil
+import sqlite3
+import tempfile
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from database.init_db import migrate, SCHEMA_VERSION, DB_PATH
+from services.database_service import DatabaseService
+
+# php_backend/api/analytics_api.php (accuracy by model)
+ACCURACY_BY_MODEL_QUERY = """
+    SELECT model_type, COUNT(*) as total, SUM(correct_1x2) as correct_1x2
+    FROM predictions
+    WHERE is_matched = 1
+    GROUP BY model_type
+"""
+
+# A full pass over a table (an index-ordered walk reads "SCAN t USING INDEX")
+FULL_SCAN = re.compile(r'^SCAN \w+$')
+
+
+def plan(conn: sqlite3.Connection, sql: str) -> list:
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def populate(db_path: Path, n: int = 2000):
+    """Mostly matched predictions, as in a long-running database"""
+    conn = sqlite3.connect(db_path)
+    for i in range(n):
+        matched = int(i >= 50)  # the latest 50 are still unmatched
+        folded = int(i >= 100)  # ... and the 50 before them not yet in the metrics
+        conn.execute("""
+            INSERT INTO predictions (match_id, home_team, away_team, model_type,
+                                     match_date, is_matched, metrics_folded, prediction_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now', ?))
+        """, (f'm{i}', f'Home {i}', f'Away {i}', ['ensemble', 'xgboost'][i % 2],
+              None if i % 9 == 0 else '2025-10-04', matched, folded, f'-{i} hours'))
+        if matched:
+            conn.execute("INSERT INTO actual_results (match_id, home_team, away_team) "
+                         "VALUES (?, ?, ?)", (f'm{i}', f'Home {i}', f'Away {i}'))
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+
+def test_migrations():
+    """New and pre-versioning databases both end at SCHEMA_VERSION; reruns are no-ops"""
+    with tempfile.TemporaryDirectory() as tmp:
+        fresh = Path(tmp) / 'fresh.db'
+        assert migrate(fresh) == SCHEMA_VERSION
+        assert migrate(fresh) == SCHEMA_VERSION
+
+        legacy = Path(tmp) / 'legacy.db'
+        shutil.copy(DB_PATH, legacy)
+        before = sqlite3.connect(legacy).execute("SELECT COUNT(*) FROM predictions").fetchone()
+        assert migrate(legacy) == SCHEMA_VERSION
+
+        columns = {}
+        for path in [fresh, legacy]:
+            conn = sqlite3.connect(path)
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+            columns[path] = [row[1] for row in conn.execute("PRAGMA table_info(predictions)")]
+            if path == legacy:
+                assert conn.execute("SELECT COUNT(*) FROM predictions").fetchone() == before
+            conn.close()
+
+        assert columns[fresh] == columns[legacy]
+        assert 'correct_cards_45' in columns[fresh]
+
+    print(f"Fresh and legacy databases migrated to version {SCHEMA_VERSION}")
+
+
+def test_hot_queries_use_indexes():
+    """The SQL DatabaseService actually runs never degrades to a full table scan"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'predictions.db'
+        migrate(db_path)
+        populate(db_path)
+
+        db = DatabaseService(db_path)
+        conn = db._get_connection()
+        executed = []
+        conn.set_trace_callback(executed.append)
+
+        plans = {}
+        for name, call, expected in [
+            ('get_unmatched_predictions', lambda: db.get_unmatched_predictions(days_back=30), 50),
+            ('get_predictions_with_results', lambda: db.get_predictions_with_results(limit=20), 20),
+            ('get_market_performance', db.get_market_performance, 0),
+            ('get_dated_unmatched_predictions', db.get_dated_unmatched_predictions, 44),
+            ('get_matched_outcomes', db.get_matched_outcomes, 50)
+        ]:
+            executed.clear()
+            assert len(call()) == expected, name
+            plans[name] = plan(conn, executed[-1])
+
+        conn.set_trace_callback(None)
+        plans['accuracy_by_model'] = plan(conn, ACCURACY_BY_MODEL_QUERY)
+        db.close()
+
+    for query, steps in plans.items():
+        assert not any(FULL_SCAN.match(step) for step in steps), (query, steps)
+
+    steps = ' | '.join(sum(plans.values(), []))
+    for index in ['idx_predictions_unmatched ', 'idx_predictions_unmatched_dated',
+                  'idx_predictions_matched_model', 'COVERING INDEX idx_metrics_period_market',
+                  'idx_predictions_unfolded']:
+        assert index in steps, (index, plans)
+
+    print(f"{len(plans)} hot queries use indexes")
+
+
+if __name__ == "__main__":
+    test_migrations()
+    test_hot_queries_use_indexes()
@@ -0,0 +1,169 @@
+"""
+Test script for TrainingOrchestrator
+CPU budget split, a worker job on a shared memory-mapped matrix, the
+saved assembly plan kept by partial runs, and staged model promotion
+"""
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Add python_api to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import services.training_orchestrator as training_orchestrator
+
+from services.compact_trees import CompactTreeModel
+from services.feature_engineering import FeatureEngineer, assembly_plan_hash
+from services.training_orchestrator import TrainingOrchestrator, train_job, saved_plan_features
+
+
+def test_job_threads():
+    """n_jobs=-1 takes the job's CPU share; explicit n_jobs is capped by it"""
+    assert TrainingOrchestrator._job_threads({'n_jobs': -1}, 4) == 4
+    assert TrainingOrchestrator._job_threads({}, 2) == 2
+    assert TrainingOrchestrator._job_threads({'n_jobs': 2}, 4) == 2
+    assert TrainingOrchestrator._job_threads({'n_jobs': 8}, 3) == 3
+
+
+def test_train_job():
+    """Worker fits from the memmapped matrix, saves the pickle and the compact export"""
+    rng = np.random.default_rng(11)
+    X_train, X_val = rng.normal(size=(200, 5)), rng.normal(size=(50, 5))
+    y_train = (X_train[:, 0] > 0).astype(int)
+    y_val = (X_val[:, 0] > 0).astype(int)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        np.save(Path(tmp) / 'X.npy', np.vstack([X_train, X_val]).astype(np.float32))
+
+        for algorithm in ['randomforest', 'xgboost']:
+            job = {
+                'group': 'goals',
+                'name': 'over_2_5',
+                'algorithm': algorithm,
+                'params': {'n_estimators': 10, 'max_depth': 3, 'random_state': 42, 'n_jobs': 1},
+                'split': 200,
+                'y_train': y_train,
+                'y_val': y_val,
+                'path': Path(tmp) / 'goals' / f'over_2_5_{algorithm}.pkl',
+                'plan_hash': 'abc123'
+            }
+            outcome = train_job(job, Path(tmp) / 'X.npy')
+
+            assert outcome['metrics']['accuracy'] > 0.8
+            assert outcome['val_proba'].shape == (50, 2)
+
+            compact = CompactTreeModel.load(job['path'].with_suffix('.trees'))
+            assert compact.assembly_plan_hash == 'abc123'
+            assert joblib.load(job['path']).assembly_plan_hash == 'abc123'
+            np.testing.assert_allclose(
+                compact.predict_proba(X_val), outcome['val_proba'], rtol=0, atol=1e-6)
+
+    print("Training jobs save consistent models")
+
+
+def test_saved_plan_features():
+    """Partial runs reuse the saved plan's features; stale plans are not reused"""
+    engineer = FeatureEngineer()
+    available = ['goals_for_L3_mean', 'xg_for_L3_mean', 'is_home', 'rest_days']
+    features = ['rest_days', 'goals_for_L3_mean', 'is_home']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        assert saved_plan_features(Path(tmp), engineer, available) is None
+
+        engineer.save_assembly_plan(Path(tmp) / 'assembly_plan.json', features)
+        assert saved_plan_features(Path(tmp), engineer, available) == features
+        assert saved_plan_features(Path(tmp), engineer, available[1:]) is None
+
+        plan = engineer.get_assembly_plan(features)
+        with open(Path(tmp) / 'assembly_plan.json', 'w') as f:
+            json.dump(dict(plan, version='2.0'), f)
+        assert saved_plan_features(Path(tmp), engineer, available) is None
+
+    assert assembly_plan_hash(plan) == assembly_plan_hash(json.loads(json.dumps(plan)))
+    assert assembly_plan_hash(plan) != assembly_plan_hash(engineer.get_assembly_plan(features[:2]))
+
+    print("Partial runs keep the saved assembly plan")
+
+
+def synthetic_orchestrator(models_dir: Path) -> TrainingOrchestrator:
+    """Cards-only orchestrator on a small in-memory matrix (no data files needed)"""
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(250, 3)).astype(np.float32)
+    rows = pd.DataFrame({'match_total_cards': rng.poisson(4, size=250),
+                         'team_total_cards': rng.poisson(2, size=250)})
+
+    orchestrator = TrainingOrchestrator(models_dir=models_dir, cpu_budget=1, feature_selection=False)
+    orchestrator.feature_columns = ['is_home', 'rest_days', 'goals_for_L3_mean']
+    orchestrator.matrix = {'X': X, 'rows': rows, 'columns': orchestrator.feature_columns, 'path': None}
+    orchestrator.split_idx = 200
+    orchestrator.train_df, orchestrator.val_df = rows.iloc[:200], rows.iloc[200:]
+    orchestrator.tuned_params = {
+        label: {'xgboost': {'n_estimators': 3}, 'randomforest': {'n_estimators': 3}}
+        for label in [f'cards/{name}' for name in [
+            'total_cards_over_2_5', 'total_cards_over_3_5', 'total_cards_over_4_5',
+            'team_cards_over_1_5', 'team_cards_over_2_5']]}
+    return orchestrator
+
+
+def test_staged_promotion():
+    """A failed job leaves the served models untouched; a full run moves models and plan in together"""
+    original = training_orchestrator.train_job
+
+    with tempfile.TemporaryDirectory() as tmp:
+        models_dir = Path(tmp) / 'premier_league'
+        (models_dir / 'cards').mkdir(parents=True)
+        (models_dir / 'cards' / 'total_cards_over_2_5_xgboost.pkl').write_bytes(b'served')
+        (models_dir / 'assembly_plan.json').write_text('{"served": true}')
+        served = {path: path.read_bytes() for path in models_dir.rglob('*') if path.is_file()}
+
+        calls = []
+
+        def failing_job(job, matrix_path):
+            calls.append(job['path'])
+            if len(calls) == 3:
+                raise RuntimeError("worker died")
+            return original(job, matrix_path)
+
+        training_orchestrator.train_job = failing_job
+        try:
+            synthetic_orchestrator(models_dir).run(['cards'])
+            assert False, "failed job not raised"
+        except RuntimeError:
+            pass
+        finally:
+            training_orchestrator.train_job = original
+
+        assert all(models_dir not in path.parents for path in calls)
+        assert {path: path.read_bytes() for path in models_dir.rglob('*') if path.is_file()} == served
+        assert sorted(path.name for path in Path(tmp).iterdir()) == ['premier_league']
+
+        orchestrator = synthetic_orchestrator(models_dir)
+        results = orchestrator.run(['cards'])
+        assert len(results) == 5
+        assert sorted(path.name for path in Path(tmp).iterdir()) == ['premier_league']
+
+        plan_hash = assembly_plan_hash(json.loads((models_dir / 'assembly_plan.json').read_text()))
+        assert plan_hash == assembly_plan_hash(
+            orchestrator.feature_engineer.get_assembly_plan(orchestrator.feature_columns))
+        for path in (models_dir / 'cards').glob('*.pkl'):
+            assert joblib.load(path).assembly_plan_hash == plan_hash
+            assert CompactTreeModel.load(path.with_suffix('.trees')).assembly_plan_hash == plan_hash
+        assert len(list((models_dir / 'cards').glob('*.trees'))) == 10
+
+        # Re-running replaces the .trees directories in place
+        orchestrator.run(['cards'])
+        assert not list(models_dir.rglob('*.old'))
+
+    print("Models and plan are promoted together, only after every job succeeded")
+
+
+if __name__ == "__main__":
+    test_job_threads()
+    test_train_job()
+    test_saved_plan_features()
+    test_staged_promotion()
@@ -4,8 +4,13 @@ Training Script for Football Prediction Models
 Loads data, generates features, trains all models with proper validation
 """
 from services.model_trainer import ModelTrainer
-from services.feature_engineering import FeatureEngineer
+from services.feature_engineering import FeatureEngineer, assembly_plan_hash
 from services.data_loader import DataLoader
+from services.matrix_cache import MatrixCache
+from services.feature_selector import FeatureSelector
+from services.training_orchestrator import select_features, saved_plan_features
+from config import FEATURE_SELECTION, MODELS_DIR
+from services.compact_trees import export_directory
 import pandas as pd
 import sys
 import logging
@@ -36,63 +41,72 @@ def main():
     seasons = data_loader.get_available_seasons()
     logger.info(f"Available seasons: {seasons}")
 
-    df = data_loader.load_multiple_seasons(seasons)
-    logger.info(f"Loaded {len(df)} total matches")
-
-    # 2. Generate features
+    # 2. Generate features (feature store only computes new matches; the
+    #    float32 matrix is cached and shared with the other trainers)
     logger.info("\n[Step 2/5] Generating features...")
     feature_engineer = FeatureEngineer(rolling_windows=[3, 5, 10])
-    df = feature_engineer.generate_features(df)
-
-    feature_columns = feature_engineer.get_model_feature_names()
-    logger.info(f"Generated {len(feature_columns)} features")
-    logger.info(f"Dataset shape: {df.shape}")
-
-    # 3. Split data - use 80% for training, 20% for validation
-    logger.info("\n[Step 3/5] Splitting data...")
-
-    # Sort by date
-    df = df.sort_values('date').reset_index(drop=True)
 
     # Remove rows with insufficient history (first few matches per team)
     min_matches = 5
-    df = df[df['match_number'] >= min_matches].reset_index(drop=True)
+    cache = MatrixCache(data_loader, feature_engineer)
+    matrix = cache.load(min_match_number=min_matches)
+    rows = matrix['rows']
     logger.info(
-        f"Using matches from match #{min_matches} onwards: {len(df)} samples")
+        f"Using matches from match #{min_matches} onwards: {len(rows)} samples")
+
+    feature_columns = matrix['columns']
+    logger.info(f"Generated {len(feature_columns)} features")
+    logger.info(f"Matrix shape: {matrix['X'].shape}")
+
+    # 3. Split data - use 80% for training, 20% for validation (rows are in date order)
+    logger.info("\n[Step 3/5] Splitting data...")
 
-    # Split
-    split_idx = int(len(df) * 0.8)
-    train_df = df.iloc[:split_idx].copy()
-    val_df = df.iloc[split_idx:].copy()
+    split_idx = int(len(rows) * 0.8)
+    train_df = rows.iloc[:split_idx]
+    val_df = rows.iloc[split_idx:]
 
     logger.info(f"Training set: {len(train_df)} samples")
     logger.info(f"Validation set: {len(val_df)} samples")
 
-    # Check for missing features
-    missing_in_train = [
-        col for col in feature_columns if col not in train_df.columns]
-    missing_in_val = [
-        col for col in feature_columns if col not in val_df.columns]
-
-    if missing_in_train:
-        logger.error(f"Missing features in training: {missing_in_train}")
-        return
-    if missing_in_val:
-        logger.error(f"Missing features in validation: {missing_in_val}")
-        return
-
-    logger.info("All features present in both sets ✓")
+    # The cards models are not retrained here: keep the features of the saved
+    # assembly plan so they stay servable. Without one, drop redundant / unused
+    # features (selected on the training rows only)
+    selection = None
+    saved_features = saved_plan_features(
+        MODELS_DIR / 'premier_league', feature_engineer, feature_columns)
+    if saved_features is not None:
+        if saved_features != feature_columns:
+            matrix = cache.load(min_matches, columns=saved_features)
+        feature_columns = matrix['columns']
+        logger.info(f"Keeping the saved assembly plan ({len(feature_columns)} features)")
+    elif FEATURE_SELECTION:
+        matrix, selection = select_features(cache, matrix, split_idx, min_matches)
+        feature_columns = matrix['columns']
+        logger.info(f"Selected {len(feature_columns)} features")
 
     # 4. Train models
     logger.info("\n[Step 4/5] Training models...")
     trainer = ModelTrainer(competition='premier_league')
+    trainer.assembly_plan_hash = assembly_plan_hash(
+        feature_engineer.get_assembly_plan(feature_columns))
 
     results = trainer.train_all_models(
         train_df=train_df,
         val_df=val_df,
-        feature_columns=feature_columns
+        feature_columns=feature_columns,
+        X_train=matrix['X'][:split_idx],
+        X_val=matrix['X'][split_idx:]
     )
 
+    # How Predictor rebuilds these feature vectors for new matchups
+    feature_engineer.save_assembly_plan(
+        trainer.models_dir / 'assembly_plan.json', feature_columns)
+    if selection is not None:
+        FeatureSelector.save(selection, trainer.models_dir / 'feature_selection.json')
+
+    # Flat-array copies used by ModelManager at serving time
+    export_directory(trainer.models_dir)
+
     # 5. Display results
     logger.info("\n[Step 5/5] Training Results Summary")
     logger.info("=" * 80)
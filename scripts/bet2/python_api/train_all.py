@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Train All Models - Full retraining after a data update
+Match result, goals and cards (XGBoost + Random Forest) from one feature
+matrix, with all market x algorithm jobs running in parallel
+Usage: python train_all.py [cpu_budget]
+"""
+from services.training_orchestrator import TrainingOrchestrator
+import sys
+import logging
+from pathlib import Path
+
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    logger.info("=" * 80)
+    logger.info("FULL MODEL TRAINING (match result, goals, cards)")
+    logger.info("=" * 80)
+
+    if len(sys.argv) > 1:
+        orchestrator = TrainingOrchestrator('premier_league', cpu_budget=int(sys.argv[1]))
+    else:
+        orchestrator = TrainingOrchestrator('premier_league')
+
+    results = orchestrator.run()
+
+    logger.info("\nTraining Summary")
+    orchestrator.log_summary(results)
+
+    logger.info("🎉 ALL MODELS TRAINED SUCCESSFULLY!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tune Hyperparameters - Standalone Script
+Successive-halving search per market on time-series folds of the training period
+Writes models/<competition>/params/vNNNN.json, which the trainers then use
+Trial results are cached, so reruns only evaluate what changed
+Usage: python tune.py [--groups a,b] [--candidates N] [--cpus N] [--competition c]
+"""
+from services.hyperparameter_tuner import HyperparameterTuner
+import sys
+import json
+import logging
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import TRAINING_CPU_BUDGET
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hyperparameter search')
+    parser.add_argument('--competition', default='premier_league')
+    parser.add_argument('--groups', default='match_result,goals,cards',
+                        help='Comma-separated market groups')
+    parser.add_argument('--candidates', type=int, default=16,
+                        help='Parameter sets per market and algorithm')
+    parser.add_argument('--cpus', type=int, default=TRAINING_CPU_BUDGET,
+                        help='CPU budget shared by the trials')
+    args = parser.parse_args()
+
+    try:
+        tuner = HyperparameterTuner(
+            args.competition, n_candidates=args.candidates, cpu_budget=args.cpus)
+        path = tuner.run(args.groups.split(','))
+
+        with open(path, 'r') as f:
+            content = json.load(f)
+
+        # Output JSON
+        print(json.dumps({"success": True, "params_file": str(path), **content}, indent=2))
+
+    except Exception as e:
+        print(json.dumps({
+            "success": False,
+            "error": str(e)
+        }))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Update Feature Store - Standalone Script
+Brings the persisted features in line with the CSV data (new matches only)
+Run after each data update so predictions and training start warm
+Usage: python update_features.py [competition]
+"""
+from services.feature_store import FeatureStore
+from services.feature_engineering import FeatureEngineer
+from services.data_loader import DataLoader
+import sys
+import json
+import logging
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+
+def main():
+    competition = sys.argv[1] if len(sys.argv) > 1 else 'premier_league'
+
+    try:
+        loader = DataLoader(competition)
+        engineer = FeatureEngineer(rolling_windows=[3, 5, 10])
+        store = FeatureStore(loader, engineer)
+
+        df = store.load_features()
+        high_water_mark = store.get_high_water_mark()
+
+        print(json.dumps({
+            "success": True,
+            "competition": competition,
+            "rows": len(df),
+            "features": engineer.get_feature_count(),
+            "high_water_mark": high_water_mark.isoformat() if high_water_mark is not None else None
+        }))
+
+    except Exception as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()